@@ -0,0 +1,215 @@
+"""Throughput/latency benchmark for the event-extraction functions.
+
+Generates a deterministic synthetic headline corpus and, for every
+combination of corpus size, batch size and process count, measures:
+
+- docs/sec over the whole corpus
+- time to the first result, reported separately because for ``semantic`` it
+  includes scoring the whole corpus with the TF-IDF classifier
+- p50/p95/p99 latency per batch after the first result: the time the
+  streaming call takes to yield each further ``batch_size`` results
+- peak RSS of the process running the configuration (incl. children)
+
+Each configuration runs in a fresh process so peak RSS is not polluted by
+earlier runs. Results are written as JSON lines; pass ``--baseline`` with an
+earlier result file to flag throughput regressions (non-zero exit code).
+
+    python -m benchmarks.bench_event_extraction --sizes 1000,10000 \\
+        --batch-sizes 64,256 --processes 1,2 --output bench.jsonl
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+FUNCTIONS = ("semantic", "string_match")
+
+_EVENTS = ["explosion", "earthquake", "protest", "flood", "wildfire", "storm", "attack", "shooting", "strike", "evacuation"]
+_PLACES = ["Beirut", "Japan", "Madrid", "Sudan", "Mogadishu", "Turkey", "Mozambique", "Chile", "Manila", "Ohio"]
+_TEMPLATES = [
+    "{adj} {event} {verb} {place}",
+    "{place}: {event} leaves {n} people {state}",
+    "Officials in {place} warn of new {event} after {n} days",
+    "{n} injured as {event} {verb} {place} port area",
+    "Thousands {state} in {place} following {adj} {event}",
+]
+_ADJ = ["Massive", "Deadly", "Sudden", "Major", "Minor", "Overnight"]
+_VERB = ["rocks", "hits", "strikes", "sweeps through", "shakes"]
+_STATE = ["displaced", "evacuated", "stranded", "missing", "injured"]
+
+EVENT_KEYWORDS = {e: e.capitalize() for e in _EVENTS}
+
+
+def make_corpus(n: int, seed: int = 13) -> List[str]:
+    """Deterministic synthetic headlines (same ``n`` and ``seed`` -> same corpus)."""
+    rng = random.Random(seed)
+    return [
+        rng.choice(_TEMPLATES).format(
+            adj=rng.choice(_ADJ),
+            event=rng.choice(_EVENTS),
+            verb=rng.choice(_VERB),
+            place=rng.choice(_PLACES),
+            state=rng.choice(_STATE),
+            n=rng.randint(2, 5000),
+        )
+        for _ in range(n)
+    ]
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    unit = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return (own + children) * unit / 2**20
+
+
+def run_config(function: str, n_docs: int, batch_size: int, n_process: int, spacy_model: str, seed: int = 13) -> Dict:
+    """Benchmark one configuration in the current process."""
+    from src.event_extraction.classifier import EventClassifier
+    from src.event_extraction.event_extraction import (
+        DEFAULT_EVENT_PHRASES,
+        iter_events_semantic,
+        iter_events_string_match,
+    )
+    from src.event_extraction.nlp_registry import get_nlp
+
+    texts = make_corpus(n_docs, seed)
+
+    load_start = time.perf_counter()
+    get_nlp(spacy_model, task="ner", warm=True)
+    classifier = None
+    if function == "semantic":
+        classifier = EventClassifier(DEFAULT_EVENT_PHRASES).fit(make_corpus(min(n_docs, 10_000), seed + 1))
+    setup_seconds = time.perf_counter() - load_start
+
+    # one streaming call over the whole corpus, so the spaCy process pool starts once
+    if function == "semantic":
+        events = iter_events_semantic(
+            texts, classifier=classifier, spacy_model=spacy_model, batch_size=batch_size, n_process=n_process
+        )
+    else:
+        events = iter_events_string_match(
+            texts, EVENT_KEYWORDS, spacy_model=spacy_model, batch_size=batch_size, n_process=n_process
+        )
+
+    latencies = []
+    start = time.perf_counter()
+    next(events)
+    t0 = time.perf_counter()
+    first_result = t0 - start
+    for i, _ in enumerate(events, 2):
+        if i % batch_size == 0 or i == n_docs:
+            now = time.perf_counter()
+            latencies.append(now - t0)
+            t0 = now
+    total = time.perf_counter() - start
+
+    p50, p95, p99 = np.percentile(np.asarray(latencies or [0.0]) * 1000.0, [50, 95, 99])
+    return {
+        "function": function,
+        "n_docs": n_docs,
+        "batch_size": batch_size,
+        "n_process": n_process,
+        "spacy_model": spacy_model,
+        "setup_seconds": round(setup_seconds, 4),
+        "first_result_seconds": round(first_result, 4),
+        "total_seconds": round(total, 4),
+        "docs_per_sec": round(n_docs / total, 2) if total > 0 else None,
+        "batch_latency_ms": {"p50": round(p50, 3), "p95": round(p95, 3), "p99": round(p99, 3)},
+        "n_batches": len(latencies),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def _run_isolated(*args) -> Dict:
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as ex:
+        return ex.submit(run_config, *args).result()
+
+
+def _config_key(r: Dict):
+    return (r["function"], r["n_docs"], r["batch_size"], r["n_process"])
+
+
+def find_regressions(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    """Configs whose docs/sec dropped by more than ``tolerance`` vs ``baseline``."""
+    before = {_config_key(r): r for r in baseline}
+    out = []
+    for r in results:
+        old = before.get(_config_key(r))
+        if not old or not old.get("docs_per_sec") or not r.get("docs_per_sec"):
+            continue
+        change = r["docs_per_sec"] / old["docs_per_sec"] - 1.0
+        if change < -tolerance:
+            out.append(f"{_config_key(r)}: {old['docs_per_sec']} -> {r['docs_per_sec']} docs/s ({change:+.1%})")
+    return out
+
+
+def _ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Benchmark event extraction throughput and latency.")
+    p.add_argument("--sizes", type=_ints, default=[1_000, 10_000], help="Corpus sizes, e.g. 1000,10000,1000000.")
+    p.add_argument(
+        "--batch-sizes",
+        type=_ints,
+        default=[64, 256],
+        help="nlp.pipe batch sizes; batch latency is measured per this many results.",
+    )
+    p.add_argument("--processes", type=_ints, default=[1], help="nlp.pipe n_process values.")
+    p.add_argument("--functions", default=",".join(FUNCTIONS), help=f"Subset of {FUNCTIONS}.")
+    p.add_argument("--spacy-model", default="en_core_web_sm", help="spaCy model name or path.")
+    p.add_argument("--seed", type=int, default=13, help="Corpus seed.")
+    p.add_argument("--output", default="-", help="JSON-lines result file (default: stdout).")
+    p.add_argument("--baseline", help="Earlier result file to compare docs/sec against.")
+    p.add_argument("--tolerance", type=float, default=0.10, help="Allowed docs/sec drop vs baseline (default: 0.10).")
+
+    args = p.parse_args(argv)
+    functions = [f.strip() for f in args.functions.split(",") if f.strip()]
+    unknown = set(functions) - set(FUNCTIONS)
+    if unknown:
+        p.error(f"Unknown functions: {sorted(unknown)}")
+
+    env = {"python": platform.python_version(), "machine": platform.machine(), "timestamp": time.time()}
+    results = []
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for function in functions:
+            for n_docs in args.sizes:
+                for batch_size in args.batch_sizes:
+                    for n_process in args.processes:
+                        r = _run_isolated(function, n_docs, batch_size, n_process, args.spacy_model, args.seed)
+                        r.update(env)
+                        results.append(r)
+                        out.write(json.dumps(r) + "\n")
+                        out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = [json.loads(line) for line in f if line.strip()]
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
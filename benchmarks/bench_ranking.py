@@ -0,0 +1,284 @@
+"""Quality-vs-latency benchmark for the event_rank_explain search modes.
+
+Generates a deterministic synthetic corpus of topic "snippets" plus a labeled
+query set (each query is built from one target document), builds one
+embedding index, and for every search configuration measures:
+
+- recall@k against the exact float32 top-k (how much an approximation loses)
+- MRR@k of the labeled target document
+- queries/sec and p50/p99 latency per query (query embeddings precomputed)
+- index memory: bytes of every array the configuration scores against
+
+Configurations are the cross product of ``--quantizations`` and the search
+modes (``exact``, ``ann`` per ``--nprobe``, ``hybrid`` per ``--candidates``).
+It runs fully offline with the deterministic ``hashing`` encoder; pass a
+SentenceTransformer name via ``--embedding-model`` to measure a real model.
+
+    python -m benchmarks.bench_ranking --docs 100000 --queries 500 \\
+        --nprobe 4,16 --candidates 200,1000 --quantizations float32,int8
+
+``--baseline`` exits non-zero when a configuration lost recall or more than
+``--tolerance`` of its queries/sec against an earlier result file.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+MODES = ("exact", "ann", "hybrid")
+
+_SYLLABLES = ["ka", "lo", "mi", "ren", "tu", "sa", "vel", "dor", "an", "ish", "po", "gra", "ne", "zu", "bar", "ith"]
+
+
+def _word(rng: random.Random, syllables: int) -> str:
+    return "".join(rng.choice(_SYLLABLES) for _ in range(syllables))
+
+
+def make_corpus(n_docs: int, n_queries: int, seed: int = 13) -> Tuple[List[Dict], List[str], List[int]]:
+    """Deterministic ``(docs, queries, target_rows)``.
+
+    Every document mixes words of one topic, common background words and two
+    words of its own; a query takes two topic words and one own word of its
+    target document, so the target is the single best answer.
+    """
+    rng = random.Random(seed)
+    n_topics = max(4, n_docs // 200)
+    topics = [[_word(rng, 3) for _ in range(12)] for _ in range(n_topics)]
+    background = [_word(rng, 2) for _ in range(300)]
+
+    docs, own_words = [], []
+    for i in range(n_docs):
+        topic = topics[rng.randrange(n_topics)]
+        own = [f"{_word(rng, 2)}{i}", f"{_word(rng, 2)}{i}x"]
+        words = rng.sample(topic, 5) + rng.sample(background, 4) + own
+        rng.shuffle(words)
+        docs.append({"id": i, "text": " ".join(words)})
+        own_words.append((own, [w for w in words if w in topic]))
+
+    targets = [rng.randrange(n_docs) for _ in range(n_queries)]
+    queries = []
+    for t in targets:
+        own, topic_words = own_words[t]
+        queries.append(" ".join(rng.sample(topic_words, 2) + [rng.choice(own)]))
+    return docs, queries, targets
+
+
+def recall_at_k(found: List[np.ndarray], truth: List[np.ndarray]) -> float:
+    hits = sum(len(set(f.tolist()) & set(t.tolist())) for f, t in zip(found, truth))
+    total = sum(len(t) for t in truth)
+    return hits / total if total else 0.0
+
+
+def mrr(found: List[np.ndarray], targets: List[int]) -> float:
+    ranks = []
+    for rows, target in zip(found, targets):
+        where = np.flatnonzero(np.asarray(rows) == target)
+        ranks.append(1.0 / (where[0] + 1) if len(where) else 0.0)
+    return float(np.mean(ranks)) if ranks else 0.0
+
+
+def _nbytes(*arrays) -> int:
+    return int(sum(a.nbytes for a in arrays if a is not None))
+
+
+def index_memory(index, mode: str) -> int:
+    """Bytes of the arrays a search in ``mode`` scores against."""
+    if index.quantized is not None:
+        total = _nbytes(index.quantized, index.scales)
+    else:
+        total = _nbytes(index.embeddings)
+    if mode == "ann" and index.ivf is not None:
+        total += _nbytes(index.ivf.centroids, index.ivf.offsets, index.ivf.rows, index.ivf.delta_labels)
+    if mode == "hybrid" and index.sparse is not None:
+        for m in index.sparse.segments():
+            total += _nbytes(m.data, m.indices, m.indptr)
+    return total
+
+
+def run_config(index, query_embs: np.ndarray, queries: List[str], top_k: int, mode: str, **params) -> Tuple[List[np.ndarray], List[float]]:
+    """Search every query one at a time; returns per-query rows and latencies (seconds)."""
+    found, latencies = [], []
+    for text, q in zip(queries, query_embs):
+        t0 = time.perf_counter()
+        rows, _ = index.search(q, top_k, mode=mode, query_text=text, **params)
+        latencies.append(time.perf_counter() - t0)
+        found.append(rows)
+    return found, latencies
+
+
+def run_benchmark(
+    n_docs: int,
+    n_queries: int,
+    *,
+    top_k: int = 10,
+    modes=MODES,
+    quantizations=("float32", "int8"),
+    nprobes=(8,),
+    candidates=(1000,),
+    nlist: Optional[int] = None,
+    embedding_model: str = "hashing",
+    seed: int = 13,
+    workdir: Optional[str] = None,
+) -> List[Dict]:
+    from src.event_rank_explain.encoders import encode, get_encoder
+    from src.event_rank_explain.index import build_index
+
+    docs, queries, targets = make_corpus(n_docs, n_queries, seed)
+    encoder = get_encoder(embedding_model)
+
+    with tempfile.TemporaryDirectory(dir=workdir) as path:
+        t0 = time.perf_counter()
+        index = build_index(path, docs, encoder, embedding_model)
+        build_seconds = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        query_embs = encode(encoder, queries)
+        encode_ms = (time.perf_counter() - t0) * 1000.0 / max(1, n_queries)
+
+        setup = {}
+        if "ann" in modes:
+            t0 = time.perf_counter()
+            index.build_ann(nlist, seed=seed)
+            setup["ann"] = time.perf_counter() - t0
+        if "hybrid" in modes:
+            t0 = time.perf_counter()
+            index.build_sparse()
+            setup["hybrid"] = time.perf_counter() - t0
+
+        truth, _ = run_config(index, query_embs, queries, top_k, "exact")
+        results = []
+        for quantization in quantizations:
+            index.quantize(quantization)
+            configs = []
+            if "exact" in modes:
+                configs.append(("exact", {}))
+            if "ann" in modes:
+                configs += [("ann", {"nprobe": n}) for n in nprobes]
+            if "hybrid" in modes:
+                configs += [("hybrid", {"candidates": c}) for c in candidates]
+            for mode, params in configs:
+                found, latencies = run_config(index, query_embs, queries, top_k, mode, **params)
+                total = sum(latencies)
+                p50, p99 = np.percentile(np.asarray(latencies) * 1000.0, [50, 99])
+                results.append(
+                    {
+                        "mode": mode,
+                        "quantization": quantization,
+                        **params,
+                        "n_docs": n_docs,
+                        "n_queries": n_queries,
+                        "top_k": top_k,
+                        "embedding_model": embedding_model,
+                        f"recall@{top_k}": round(recall_at_k(found, truth), 4),
+                        f"mrr@{top_k}": round(mrr(found, targets), 4),
+                        "qps": round(n_queries / total, 1) if total > 0 else None,
+                        "latency_ms": {"p50": round(p50, 3), "p99": round(p99, 3)},
+                        "index_mb": round(index_memory(index, mode) / 2**20, 2),
+                        "setup_seconds": round(build_seconds + setup.get(mode, 0.0), 3),
+                        "encode_ms_per_query": round(encode_ms, 3),
+                    }
+                )
+        return results
+
+
+def _config_key(r: Dict):
+    return (r["mode"], r["quantization"], r.get("nprobe"), r.get("candidates"), r["n_docs"], r["top_k"], r["embedding_model"])
+
+
+def find_regressions(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    """Configs whose queries/sec dropped by more than ``tolerance`` or whose recall fell vs ``baseline``."""
+    before = {_config_key(r): r for r in baseline}
+    out = []
+    for r in results:
+        old = before.get(_config_key(r))
+        if not old:
+            continue
+        recall = f"recall@{r['top_k']}"
+        if r.get(recall, 0.0) < old.get(recall, 0.0):
+            out.append(f"{_config_key(r)}: {recall} {old[recall]} -> {r[recall]}")
+        if not old.get("qps") or not r.get("qps"):
+            continue
+        change = r["qps"] / old["qps"] - 1.0
+        if change < -tolerance:
+            out.append(f"{_config_key(r)}: {old['qps']} -> {r['qps']} queries/s ({change:+.1%})")
+    return out
+
+
+def _ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _names(value: str) -> List[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from src.event_rank_explain.scoring import QUANTIZATIONS
+
+    p = argparse.ArgumentParser(description="Benchmark ranking quality vs latency per search mode.")
+    p.add_argument("--docs", type=int, default=20_000, help="Corpus size (default: 20000).")
+    p.add_argument("--queries", type=int, default=200, help="Labeled queries (default: 200).")
+    p.add_argument("--top-k", type=int, default=10, help="k for recall@k / MRR@k (default: 10).")
+    p.add_argument("--modes", type=_names, default=list(MODES), help=f"Subset of {MODES}.")
+    p.add_argument("--quantizations", type=_names, default=["float32", "int8"], help=f"Subset of {QUANTIZATIONS}.")
+    p.add_argument("--nprobe", type=_ints, default=[4, 16], help="ann nprobe values (default: 4,16).")
+    p.add_argument("--nlist", type=int, help="IVF lists (default: ~4*sqrt(N)).")
+    p.add_argument("--candidates", type=_ints, default=[200, 1000], help="hybrid candidate pools (default: 200,1000).")
+    p.add_argument(
+        "--embedding-model",
+        default="hashing",
+        help="'hashing[:DIM]' (deterministic, offline; default) or a SentenceTransformer name.",
+    )
+    p.add_argument("--seed", type=int, default=13, help="Corpus seed.")
+    p.add_argument("--output", default="-", help="JSON-lines result file (default: stdout).")
+    p.add_argument("--baseline", help="Earlier result file to compare queries/sec and recall against.")
+    p.add_argument("--tolerance", type=float, default=0.10, help="Allowed queries/sec drop vs baseline (default: 0.10).")
+
+    args = p.parse_args(argv)
+    for name, chosen, allowed in (("modes", args.modes, MODES), ("quantizations", args.quantizations, QUANTIZATIONS)):
+        unknown = set(chosen) - set(allowed)
+        if unknown:
+            p.error(f"Unknown {name}: {sorted(unknown)}")
+
+    env = {"python": platform.python_version(), "machine": platform.machine(), "timestamp": time.time()}
+    results = run_benchmark(
+        args.docs,
+        args.queries,
+        top_k=args.top_k,
+        modes=args.modes,
+        quantizations=args.quantizations,
+        nprobes=args.nprobe,
+        candidates=args.candidates,
+        nlist=args.nlist,
+        embedding_model=args.embedding_model,
+        seed=args.seed,
+    )
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for r in results:
+            r.update(env)
+            out.write(json.dumps(r) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = [json.loads(line) for line in f if line.strip()]
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
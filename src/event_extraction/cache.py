@@ -0,0 +1,175 @@
+"""Content-addressed, size-bounded on-disk result cache (SQLite).
+
+Keys are SHA-256 hashes of the normalised input text plus a *namespace*
+string describing everything else the result depends on (model version,
+event taxonomy, ...), so a cached entry can never be served for a different
+configuration. Values are JSON. When the cache holds more than
+``max_entries`` rows the least recently used ones are evicted.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Optional, Tuple
+
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for hashing: NFC, collapsed whitespace, stripped.
+
+    Case is kept on purpose: NER output depends on it.
+    """
+    return _WS.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def fingerprint(obj: Any) -> str:
+    """Short stable hash of any JSON-serialisable value."""
+    raw = json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class ResultCache:
+    """LRU-evicting key/value cache stored in a single SQLite file.
+
+    Puts and access-time updates are buffered in memory and written in one
+    short transaction every ``commit_every`` writes or on :meth:`flush`, so no
+    write lock is held while the caller computes; several processes can share
+    one file.
+
+    Args:
+        path: SQLite file (created if missing); ``":memory:"`` for a throwaway cache.
+        max_entries: Upper bound on stored rows; least recently used rows go first.
+        commit_every: Buffered writes are committed in groups of this many.
+    """
+
+    def __init__(self, path: str, *, max_entries: int = 1_000_000, commit_every: int = 256):
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.path = path
+        self.max_entries = max_entries
+        self.commit_every = commit_every
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._puts: Dict[str, Tuple[str, float]] = {}
+        self._touches: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        # autocommit: reads never leave a transaction open; _commit opens its own
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, atime REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_atime ON entries (atime)")
+        # running row count, kept up to date by _commit; recounted only when
+        # another connection has written to the file in the meantime
+        self._count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    @staticmethod
+    def key(text: str, namespace: str) -> str:
+        h = hashlib.sha256()
+        h.update(namespace.encode("utf-8"))
+        h.update(b"\0")
+        h.update(normalize_text(text).encode("utf-8"))
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            pending = self._puts.get(key)
+            if pending is not None:
+                self.hits += 1
+                self._puts[key] = (pending[0], time.time())
+                return json.loads(pending[0])
+            row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touches[key] = time.time()
+            self._after_write()
+            return json.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._puts[key] = (json.dumps(value, ensure_ascii=False), time.time())
+            self._touches.pop(key, None)
+            self._after_write()
+
+    def _after_write(self) -> None:
+        if len(self._puts) + len(self._touches) >= self.commit_every:
+            self._commit()
+
+    def _commit(self) -> None:
+        puts, touches = self._puts, self._touches
+        self._puts, self._touches = {}, {}
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            (version,) = self._conn.execute("PRAGMA data_version").fetchone()
+            count = self._count
+            if version != self._data_version:
+                (count,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+            rows = [(key, value, atime) for key, (value, atime) in puts.items()]
+            count += self._conn.executemany(
+                "INSERT OR IGNORE INTO entries (key, value, atime) VALUES (?, ?, ?)", rows
+            ).rowcount
+            self._conn.executemany(
+                "UPDATE entries SET value = ?, atime = ? WHERE key = ?",
+                [(value, atime, key) for key, value, atime in rows],
+            )
+            self._conn.executemany(
+                "UPDATE entries SET atime = ? WHERE key = ?", [(atime, key) for key, atime in touches.items()]
+            )
+            excess = count - self.max_entries
+            if excess > 0:
+                evicted = self._conn.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY atime LIMIT ?)",
+                    (excess,),
+                ).rowcount
+                count -= evicted
+                self.evictions += evicted
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._count = count
+        self._data_version = version
+
+    def flush(self) -> None:
+        """Write buffered puts and access times in one transaction and enforce ``max_entries``."""
+        with self._lock:
+            self._commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._commit()
+            return self._count
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+        }
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
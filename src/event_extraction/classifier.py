@@ -0,0 +1,170 @@
+"""Fit-once TF-IDF event classifier.
+
+The vectorizer is fitted a single time on a reference corpus plus the event
+taxonomy and saved to disk; inference only calls ``transform``, so a headline
+scores the same no matter which batch it arrives in.
+
+Fit a model from a text file (one document per line):
+
+    python -m src.event_extraction.classifier --corpus headlines.txt --out events.joblib
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import pickle
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+
+_FORMAT_VERSION = 1
+
+
+class EventClassifier:
+    """Assign each text the most similar phrase of an event taxonomy."""
+
+    def __init__(self, event_phrases: List[str], *, stop_words: Optional[str] = "english"):
+        if not event_phrases:
+            raise ValueError("event_phrases must not be empty.")
+        self.event_phrases = list(event_phrases)
+        self.vectorizer = TfidfVectorizer(stop_words=stop_words)
+        self.event_vectors = None
+        self._event_vectors_t = None
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.event_vectors is not None
+
+    def fit(self, corpus: Iterable[str]) -> "EventClassifier":
+        """Fit the vocabulary/IDF on ``corpus`` + the event phrases."""
+        self.vectorizer.fit(list(corpus) + self.event_phrases)
+        self.event_vectors = self.vectorizer.transform(self.event_phrases)
+        self._event_vectors_t = None
+        return self
+
+    def _check_fitted(self) -> None:
+        if not self.is_fitted:
+            raise RuntimeError("EventClassifier is not fitted; call fit() or load() first.")
+
+    def transform(self, texts: List[str]):
+        """TF-IDF vectors of ``texts`` (sparse, L2-normalised)."""
+        self._check_fitted()
+        return self.vectorizer.transform(texts)
+
+    def _score_chunks(self, texts: List[str], chunk_size: int) -> Iterator:
+        """Yield sparse (chunk x phrases) cosine-score matrices.
+
+        TF-IDF rows are L2-normalised, so the sparse dot product is the cosine
+        similarity; only non-zero scores are ever stored.
+        """
+        if self._event_vectors_t is None:
+            self._event_vectors_t = self.event_vectors.T.tocsc()
+        for start in range(0, len(texts), chunk_size):
+            yield (self.transform(texts[start : start + chunk_size]) @ self._event_vectors_t).tocsr()
+
+    def predict(self, texts: List[str], *, chunk_size: int = 4096) -> List[str]:
+        """Best-matching event phrase per text (first phrase if nothing overlaps)."""
+        out: List[str] = []
+        for scores in self._score_chunks(texts, chunk_size):
+            for row in range(scores.shape[0]):
+                lo, hi = scores.indptr[row], scores.indptr[row + 1]
+                best = 0
+                if hi > lo:
+                    data, cols = scores.data[lo:hi], scores.indices[lo:hi]
+                    # ties go to the lowest phrase index, like np.argmax
+                    best = int(cols[data == data.max()].min())
+                out.append(self.event_phrases[best])
+        return out
+
+    def top_k(
+        self,
+        texts: List[str],
+        k: int = 3,
+        *,
+        min_score: float = 0.0,
+        chunk_size: int = 4096,
+    ) -> List[List[Tuple[str, float]]]:
+        """Up to ``k`` ``(phrase, score)`` pairs per text, best first.
+
+        Only phrases with a non-zero score >= ``min_score`` are returned. The
+        scores are computed chunk by chunk as sparse products, so the dense
+        texts x phrases matrix is never built.
+        """
+        if k < 1:
+            raise ValueError("k must be >= 1")
+        out: List[List[Tuple[str, float]]] = []
+        for scores in self._score_chunks(texts, chunk_size):
+            for row in range(scores.shape[0]):
+                lo, hi = scores.indptr[row], scores.indptr[row + 1]
+                data, cols = scores.data[lo:hi], scores.indices[lo:hi]
+                keep = data >= min_score
+                data, cols = data[keep], cols[keep]
+                if len(data) > k:
+                    part = np.argpartition(-data, k - 1)[:k]
+                    data, cols = data[part], cols[part]
+                order = np.lexsort((cols, -data))
+                out.append([(self.event_phrases[int(cols[i])], float(data[i])) for i in order])
+        return out
+
+    @property
+    def fingerprint(self) -> str:
+        """Stable hash of the fitted vocabulary, IDF weights and taxonomy."""
+        self._check_fitted()
+        h = hashlib.sha256()
+        h.update(pickle.dumps(sorted(self.vectorizer.vocabulary_.items())))
+        h.update(np.asarray(self.vectorizer.idf_).tobytes())
+        h.update("\n".join(self.event_phrases).encode("utf-8"))
+        return h.hexdigest()[:16]
+
+    def save(self, path: str) -> None:
+        self._check_fitted()
+        joblib.dump(
+            {
+                "format_version": _FORMAT_VERSION,
+                "event_phrases": self.event_phrases,
+                "vectorizer": self.vectorizer,
+                "event_vectors": self.event_vectors,
+            },
+            path,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "EventClassifier":
+        state = joblib.load(path)
+        if state.get("format_version") != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported EventClassifier file format in '{path}'.")
+        clf = cls.__new__(cls)
+        clf.event_phrases = state["event_phrases"]
+        clf.vectorizer = state["vectorizer"]
+        clf.event_vectors = state["event_vectors"]
+        clf._event_vectors_t = None
+        return clf
+
+
+def _read_lines(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from src.event_extraction.event_extraction import DEFAULT_EVENT_PHRASES
+
+    p = argparse.ArgumentParser(description="Fit and save an EventClassifier.")
+    p.add_argument("--corpus", required=True, help="Reference corpus, one text per line.")
+    p.add_argument("--phrases", help="Event taxonomy, one phrase per line (default: built-in phrases).")
+    p.add_argument("--out", required=True, help="Where to write the fitted model (joblib).")
+
+    args = p.parse_args(argv)
+
+    phrases = _read_lines(args.phrases) if args.phrases else DEFAULT_EVENT_PHRASES
+    clf = EventClassifier(phrases).fit(_read_lines(args.corpus))
+    clf.save(args.out)
+    print(f"Saved EventClassifier ({len(clf.event_phrases)} phrases, fingerprint {clf.fingerprint}) to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,115 +1,262 @@
 from __future__ import annotations
 
 import argparse
-import re
-from typing import Dict, List, Optional
+import sys
+from collections import deque
+from itertools import tee
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
-import numpy as np
 import pandas as pd
-import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+
+from src.event_extraction import stream_io
+from src.event_extraction.cache import ResultCache, fingerprint
+from src.event_extraction.classifier import EventClassifier
+from src.event_extraction.keyword_matcher import matcher_for
+from src.event_extraction.nlp_registry import get_nlp, load_report
 
 
 def _load_spacy(model: str = "en_core_web_sm"):
-    """Load spaCy model with a friendlier error message."""
+    """Return the shared NER-only pipeline for ``model`` (loaded once per process)."""
+    return get_nlp(model, task="ner")
+
+
+def _gpe_entities(doc) -> List[str]:
+    """Return the sorted, de-duplicated GPE entity texts of a spaCy Doc."""
+    return sorted({ent.text for ent in doc.ents if ent.label_ == "GPE"})
+
+
+DEFAULT_EVENT_PHRASES = [
+    "explosion",
+    "earthquake",
+    "protest",
+    "flood",
+    "wildfire",
+    "storm",
+    "attack",
+    "shooting",
+    "strike",
+    "evacuation",
+]
+
+
+def _check_taxonomy(event_phrases: Optional[List[str]], classifier: Optional[EventClassifier]) -> None:
+    if classifier is not None and event_phrases is not None and list(event_phrases) != classifier.event_phrases:
+        raise ValueError("event_phrases differ from the taxonomy the classifier was fitted on.")
+
+
+def _resolve_classifier(
+    texts: List[str],
+    event_phrases: Optional[List[str]],
+    classifier: Optional[EventClassifier],
+) -> EventClassifier:
+    if classifier is not None:
+        return classifier
+
+    # no persisted model: fit an ad-hoc one on this batch (scores depend on the batch)
+    return EventClassifier(event_phrases or DEFAULT_EVENT_PHRASES).fit(texts)
+
+
+def _model_version(nlp, spacy_model: str) -> str:
+    meta = nlp.meta
+    return f"{spacy_model}|{meta.get('name')}-{meta.get('version')}|{','.join(nlp.pipe_names)}"
+
+
+def _through_cache(
+    texts: Iterable[str],
+    cache: ResultCache,
+    namespace: str,
+    compute: Callable[[Iterable[str]], Iterator[Dict]],
+) -> Iterator[Dict]:
+    """Serve cached results and run ``compute`` only on the misses, keeping input order.
+
+    ``compute`` receives a lazy iterable of the missed texts and must yield one
+    result per text, in order.
+    """
+    slots: Deque[Tuple[str, str, Optional[Dict]]] = deque()
+
+    def misses() -> Iterator[str]:
+        for text in texts:
+            key = cache.key(text, namespace)
+            cached = cache.get(key)
+            slots.append((text, key, cached))
+            if cached is None:
+                yield text
+
+    def drain_hits() -> Iterator[Dict]:
+        while slots and slots[0][2] is not None:
+            text, _, cached = slots.popleft()
+            yield {"headline": text, **cached}
+
     try:
-        return spacy.load(model)
-    except OSError as e:
-        raise SystemExit(
-            f"spaCy model '{model}' not found. Install it with:\n\n"
-            f"  python -m spacy download {model}\n"
-        ) from e
+        for result in compute(misses()):
+            yield from drain_hits()
+            _, key, _ = slots.popleft()
+            cache.put(key, {k: v for k, v in result.items() if k != "headline"})
+            yield result
+        yield from drain_hits()
+    finally:
+        cache.flush()
+
+
+def iter_events_semantic(
+    texts: List[str],
+    event_phrases: Optional[List[str]] = None,
+    *,
+    classifier: Optional[EventClassifier] = None,
+    cache: Optional[ResultCache] = None,
+    top_k: Optional[int] = None,
+    min_score: float = 0.0,
+    spacy_model: str = "en_core_web_sm",
+    batch_size: int = 256,
+    n_process: int = 1,
+) -> Iterator[Dict]:
+    """Lazy variant of :func:`extract_events_semantic`.
+
+    Events are scored once over all ``texts``; NER then streams through
+    ``nlp.pipe`` and one result is yielded per text, in input order.
+    """
+    if not texts:
+        return
+
+    _check_taxonomy(event_phrases, classifier)
+    nlp = _load_spacy(spacy_model)
+
+    def compute(batch: Iterable[str]) -> Iterator[Dict]:
+        batch = list(batch)
+        if not batch:
+            return
+        clf = _resolve_classifier(batch, event_phrases, classifier)
+        events = clf.predict(batch)
+        ranked = clf.top_k(batch, top_k, min_score=min_score) if top_k else None
+        docs = nlp.pipe(batch, batch_size=batch_size, n_process=n_process)
+        for i, (text, event, doc) in enumerate(zip(batch, events, docs)):
+            result = {
+                "headline": text,
+                "event": event,
+                "entities": _gpe_entities(doc),
+            }
+            if ranked is not None:
+                result["top_events"] = [{"event": e, "score": round(sc, 6)} for e, sc in ranked[i]]
+            yield result
+
+    if cache is None or classifier is None:
+        # an ad-hoc classifier's scores depend on the batch it was fitted on
+        yield from compute(texts)
+        return
+
+    scorer = f"clf:{classifier.fingerprint}"
+    namespace = f"semantic|{_model_version(nlp, spacy_model)}|{scorer}|top{top_k}>={min_score}"
+    yield from _through_cache(texts, cache, namespace, compute)
 
 
 def extract_events_semantic(
     texts: List[str],
     event_phrases: Optional[List[str]] = None,
     *,
+    classifier: Optional[EventClassifier] = None,
+    cache: Optional[ResultCache] = None,
+    top_k: Optional[int] = None,
+    min_score: float = 0.0,
     spacy_model: str = "en_core_web_sm",
+    batch_size: int = 256,
+    n_process: int = 1,
 ) -> List[Dict]:
     """Detect event-like phrases using TF-IDF similarity + extract GPE entities via spaCy.
 
     Args:
         texts: Input strings (headlines, short texts).
         event_phrases: Canonical event phrases to match against (defaults provided).
+        classifier: Pre-fitted EventClassifier; without one, TF-IDF is fitted
+            on ``texts`` + ``event_phrases`` for this call only.
+        cache: Optional ResultCache; texts seen before (same model and
+            classifier) skip TF-IDF and NER entirely. Only used together with
+            ``classifier``: ad-hoc scores depend on the batch and are not cached.
+        top_k: Also return the ``top_k`` best events with scores as ``top_events``.
+        min_score: Drop ``top_events`` entries scoring below this.
         spacy_model: spaCy model name for NER.
+        batch_size: Number of texts per ``nlp.pipe`` batch.
+        n_process: Worker processes used by ``nlp.pipe`` (1 = in-process).
 
     Returns:
         List of dicts with headline, predicted event, and extracted entities.
     """
-    if not texts:
-        return []
-
-    # default canonical event templates
-    if event_phrases is None:
-        event_phrases = [
-            "explosion",
-            "earthquake",
-            "protest",
-            "flood",
-            "wildfire",
-            "storm",
-            "attack",
-            "shooting",
-            "strike",
-            "evacuation",
-        ]
-
-    nlp = _load_spacy(spacy_model)
+    return list(
+        iter_events_semantic(
+            texts,
+            event_phrases,
+            classifier=classifier,
+            cache=cache,
+            top_k=top_k,
+            min_score=min_score,
+            spacy_model=spacy_model,
+            batch_size=batch_size,
+            n_process=n_process,
+        )
+    )
 
-    vectorizer = TfidfVectorizer(stop_words="english")
-    tfidf = vectorizer.fit_transform(texts + event_phrases)
 
-    text_vectors = tfidf[: len(texts)]
-    event_vectors = tfidf[len(texts) :]
+def iter_events_string_match(
+    texts: Iterable[str],
+    event_dict: Dict[str, str],
+    *,
+    cache: Optional[ResultCache] = None,
+    spacy_model: str = "en_core_web_sm",
+    batch_size: int = 256,
+    n_process: int = 1,
+) -> Iterator[Dict]:
+    """Lazy variant of :func:`extract_events_string_match`.
 
-    sims = cosine_similarity(text_vectors, event_vectors)
-    best_idx = np.argmax(sims, axis=1)
+    ``texts`` may be any iterable (e.g. a file being read); results are yielded
+    in input order as ``nlp.pipe`` produces them.
+    """
+    matcher = matcher_for(event_dict)
+    nlp = _load_spacy(spacy_model)
 
-    results: List[Dict] = []
-    for text, idx in zip(texts, best_idx):
-        doc = nlp(text)
-        gpes = sorted({ent.text for ent in doc.ents if ent.label_ == "GPE"})
-        results.append(
-            {
+    def compute(batch: Iterable[str]) -> Iterator[Dict]:
+        docs = nlp.pipe(batch, batch_size=batch_size, n_process=n_process)
+        for doc in docs:
+            text = doc.text
+            yield {
                 "headline": text,
-                "event": event_phrases[int(idx)],
-                "entities": gpes,
+                "events": matcher.match_labels(text),
+                "entities": _gpe_entities(doc),
             }
-        )
-    return results
+
+    if cache is None:
+        yield from compute(texts)
+        return
+
+    namespace = f"keywords|{_model_version(nlp, spacy_model)}|{fingerprint(sorted(event_dict.items()))}"
+    yield from _through_cache(texts, cache, namespace, compute)
 
 
 def extract_events_string_match(
     texts: List[str],
     event_dict: Dict[str, str],
     *,
+    cache: Optional[ResultCache] = None,
     spacy_model: str = "en_core_web_sm",
+    batch_size: int = 256,
+    n_process: int = 1,
 ) -> List[Dict]:
-    """Detect events by keyword regex matching + extract GPE entities via spaCy."""
+    """Detect events by whole-word keyword matching + extract GPE entities via spaCy.
+
+    All keywords of ``event_dict`` are found in a single scan per text with a
+    matcher that is built once per distinct dictionary.
+    """
     if not texts:
         return []
 
-    nlp = _load_spacy(spacy_model)
-
-    results: List[Dict] = []
-    for text in texts:
-        events: List[str] = []
-        for word, label in event_dict.items():
-            if re.search(rf"\b{re.escape(word)}\b", text.lower()):
-                events.append(label)
-
-        doc = nlp(text)
-        gpes = sorted({ent.text for ent in doc.ents if ent.label_ == "GPE"})
-        results.append(
-            {
-                "headline": text,
-                "events": sorted(set(events)),
-                "entities": gpes,
-            }
+    return list(
+        iter_events_string_match(
+            texts,
+            event_dict,
+            cache=cache,
+            spacy_model=spacy_model,
+            batch_size=batch_size,
+            n_process=n_process,
         )
-    return results
+    )
 
 
 def _demo():
@@ -132,25 +279,146 @@ def _demo():
     print("\nKeyword extraction:\n", pd.DataFrame(extract_events_string_match(headlines, event_keywords)))
 
 
+def _stream(args) -> int:
+    """Read ``args.input`` chunk by chunk and write results as each chunk finishes."""
+    in_fmt = stream_io.detect_format(args.input, args.input_format)
+    out_fmt = stream_io.detect_format(args.output, args.output_format)
+    if out_fmt == "txt":
+        out_fmt = "jsonl"
+
+    classifier = EventClassifier.load(args.classifier) if args.classifier else None
+    cache = ResultCache(args.cache, max_entries=args.cache_size) if args.cache and args.workers <= 1 else None
+
+    with stream_io.open_stream(args.input, "r") as fin, stream_io.open_stream(args.output, "w") as fout:
+        writer = stream_io.RecordWriter(fout, out_fmt)
+        records = stream_io.iter_records(fin, in_fmt, text_field=args.text_field, id_field=args.id_field)
+
+        if args.workers > 1:
+            from src.event_extraction.runner import run_parallel
+
+            for_ids, for_texts = tee(records)
+            results = run_parallel(
+                (text for _, text in for_texts),
+                classifier=classifier,
+                cache_path=args.cache,
+                cache_size=args.cache_size,
+                top_k=args.top_k,
+                min_score=args.min_score,
+                spacy_model=args.spacy_model,
+                workers=args.workers,
+                chunk_size=args.chunk_size,
+                batch_size=args.batch_size,
+            )
+            pairs = zip((rid for rid, _ in for_ids), results)
+        else:
+            pairs = (
+                (rid, result)
+                for chunk in stream_io.chunked(records, args.chunk_size)
+                for rid, result in zip(
+                    [rid for rid, _ in chunk],
+                    iter_events_semantic(
+                        [text for _, text in chunk],
+                        classifier=classifier,
+                        cache=cache,
+                        top_k=args.top_k,
+                        min_score=args.min_score,
+                        spacy_model=args.spacy_model,
+                        batch_size=args.batch_size,
+                        n_process=args.n_process,
+                    ),
+                )
+            )
+
+        for n, (rid, result) in enumerate(pairs, 1):
+            if args.id_field:
+                result = {"id": rid, **result}
+            writer.write(result)
+            if n % args.chunk_size == 0:
+                writer.flush()
+        writer.flush()
+
+    if cache is not None:
+        cache.flush()
+        if args.timings:
+            print(f"cache: {cache.stats()}", file=sys.stderr)
+        cache.close()
+    return 0
+
+
 def main(argv: Optional[List[str]] = None) -> int:
     p = argparse.ArgumentParser(description="Event extraction demos (semantic + keyword match).")
 
     p.add_argument("--demo", action="store_true", help="Run built-in demo headlines.")
     p.add_argument("--text", action="append", default=[], help="Add an input text/headline (repeatable).")
-
+    p.add_argument("--input", help="Stream texts from a JSONL/CSV/TXT file ('-' for stdin).")
+    p.add_argument("--output", default="-", help="Where to stream results in --input mode (default: stdout).")
+    p.add_argument("--input-format", choices=stream_io.FORMATS, help="Input format (default: from extension, else jsonl).")
+    p.add_argument("--output-format", choices=("jsonl", "csv"), help="Output format (default: from extension, else jsonl).")
+    p.add_argument("--text-field", default="text", help="JSONL key / CSV column holding the text (default: text).")
+    p.add_argument("--id-field", help="Optional JSONL key / CSV column copied to the output as 'id'.")
+    p.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1000,
+        help="Texts processed per chunk in --input mode (default: 1000). Without --classifier, TF-IDF is fitted per chunk.",
+    )
+
+    p.add_argument("--classifier", help="Path to a fitted EventClassifier (see src.event_extraction.classifier).")
     p.add_argument("--spacy-model", default="en_core_web_sm", help="spaCy model name (default: en_core_web_sm).")
+    p.add_argument("--batch-size", type=int, default=256, help="Texts per nlp.pipe batch (default: 256).")
+    p.add_argument("--n-process", type=int, default=1, help="Processes used by nlp.pipe (default: 1).")
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for --input mode, each with a warm model; output keeps input order (default: 1).",
+    )
+    p.add_argument("--top-k", type=int, help="Also report the K best-scoring events per text as top_events.")
+    p.add_argument("--min-score", type=float, default=0.0, help="Minimum score for top_events entries (default: 0).")
+    p.add_argument("--cache", help="SQLite result cache (needs --classifier); repeated texts skip all NLP work.")
+    p.add_argument("--cache-size", type=int, default=1_000_000, help="Max cached results, LRU-evicted (default: 1000000).")
+    p.add_argument("--timings", action="store_true", help="Print spaCy model load times (and cache stats) to stderr.")
 
     args = p.parse_args(argv)
 
+    if args.cache and not args.classifier:
+        p.error("--cache needs --classifier: ad-hoc scores depend on the batch they were fitted on.")
+
     if args.demo:
         _demo()
         return 0
 
-    if not args.text:
-        p.error("Provide --demo or at least one --text.")
+    if args.input:
+        rc = _stream(args)
+        if args.timings:
+            print(load_report(), file=sys.stderr)
+        return rc
 
-    df_sem = pd.DataFrame(extract_events_semantic(args.text, spacy_model=args.spacy_model))
+    if not args.text:
+        p.error("Provide --demo, --input or at least one --text.")
+
+    classifier = EventClassifier.load(args.classifier) if args.classifier else None
+    cache = ResultCache(args.cache, max_entries=args.cache_size) if args.cache else None
+
+    df_sem = pd.DataFrame(
+        extract_events_semantic(
+            args.text,
+            classifier=classifier,
+            cache=cache,
+            top_k=args.top_k,
+            min_score=args.min_score,
+            spacy_model=args.spacy_model,
+            batch_size=args.batch_size,
+            n_process=args.n_process,
+        )
+    )
     print(df_sem.to_string(index=False))
+    if args.timings:
+        print(load_report(), file=sys.stderr)
+        if cache is not None:
+            print(f"cache: {cache.stats()}", file=sys.stderr)
+    if cache is not None:
+        cache.close()
     return 0
 
 
@@ -0,0 +1,113 @@
+"""Minimal keep-alive HTTP/1.1 server with JSON bodies, shared by the long-running services.
+
+Stdlib only. Serves on a TCP port or a local Unix socket; subclasses of
+:class:`JsonHttpServer` route requests in :meth:`JsonHttpServer.dispatch`.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Dict, Optional, Tuple
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    method, path, _ = line.decode("latin-1").split(" ", 2)
+    headers: Dict[str, str] = {}
+    while True:
+        h = await reader.readline()
+        if h in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = h.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0) or 0))
+    return method, path, headers, body
+
+
+def _response(status: int, payload: Dict, keep_alive: bool) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+class JsonHttpServer:
+    """Minimal keep-alive HTTP/1.1 server with JSON bodies, on TCP or a Unix socket.
+
+    Subclasses implement :meth:`dispatch`; ``on_start``/``on_stop`` hooks run
+    around the listening socket's lifetime.
+    """
+
+    name = "JSON service"
+
+    def __init__(self, *, host: str = "127.0.0.1", port: int = 8080, unix_path: Optional[str] = None):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def address(self) -> str:
+        return f"unix:{self.unix_path}" if self.unix_path else f"http://{self.host}:{self.port}"
+
+    async def on_start(self) -> None:
+        pass
+
+    async def on_stop(self) -> None:
+        pass
+
+    async def start(self) -> None:
+        await self.on_start()
+        if self.unix_path:
+            self._server = await asyncio.start_unix_server(self._handle, self.unix_path)
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.on_stop()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        print(f"{self.name} listening on {self.address}")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Dict]:
+        raise NotImplementedError
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except (ValueError, asyncio.IncompleteReadError):
+                    writer.write(_response(400, {"error": "malformed request"}, keep_alive=False))
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                status, payload = await self.dispatch(method, path.split("?", 1)[0], body)
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,107 @@
+"""Single-pass multi-keyword matching (Aho-Corasick).
+
+Replaces one ``re.search(rf"\\b{re.escape(word)}\\b", text.lower())`` per
+keyword with one automaton built per dictionary and one scan per text.
+Hits are filtered with the same word-boundary rule as ``\\b``, and because
+every keyword is reported independently, overlapping keywords (e.g. "flood"
+and "flash flood") match exactly as they did with separate searches.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple
+
+
+def _is_word(ch: str) -> bool:
+    # same definition as the ``re`` module's Unicode ``\w``
+    return ch.isalnum() or ch == "_"
+
+
+def _at_boundary(text: str, pos: int) -> bool:
+    before = pos > 0 and _is_word(text[pos - 1])
+    after = pos < len(text) and _is_word(text[pos])
+    return before != after
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over the keys of a ``{keyword: label}`` dict.
+
+    Keywords are matched case-sensitively against the already-lowercased text,
+    mirroring the original per-keyword regex search.
+    """
+
+    def __init__(self, event_dict: Dict[str, str]):
+        self.keywords: List[str] = []
+        self.labels: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for word, label in event_dict.items():
+            if not word:
+                continue
+            self._add(word, len(self.keywords))
+            self.keywords.append(word)
+            self.labels.append(label)
+        self._link()
+        self._lengths = [len(k) for k in self.keywords]
+
+    def _add(self, word: str, kw_idx: int) -> None:
+        state = 0
+        for ch in word:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(kw_idx)
+
+    def _link(self) -> None:
+        # breadth-first so every fail target is finished before it is used
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt].extend(self._out[self._fail[nxt]])
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Yield ``(start, end, keyword_index)`` for every bounded hit in ``text``."""
+        goto, fail, out, lengths = self._goto, self._fail, self._out, self._lengths
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            end = i + 1
+            if not _at_boundary(text, end):
+                continue
+            for kw_idx in out[state]:
+                start = end - lengths[kw_idx]
+                if _at_boundary(text, start):
+                    yield start, end, kw_idx
+
+    def match_labels(self, text: str) -> List[str]:
+        """Sorted, de-duplicated labels of all keywords found in ``text.lower()``."""
+        return sorted({self.labels[kw_idx] for _, _, kw_idx in self.iter_matches(text.lower())})
+
+
+@lru_cache(maxsize=16)
+def _cached_matcher(items: Tuple[Tuple[str, str], ...]) -> KeywordMatcher:
+    return KeywordMatcher(dict(items))
+
+
+def matcher_for(event_dict: Dict[str, str]) -> KeywordMatcher:
+    """Return a (cached) matcher for ``event_dict``; built once per distinct dict."""
+    return _cached_matcher(tuple(event_dict.items()))
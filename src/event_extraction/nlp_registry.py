@@ -0,0 +1,140 @@
+"""Process-wide spaCy model registry.
+
+Every module asks for a pipeline via :func:`get_nlp` instead of calling
+``spacy.load`` itself, so each (model, task) pair is loaded once per process.
+A *task* names the components the caller actually needs; everything else is
+disabled so it costs no CPU per document.
+
+Disabled components are a property of the loaded ``Language``, so tasks that
+disable different components get separate copies of the model: a process
+that runs both NER and SVO extraction holds the model twice. Switching
+components per call instead (``select_pipes``) would mutate a pipeline that
+another thread may be running, and in practice a process needs one or the
+other (event extraction reads entities, the knowgraph builders parse).
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import spacy
+from spacy.language import Language
+
+
+# components each task can do without
+TASK_DISABLE: Dict[str, Tuple[str, ...]] = {
+    # event extraction only reads doc.ents
+    "ner": ("tagger", "morphologizer", "parser", "senter", "attribute_ruler", "lemmatizer"),
+    "full": (),
+}
+# tasks that need the same components as another one and share its pipeline:
+# SVO builders read POS, lemmas, dependencies, sentences and entity types
+# (arguments such as CARDINAL/DATE/MONEY tokens are kept by ent_type_ alone),
+# i.e. every component of the usual English models
+TASK_ALIASES: Dict[str, str] = {"svo": "full"}
+
+# embedding layers shared via listeners; dropped when nothing listens anymore
+_SHARED_LAYERS = ("tok2vec", "transformer")
+
+_lock = threading.Lock()
+_models: Dict[Tuple[str, str], Language] = {}
+_stats: Dict[Tuple[str, str], Dict] = {}
+
+
+def _prune(nlp: Language, task: str) -> List[str]:
+    disabled = [name for name in TASK_DISABLE[task] if name in nlp.pipe_names]
+    for name in disabled:
+        nlp.disable_pipe(name)
+
+    for name in _SHARED_LAYERS:
+        if name not in nlp.pipe_names:
+            continue
+        listeners = getattr(nlp.get_pipe(name), "listening_components", None)
+        if listeners is None:
+            continue
+        if not any(listener in nlp.pipe_names for listener in listeners):
+            nlp.disable_pipe(name)
+            disabled.append(name)
+    return disabled
+
+
+def _load(model: str, task: str) -> Language:
+    start = time.perf_counter()
+    try:
+        nlp = spacy.load(model)
+    except OSError as e:
+        raise SystemExit(
+            f"spaCy model '{model}' not found. Install it with:\n\n"
+            f"  python -m spacy download {model}\n"
+        ) from e
+    disabled = _prune(nlp, task)
+    _stats[(model, task)] = {
+        "load_seconds": time.perf_counter() - start,
+        "warmup_seconds": None,
+        "pipeline": list(nlp.pipe_names),
+        "disabled": disabled,
+    }
+    return nlp
+
+
+def get_nlp(model: str = "en_core_web_sm", task: str = "full", *, warm: bool = False) -> Language:
+    """Return the shared pipeline for ``model`` pruned for ``task``.
+
+    Args:
+        model: spaCy model name or path.
+        task: One of ``TASK_DISABLE`` ("ner", "full") or ``TASK_ALIASES`` ("svo",
+            the same pipeline as "full").
+        warm: Run a throwaway document through the pipeline on first load.
+    """
+    task = TASK_ALIASES.get(task, task)
+    if task not in TASK_DISABLE:
+        raise ValueError(f"Unknown task '{task}', expected one of {sorted({**TASK_DISABLE, **TASK_ALIASES})}.")
+
+    key = (model, task)
+    with _lock:
+        nlp = _models.get(key)
+        if nlp is None:
+            nlp = _models[key] = _load(model, task)
+    if warm:
+        warmup(model, task)
+    return nlp
+
+
+def warmup(model: str = "en_core_web_sm", task: str = "full") -> float:
+    """Push one short document through the pipeline so lazy init happens now.
+
+    Returns the warm-up time in seconds (0.0 if it already ran).
+    """
+    nlp = get_nlp(model, task)
+    stats = _stats[(model, TASK_ALIASES.get(task, task))]
+    if stats["warmup_seconds"] is not None:
+        return 0.0
+    start = time.perf_counter()
+    nlp("Warm-up sentence for the pipeline in Paris.")
+    stats["warmup_seconds"] = time.perf_counter() - start
+    return stats["warmup_seconds"]
+
+
+def load_stats() -> Dict[Tuple[str, str], Dict]:
+    """Load/warm-up timings and active components for every loaded pipeline."""
+    return {key: dict(value) for key, value in _stats.items()}
+
+
+def load_report() -> str:
+    """Human-readable one-line-per-pipeline summary of :func:`load_stats`."""
+    lines = []
+    for (model, task), s in sorted(_stats.items()):
+        warm = f", warm-up {s['warmup_seconds']:.3f}s" if s["warmup_seconds"] is not None else ""
+        lines.append(
+            f"{model} [{task}]: loaded in {s['load_seconds']:.3f}s{warm}; "
+            f"pipeline={s['pipeline']} disabled={s['disabled']}"
+        )
+    return "\n".join(lines)
+
+
+def clear() -> None:
+    """Forget all loaded pipelines (mainly for tests)."""
+    with _lock:
+        _models.clear()
+        _stats.clear()
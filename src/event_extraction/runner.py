@@ -0,0 +1,118 @@
+"""Sharded multi-process runner for :func:`iter_events_semantic`.
+
+The input stream is cut into chunks and fanned out to a pool of worker
+processes, each holding a warm spaCy pipeline (and classifier). Results come
+back in input order. At most ``max_pending`` chunks are in flight at any time,
+and the input is only pulled as results are consumed, so a slow consumer
+throttles the whole pipeline instead of letting queues grow without bound.
+"""
+from __future__ import annotations
+
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
+
+from src.event_extraction.cache import ResultCache
+from src.event_extraction.classifier import EventClassifier
+from src.event_extraction.event_extraction import iter_events_semantic
+from src.event_extraction.nlp_registry import get_nlp
+from src.event_extraction.stream_io import chunked
+
+
+# per-worker state, set once by _init_worker
+_worker: Dict = {}
+
+
+def _init_worker(
+    spacy_model: str,
+    classifier: Optional[EventClassifier],
+    event_phrases: Optional[List[str]],
+    batch_size: int,
+    cache_path: Optional[str],
+    cache_size: int,
+    top_k: Optional[int],
+    min_score: float,
+) -> None:
+    get_nlp(spacy_model, task="ner", warm=True)
+    _worker.update(
+        spacy_model=spacy_model,
+        classifier=classifier,
+        cache=ResultCache(cache_path, max_entries=cache_size) if cache_path else None,
+        event_phrases=event_phrases,
+        batch_size=batch_size,
+        top_k=top_k,
+        min_score=min_score,
+    )
+
+
+def _extract_chunk(texts: List[str]) -> List[Dict]:
+    return list(
+        iter_events_semantic(
+            texts,
+            _worker["event_phrases"],
+            classifier=_worker["classifier"],
+            cache=_worker["cache"],
+            top_k=_worker["top_k"],
+            min_score=_worker["min_score"],
+            spacy_model=_worker["spacy_model"],
+            batch_size=_worker["batch_size"],
+        )
+    )
+
+
+def run_parallel(
+    texts: Iterable[str],
+    event_phrases: Optional[List[str]] = None,
+    *,
+    classifier: Optional[EventClassifier] = None,
+    cache_path: Optional[str] = None,
+    cache_size: int = 1_000_000,
+    top_k: Optional[int] = None,
+    min_score: float = 0.0,
+    spacy_model: str = "en_core_web_sm",
+    workers: Optional[int] = None,
+    chunk_size: int = 500,
+    max_pending: Optional[int] = None,
+    batch_size: int = 256,
+) -> Iterator[Dict]:
+    """Run semantic extraction over ``texts`` on a process pool.
+
+    Args:
+        texts: Any iterable of strings; it is consumed lazily.
+        event_phrases: Event taxonomy (ignored in favour of ``classifier``'s if given).
+        classifier: Fitted EventClassifier shipped once to every worker. Without
+            one, each chunk gets its own ad-hoc TF-IDF fit, as in a direct call.
+        cache_path: Optional SQLite ResultCache file, opened by every worker.
+        cache_size: Max entries kept in that cache.
+        top_k: Also return the ``top_k`` best events per text (see extract_events_semantic).
+        min_score: Minimum score for those ``top_events`` entries.
+        spacy_model: spaCy model name or path, loaded once per worker.
+        workers: Number of worker processes (default: CPU count).
+        chunk_size: Texts per task sent to a worker.
+        max_pending: Chunks allowed in flight (default: 2 x workers).
+        batch_size: ``nlp.pipe`` batch size inside each worker.
+
+    Yields:
+        One result dict per input text, in input order.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    if max_pending < 1:
+        raise ValueError("max_pending must be >= 1")
+
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(spacy_model, classifier, event_phrases, batch_size, cache_path, cache_size, top_k, min_score),
+    )
+    pending: Deque[Future] = deque()
+    try:
+        for chunk in chunked(texts, chunk_size):
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+            pending.append(executor.submit(_extract_chunk, chunk))
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
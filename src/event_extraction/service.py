@@ -0,0 +1,267 @@
+"""Long-running micro-batching HTTP service for event extraction.
+
+Concurrent requests are queued and grouped into micro-batches that are closed
+either when ``max_batch_size`` texts are waiting or ``max_wait_ms`` after the
+first text of the batch arrived, whichever comes first. Each batch is run as
+one :func:`extract_events_semantic` call on a warm model and one classifier
+loaded (or fitted) at startup, and every request gets back its own slice of
+the results.
+
+    python -m src.event_extraction.service --port 8080 --classifier events.joblib
+
+Endpoints (stdlib-only HTTP/1.1, JSON bodies):
+
+- ``POST /extract``  ``{"text": "..."}`` or ``{"texts": [...]}`` -> ``{"results": [...]}``
+- ``GET /stats``     queue depth, batch-size histogram, counters
+- ``GET /healthz``   ``{"ok": true}``
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.event_extraction.http_server import JsonHttpServer
+
+
+class QueueFull(Exception):
+    """Raised when a request would push the queue past ``max_queue`` texts."""
+
+
+class MicroBatcher:
+    """Group concurrently submitted texts into batches by size or deadline.
+
+    Args:
+        process_batch: Blocking function mapping a list of texts to one result each.
+            It runs in a single background thread, so models are never used
+            concurrently.
+        max_batch_size: Close a batch as soon as this many texts are waiting.
+        max_wait_ms: Close a batch this long after its first text arrived.
+        max_queue: Reject new texts (QueueFull) once this many are waiting.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[str]], List[Any]],
+        *,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 10.0,
+        max_queue: int = 10_000,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="microbatch")
+        self.histogram: Dict[int, int] = {}
+        self.batches = 0
+        self.texts = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=True)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, texts: List[str]) -> List[Any]:
+        """Queue ``texts`` and wait for their results (in the same order)."""
+        if self._queue is None:
+            raise RuntimeError("MicroBatcher.start() has not been awaited.")
+        if self.queue_depth + len(texts) > self.max_queue:
+            self.rejected += 1
+            raise QueueFull(f"queue holds {self.queue_depth} texts (limit {self.max_queue})")
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            fut = loop.create_future()
+            self._queue.put_nowait((text, fut))
+            futures.append(fut)
+        return list(await asyncio.gather(*futures))
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            texts = [text for text, _ in batch]
+            start = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self._executor, self.process_batch, texts)
+                if len(results) != len(texts):
+                    raise RuntimeError(f"process_batch returned {len(results)} results for {len(texts)} texts")
+            except Exception as e:  # fail every request in the batch, keep serving
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            finally:
+                self.busy_seconds += time.perf_counter() - start
+                self.batches += 1
+                self.texts += len(texts)
+                bucket = 1 << (len(texts) - 1).bit_length()
+                self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+            for (_, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.queue_depth,
+            "batches": self.batches,
+            "texts": self.texts,
+            "rejected_requests": self.rejected,
+            "mean_batch_size": (self.texts / self.batches) if self.batches else 0.0,
+            "busy_seconds": round(self.busy_seconds, 3),
+            # key = upper bound of a power-of-two bucket (batch sizes <= key)
+            "batch_size_histogram": {str(k): v for k, v in sorted(self.histogram.items())},
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
+
+
+class ExtractionServer(JsonHttpServer):
+    """HTTP front-end around a :class:`MicroBatcher`."""
+
+    name = "Event extraction service"
+
+    def __init__(self, batcher: MicroBatcher, *, host: str = "127.0.0.1", port: int = 8080):
+        super().__init__(host=host, port=port)
+        self.batcher = batcher
+
+    async def on_start(self) -> None:
+        await self.batcher.start()
+
+    async def on_stop(self) -> None:
+        await self.batcher.stop()
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Dict]:
+        if path == "/healthz":
+            return 200, {"ok": True}
+        if path == "/stats":
+            return 200, self.batcher.stats()
+        if path != "/extract":
+            return 404, {"error": f"unknown path {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            payload = json.loads(body or b"{}")
+            if not isinstance(payload, dict):
+                raise TypeError("body must be a JSON object")
+            texts = payload["texts"] if "texts" in payload else [payload["text"]]
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise TypeError("texts must be a list of strings")
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"error": f"expected {{'text': str}} or {{'texts': [str]}}: {e}"}
+        try:
+            return 200, {"results": await self.batcher.submit(texts)}
+        except QueueFull as e:
+            return 503, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": repr(e)}
+
+
+def startup_classifier(path: Optional[str] = None, fit_corpus: Optional[str] = None):
+    """The one EventClassifier every micro-batch is scored with.
+
+    Loaded from ``path`` when given; otherwise fitted once on the built-in
+    event phrases plus ``fit_corpus`` (one text per line), so a text's scores
+    never depend on the other texts that happened to share its batch.
+    """
+    from src.event_extraction.classifier import EventClassifier, _read_lines
+    from src.event_extraction.event_extraction import DEFAULT_EVENT_PHRASES
+
+    if path:
+        return EventClassifier.load(path)
+    return EventClassifier(DEFAULT_EVENT_PHRASES).fit(_read_lines(fit_corpus) if fit_corpus else [])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from src.event_extraction.cache import ResultCache
+    from src.event_extraction.event_extraction import extract_events_semantic
+    from src.event_extraction.nlp_registry import get_nlp, load_report
+
+    p = argparse.ArgumentParser(description="Micro-batching HTTP service for event extraction.")
+    p.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1).")
+    p.add_argument("--port", type=int, default=8080, help="Port (default: 8080).")
+    p.add_argument("--classifier", help="Path to a fitted EventClassifier (recommended).")
+    p.add_argument(
+        "--fit-corpus",
+        help="Without --classifier: texts (one per line) to fit the startup classifier on (default: event phrases only).",
+    )
+    p.add_argument("--spacy-model", default="en_core_web_sm", help="spaCy model name (default: en_core_web_sm).")
+    p.add_argument("--cache", help="Optional SQLite result cache.")
+    p.add_argument("--max-batch-size", type=int, default=64, help="Max texts per micro-batch (default: 64).")
+    p.add_argument("--max-wait-ms", type=float, default=10.0, help="Max time a text waits for its batch to fill (default: 10).")
+    p.add_argument("--max-queue", type=int, default=10_000, help="Reject requests beyond this many queued texts (default: 10000).")
+
+    args = p.parse_args(argv)
+
+    if args.fit_corpus and args.classifier:
+        p.error("--fit-corpus only applies without --classifier.")
+    classifier = startup_classifier(args.classifier, args.fit_corpus)
+    cache = ResultCache(args.cache) if args.cache else None
+    get_nlp(args.spacy_model, task="ner", warm=True)
+    print(load_report())
+
+    def process_batch(texts: List[str]) -> List[Dict]:
+        return extract_events_semantic(
+            texts,
+            classifier=classifier,
+            cache=cache,
+            spacy_model=args.spacy_model,
+            batch_size=args.max_batch_size,
+        )
+
+    batcher = MicroBatcher(
+        process_batch,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        max_queue=args.max_queue,
+    )
+    server = ExtractionServer(batcher, host=args.host, port=args.port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
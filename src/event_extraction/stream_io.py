@@ -0,0 +1,114 @@
+"""Chunked JSONL/CSV/plain-text readers and writers for the extraction CLI.
+
+Everything here streams: input is read record by record, grouped into
+fixed-size chunks, and results are written (and flushed) as soon as a chunk
+is done, so memory stays constant no matter how large the input is.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import os
+import sys
+from contextlib import contextmanager
+from itertools import islice
+from typing import Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+
+FORMATS = ("jsonl", "csv", "txt")
+
+_EXTENSIONS = {
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".json": "jsonl",
+    ".csv": "csv",
+    ".txt": "txt",
+}
+
+
+def detect_format(path: str, explicit: Optional[str] = None) -> str:
+    """Use ``explicit`` if given, else the file extension, else JSONL."""
+    if explicit:
+        return explicit
+    return _EXTENSIONS.get(os.path.splitext(path)[1].lower(), "jsonl")
+
+
+@contextmanager
+def open_stream(path: str, mode: str):
+    """Open ``path`` for text I/O; ``-`` means stdin/stdout."""
+    if path == "-":
+        yield sys.stdin if "r" in mode else sys.stdout
+        return
+    with open(path, mode, encoding="utf-8", newline="") as f:
+        yield f
+
+
+def iter_records(
+    fp: IO[str],
+    fmt: str,
+    *,
+    text_field: str = "text",
+    id_field: Optional[str] = None,
+) -> Iterator[Tuple[Optional[str], str]]:
+    """Yield ``(id, text)`` pairs, skipping records with an empty text."""
+    if fmt == "jsonl":
+        rows: Iterable[Dict] = (json.loads(line) for line in fp if line.strip())
+    elif fmt == "csv":
+        rows = csv.DictReader(fp)
+    elif fmt == "txt":
+        rows = ({text_field: line.rstrip("\r\n")} for line in fp)
+    else:
+        raise ValueError(f"Unknown input format '{fmt}', expected one of {FORMATS}.")
+
+    for row in rows:
+        text = (row.get(text_field) or "").strip()
+        if not text:
+            continue
+        yield (row.get(id_field) if id_field else None), text
+
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    """Group ``items`` into lists of at most ``size`` elements."""
+    if size < 1:
+        raise ValueError("chunk size must be >= 1")
+    it = iter(items)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _csv_cell(value):
+    if isinstance(value, (list, tuple)):
+        if all(isinstance(v, str) for v in value):
+            return ";".join(value)
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+class RecordWriter:
+    """Write result dicts as JSONL or CSV.
+
+    In CSV, lists of strings are joined with ``;`` and other nested values are
+    JSON-encoded.
+    """
+
+    def __init__(self, fp: IO[str], fmt: str):
+        if fmt not in ("jsonl", "csv"):
+            raise ValueError(f"Unknown output format '{fmt}', expected 'jsonl' or 'csv'.")
+        self.fp = fp
+        self.fmt = fmt
+        self._csv: Optional[csv.DictWriter] = None
+
+    def write(self, record: Dict) -> None:
+        if self.fmt == "jsonl":
+            self.fp.write(json.dumps(record, ensure_ascii=False) + "\n")
+            return
+        if self._csv is None:
+            self._csv = csv.DictWriter(self.fp, fieldnames=list(record))
+            self._csv.writeheader()
+        self._csv.writerow({k: _csv_cell(v) for k, v in record.items()})
+
+    def flush(self) -> None:
+        self.fp.flush()
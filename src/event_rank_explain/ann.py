@@ -0,0 +1,185 @@
+"""Approximate nearest-neighbour search (IVF, NumPy only, CPU).
+
+An inverted-file index clusters the normalised corpus embeddings with
+spherical k-means into ``nlist`` lists. A query is compared with the
+centroids, only the ``nprobe`` closest lists are scored, and the top-k is
+selected with ``argpartition`` over that candidate set. Optionally the best
+``rerank`` candidates are re-scored exactly against the float32 rows.
+
+Tuning: larger ``nlist`` = smaller lists (faster, lower recall per probe);
+larger ``nprobe`` = more lists scored (slower, higher recall).
+
+Rows added after the lists were built are kept in a delta: one list id per
+appended row in ``ivf_delta.i32``, appended to in place. :meth:`IVFIndex.keep`
+folds the delta back into the lists.
+"""
+from __future__ import annotations
+
+import os
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from src.event_rank_explain.scoring import rank_candidates
+
+
+IVF_FILE = "ivf.npz"
+IVF_DELTA_FILE = "ivf_delta.i32"
+
+
+def _normalize_rows(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=1, keepdims=True)
+    return x / np.where(norms == 0, 1.0, norms)
+
+
+def _assign(embeddings: np.ndarray, centroids: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+    """Nearest centroid (max inner product) per row, computed chunk by chunk."""
+    out = np.empty(len(embeddings), dtype=np.int32)
+    for start in range(0, len(embeddings), chunk_size):
+        block = np.asarray(embeddings[start : start + chunk_size], dtype=np.float32)
+        out[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+
+def default_nlist(n: int) -> int:
+    return int(max(1, min(n, round(4 * np.sqrt(n)))))
+
+
+class IVFIndex:
+    """Centroids plus inverted lists of row ids, stored CSR-style.
+
+    ``delta_labels`` holds the list id of each row appended since, starting
+    at row ``len(rows)``.
+    """
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        offsets: np.ndarray,
+        rows: np.ndarray,
+        delta_labels: Optional[np.ndarray] = None,
+    ):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.rows = rows
+        self.delta_labels = np.empty(0, dtype=np.int32) if delta_labels is None else delta_labels
+
+    def __len__(self) -> int:
+        return len(self.rows) + len(self.delta_labels)
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(
+        cls,
+        embeddings: np.ndarray,
+        nlist: Optional[int] = None,
+        *,
+        iters: int = 20,
+        sample_size: int = 100_000,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """Spherical k-means on a sample of ``embeddings``, then assign every row."""
+        n = len(embeddings)
+        if n == 0:
+            raise ValueError("Cannot build an IVF index over zero rows.")
+        nlist = min(nlist or default_nlist(n), n)
+        rng = np.random.default_rng(seed)
+
+        sample_idx = np.sort(rng.choice(n, size=min(n, max(sample_size, nlist)), replace=False))
+        sample = np.asarray(embeddings[sample_idx], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+
+        for _ in range(iters):
+            labels = _assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=nlist)
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()), replace=False)]
+            centroids = _normalize_rows(sums).astype(np.float32)
+
+        return cls.from_assignments(centroids, _assign(embeddings, centroids))
+
+    @classmethod
+    def from_assignments(cls, centroids: np.ndarray, labels: np.ndarray) -> "IVFIndex":
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=len(centroids))
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return cls(centroids, offsets, order.astype(np.int64))
+
+    def assign(self, embeddings: np.ndarray) -> np.ndarray:
+        """List id of each row in ``embeddings`` (nearest centroid)."""
+        return _assign(embeddings, self.centroids)
+
+    def labels(self) -> np.ndarray:
+        """List id of every stored row, indexed by row."""
+        labels = np.empty(len(self), dtype=np.int32)
+        labels[self.rows] = np.repeat(np.arange(self.nlist, dtype=np.int32), np.diff(self.offsets))
+        labels[len(self.rows) :] = self.delta_labels
+        return labels
+
+    def add(self, embeddings: np.ndarray) -> "IVFIndex":
+        """A copy with ``embeddings`` appended to the delta (lists and centroids unchanged)."""
+        delta = np.concatenate([self.delta_labels, self.assign(embeddings).astype(np.int32)])
+        return IVFIndex(self.centroids, self.offsets, self.rows, delta)
+
+    def keep(self, mask: np.ndarray) -> "IVFIndex":
+        """A copy with only the rows where ``mask`` is true, renumbered densely, delta merged."""
+        return self.from_assignments(self.centroids, self.labels()[mask])
+
+    def candidates(self, query_emb: np.ndarray, nprobe: int) -> np.ndarray:
+        """Row ids in the ``nprobe`` lists whose centroids best match the query."""
+        centroid_scores = self.centroids @ query_emb
+        nprobe = min(max(1, nprobe), self.nlist)
+        probe = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        lists = [self.rows[self.offsets[i] : self.offsets[i + 1]] for i in probe]
+        if len(self.delta_labels):
+            lists.append(np.flatnonzero(np.isin(self.delta_labels, probe)) + len(self.rows))
+        return np.concatenate(lists)
+
+    def search(
+        self,
+        query_emb: np.ndarray,
+        top_k: int,
+        *,
+        nprobe: int = 8,
+        score_rows: Callable[[np.ndarray, np.ndarray], np.ndarray],
+        exact_rows: Optional[Callable[[np.ndarray, np.ndarray], np.ndarray]] = None,
+        rerank: int = 0,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k rows among the probed lists (see :func:`rank_candidates`)."""
+        query_emb = np.asarray(query_emb, dtype=np.float32).reshape(-1)
+        return rank_candidates(
+            self.candidates(query_emb, nprobe),
+            query_emb,
+            top_k,
+            score_rows=score_rows,
+            exact_rows=exact_rows,
+            rerank=rerank,
+        )
+
+    def save(self, path: str) -> None:
+        np.savez(os.path.join(path, IVF_FILE), centroids=self.centroids, offsets=self.offsets, rows=self.rows)
+        self.delta_labels.astype(np.int32).tofile(os.path.join(path, IVF_DELTA_FILE))
+
+    @classmethod
+    def load(cls, path: str, rows: Optional[int] = None) -> Optional["IVFIndex"]:
+        """Load ``ivf.npz`` and its delta from an index directory, or None if it has none.
+
+        With ``rows``, delta entries past that many rows in total (left by an
+        interrupted append) are ignored.
+        """
+        file = os.path.join(path, IVF_FILE)
+        if not os.path.exists(file):
+            return None
+        with np.load(file) as z:
+            ivf = cls(z["centroids"], z["offsets"], z["rows"])
+        delta_file = os.path.join(path, IVF_DELTA_FILE)
+        if os.path.exists(delta_file):
+            count = -1 if rows is None else max(0, rows - len(ivf.rows))
+            ivf.delta_labels = np.fromfile(delta_file, dtype=np.int32, count=count)
+        return ivf
@@ -0,0 +1,187 @@
+"""Command-line flags and output shared by ``main``, ``daemon`` and ``client``.
+
+Stdlib only, so the thin client starts without importing NumPy or any model
+library.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Mirrors index.SEARCH_MODES / scoring.QUANTIZATIONS without importing NumPy.
+SEARCH_MODES = ("exact", "ann", "hybrid")
+QUANTIZATIONS = ("float32", "float16", "int8")
+
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+# Flags that only make sense next to the index itself (not through a daemon).
+MAINTENANCE_FLAGS = ("build_index", "add", "remove", "compact", "quantize", "build_ann", "build_sparse")
+# Flags fixed when the daemon starts; the client sends the ones it was given so
+# the daemon can refuse requests meant for another configuration.
+DAEMON_FLAGS = ("embedding_model", "explain_model", "explain_cache", "index", "corpus")
+_PATH_FLAGS = ("explain_cache", "index", "corpus")
+
+
+def build_parser(description: str) -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description=description)
+
+    p.add_argument("--query", help="Search query, e.g. 'flood displacement'.")
+    p.add_argument(
+        "--queries",
+        metavar="FILE",
+        help="Rank every query in FILE (one per line, '-' = stdin) and print JSONL, one line per query.",
+    )
+    p.add_argument("--top-k", type=int, default=5, help="How many results to show.")
+    p.add_argument("--no-explain", action="store_true", help="Disable explanation generation.")
+    p.add_argument(
+        "--embedding-model",
+        default="sentence-transformers/all-MiniLM-L6-v2",
+        help="SentenceTransformers model name.",
+    )
+    p.add_argument(
+        "--explain-model",
+        default="EleutherAI/gpt-neo-125M",
+        help="HuggingFace text-generation model name used for explanations.",
+    )
+    p.add_argument("--max-new-tokens", type=int, default=120, help="Tokens generated per explanation (default: 120).")
+    p.add_argument(
+        "--explain-batch-size", type=int, default=8, help="Prompts per padded generation batch (default: 8)."
+    )
+    p.add_argument(
+        "--explain-budget",
+        type=float,
+        metavar="SECONDS",
+        help="Stop starting new explanations after this many seconds; the rest are left out.",
+    )
+    p.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print the ranking as JSONL right away, then one JSONL line per explanation as it is generated.",
+    )
+    p.add_argument("--explain-cache", metavar="PATH", help="SQLite cache of generated explanations.")
+    p.add_argument(
+        "--explain-cache-size",
+        type=int,
+        default=100_000,
+        help="Max cached explanations; least recently used go first (default: 100000).",
+    )
+    p.add_argument("--corpus", help="JSONL corpus with 'id' and 'text' fields (default: built-in sample data).")
+    p.add_argument("--index", help="Directory of a prebuilt embedding index; only the query is encoded.")
+    p.add_argument("--build-index", metavar="DIR", help="Encode --corpus once and store the index in DIR.")
+    p.add_argument("--add", metavar="FILE", help="Append new/changed JSONL documents to --index (only they are encoded).")
+    p.add_argument("--remove", nargs="+", metavar="ID", help="Tombstone these document ids in --index.")
+    p.add_argument(
+        "--compact",
+        action="store_true",
+        help="Rewrite --index without tombstoned rows (done automatically past 25%% tombstones).",
+    )
+    p.add_argument("--mode", choices=SEARCH_MODES, default="exact", help="Search mode for --index (default: exact).")
+    p.add_argument("--build-ann", action="store_true", help="(Re)build the IVF structure of the index for --mode ann.")
+    p.add_argument("--nlist", type=int, help="IVF lists when building (default: ~4*sqrt(N)).")
+    p.add_argument("--nprobe", type=int, default=8, help="IVF lists scored per query in ann mode (default: 8).")
+    p.add_argument(
+        "--build-sparse", action="store_true", help="(Re)build the TF-IDF prefilter of the index for --mode hybrid."
+    )
+    p.add_argument(
+        "--candidates",
+        type=int,
+        help="TF-IDF candidates scored with embeddings per query in hybrid mode (default: 1000).",
+    )
+    p.add_argument(
+        "--quantize",
+        choices=QUANTIZATIONS,
+        help="Store the index rows as float16 or int8 (per-row scales) and score with them; float32 removes it.",
+    )
+    p.add_argument(
+        "--rerank",
+        type=int,
+        help="Re-score this many best candidates against the float32 rows "
+        "(default: 4*top-k on a quantized index, otherwise off; 0 = off).",
+    )
+    return p
+
+
+def load_queries(path: str) -> List[str]:
+    """One query per non-empty line; ``-`` reads stdin."""
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        return [line.strip() for line in f if line.strip()]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def parse_id(value: str):
+    """CLI ids: ``12`` -> 12 (JSONL ids are often ints), anything else stays a string."""
+    try:
+        parsed = json.loads(value)
+    except ValueError:
+        return value
+    return parsed if isinstance(parsed, int) else value
+
+
+def parse_address(address: str) -> Tuple[Optional[str], Optional[int], Optional[str]]:
+    """``host:port`` / ``:port`` -> ``(host, port, None)``; ``unix:PATH`` -> ``(None, None, PATH)``."""
+    if address.startswith("unix:"):
+        return None, None, address[len("unix:") :]
+    host, sep, port = address.rpartition(":")
+    if not sep or not port.isdigit():
+        raise ValueError(f"Expected HOST:PORT or unix:PATH, got '{address}'.")
+    return host or "127.0.0.1", int(port), None
+
+
+def daemon_config(args: argparse.Namespace) -> Dict:
+    """The :data:`DAEMON_FLAGS` set in ``args``, with paths made absolute."""
+    config = {}
+    for flag in DAEMON_FLAGS:
+        value = getattr(args, flag)
+        if value is not None:
+            config[flag] = os.path.abspath(value) if flag in _PATH_FLAGS else value
+    return config
+
+
+def rank_request(args: argparse.Namespace, queries: Sequence[str]) -> Dict:
+    """The per-request options of ``args`` as sent to the daemon.
+
+    ``explain`` is only sent for ``--no-explain``; otherwise the daemon
+    explains if it has an explanation model.
+    """
+    return {
+        "queries": list(queries),
+        "top_k": args.top_k,
+        "mode": args.mode,
+        "nprobe": args.nprobe,
+        "candidates": args.candidates,
+        "rerank": args.rerank,
+        "explain": False if args.no_explain else None,
+        "max_new_tokens": args.max_new_tokens,
+        "explain_batch_size": args.explain_batch_size,
+        "explain_budget": args.explain_budget,
+        "config": daemon_config(args),
+    }
+
+
+def render_table(hits: Sequence[Dict], columns: Sequence[str]) -> str:
+    """Right-aligned plain-text table of ``hits`` (scores with 6 decimals)."""
+
+    def cell(value) -> str:
+        return f"{value:.6f}" if isinstance(value, float) else str(value)
+
+    rows = [[cell(h.get(c, "")) for c in columns] for h in hits]
+    widths = [max([len(c)] + [len(r[i]) for r in rows]) for i, c in enumerate(columns)]
+    lines = [" ".join(c.rjust(w) for c, w in zip(columns, widths))]
+    lines += [" ".join(v.rjust(w) for v, w in zip(r, widths)) for r in rows]
+    return "\n".join(lines)
+
+
+def print_results(args: argparse.Namespace, queries: Sequence[str], results: Sequence[List[Dict]]) -> None:
+    """JSONL (one line per query) for ``--queries``/``--stream``, a table for a single ``--query``."""
+    if args.queries or args.stream:
+        for query, hits in zip(queries, results):
+            print(json.dumps({"query": query, "results": hits}, ensure_ascii=False), flush=True)
+        return
+    explained = any("explanation" in hit for hit in results[0])
+    columns = ["id", "text", "score"] + (["explanation"] if explained else [])
+    print(render_table(results[0], columns))
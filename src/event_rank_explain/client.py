@@ -0,0 +1,102 @@
+"""Thin client for :mod:`src.event_rank_explain.daemon`.
+
+Takes the same query flags as ``main`` and prints the same output, but sends
+the work to a running daemon instead of loading any model:
+
+    python -m src.event_rank_explain.client --connect unix:/tmp/rank.sock --query "flood displacement" --top-k 5
+
+Model, index and cache flags are fixed when the daemon starts; the ones given
+here are sent along and the daemon rejects the request if they differ from
+its own. Explanations follow the daemon (none if it runs with
+``--no-explain``) unless ``--no-explain`` is given here. Index maintenance
+(``--build-index``, ``--add``, ...) still goes through ``main``.
+Stdlib only, so it starts in milliseconds.
+"""
+from __future__ import annotations
+
+import http.client
+import json
+import socket
+import sys
+from typing import Any, Dict, List, Optional
+
+from src.event_rank_explain.cli import (
+    DEFAULT_ADDRESS,
+    MAINTENANCE_FLAGS,
+    build_parser,
+    load_queries,
+    parse_address,
+    print_results,
+    rank_request,
+)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+def call(address: str, path: str, payload: Optional[Dict] = None, *, timeout: float = 600.0) -> Any:
+    """POST ``payload`` (or GET without one) to the daemon at ``address``; returns the JSON reply."""
+    host, port, unix_path = parse_address(address)
+    conn = _UnixHTTPConnection(unix_path, timeout) if unix_path else http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        if payload is None:
+            conn.request("GET", path)
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            conn.request("POST", path, body, {"Content-Type": "application/json"})
+        response = conn.getresponse()
+        reply = json.loads(response.read() or b"{}")
+    finally:
+        conn.close()
+    if response.status != 200:
+        raise RuntimeError(f"daemon returned {response.status}: {reply.get('error', reply)}")
+    return reply
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = build_parser("Query a running event_rank_explain daemon (same flags as main).")
+    p.add_argument(
+        "--connect",
+        default=DEFAULT_ADDRESS,
+        help=f"Daemon address, HOST:PORT or unix:PATH (default: {DEFAULT_ADDRESS}).",
+    )
+    p.add_argument("--stats", action="store_true", help="Print the daemon's stats and exit.")
+    # only sent (and checked by the daemon) when given explicitly
+    p.set_defaults(embedding_model=None, explain_model=None)
+    args = p.parse_args(argv)
+
+    if any(getattr(args, flag) for flag in MAINTENANCE_FLAGS):
+        p.error("index maintenance flags are not supported by the client; run src.event_rank_explain.main.")
+    if args.stream:
+        p.error("--stream is not supported by the client; use --explain-budget to bound the wait.")
+    try:
+        parse_address(args.connect)
+    except ValueError as e:
+        p.error(str(e))
+
+    try:
+        if args.stats:
+            print(json.dumps(call(args.connect, "/stats"), indent=2))
+            return 0
+        if not args.query and not args.queries:
+            p.error("--query or --queries is required.")
+        queries = load_queries(args.queries) if args.queries else [args.query]
+        results = call(args.connect, "/rank", rank_request(args, queries))["results"]
+    except (OSError, RuntimeError) as e:
+        print(f"event_rank_explain daemon at {args.connect}: {e}", file=sys.stderr)
+        return 1
+
+    print_results(args, queries, results)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
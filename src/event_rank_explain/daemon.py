@@ -0,0 +1,235 @@
+"""Warm daemon for semantic ranking and explanations.
+
+Loads the embedding model, the index (or corpus) and the explanation model
+once, then answers requests over HTTP on a TCP port or a local Unix socket:
+
+    python -m src.event_rank_explain.daemon --index idx/ --listen unix:/tmp/rank.sock
+    python -m src.event_rank_explain.client --connect unix:/tmp/rank.sock --query "flood displacement"
+
+Endpoints (JSON bodies):
+
+- ``POST /rank``   ``{"queries": [...], "top_k": 5, "mode": "exact", "explain": true, ...}``
+                   -> ``{"results": [[{"id", "text", "score", "explanation"?}, ...], ...]}``;
+                   ``explain`` defaults to whether the daemon has an explanation model,
+                   ``"explain_budget": SECONDS`` leaves out explanations not started in time
+                   and ``"config": {"index": PATH, ...}`` is checked against the startup flags
+- ``GET /stats``   request counters, query-embedding and explanation cache stats
+- ``GET /healthz`` ``{"ok": true}``
+
+Requests run one at a time on a single worker thread, so the models are never
+used concurrently. The index is reopened before a request whenever its
+``meta.json`` changed, so ``main --add/--remove/--compact/...`` runs are
+picked up without a restart.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.event_extraction.cache import ResultCache
+from src.event_extraction.http_server import JsonHttpServer
+from src.event_rank_explain.cli import DEFAULT_ADDRESS, SEARCH_MODES, build_parser, daemon_config, parse_address
+from src.event_rank_explain.explain import explain_hits, get_generator
+from src.event_rank_explain.index import META_FILE, EmbeddingIndex
+from src.event_rank_explain.main import load_ranker
+from src.event_rank_explain.ranking import Ranker
+
+
+class RankService:
+    """Blocking request handler around a warm :class:`Ranker` and explanation model."""
+
+    def __init__(
+        self,
+        ranker: Ranker,
+        *,
+        explain_model: str,
+        generator=None,
+        explain_cache: Optional[ResultCache] = None,
+        config: Optional[Dict[str, Any]] = None,
+    ):
+        self.ranker = ranker
+        self.explain_model = explain_model
+        self.generator = generator
+        self.explain_cache = explain_cache
+        self.config = config or {}
+        self.requests = 0
+        self.queries = 0
+        self.busy_seconds = 0.0
+        self.index_reloads = 0
+        self._index_stamp = _meta_stamp(ranker.index.path) if ranker.index is not None else None
+
+    def _check_config(self, expected: Dict[str, Any]) -> None:
+        for flag, value in expected.items():
+            actual = self.config.get(flag)
+            if actual != value:
+                name = "--" + flag.replace("_", "-")
+                raise ValueError(f"daemon runs with {name} {actual!r}, not {value!r}; restart it to change")
+
+    def _reload_index_if_changed(self) -> None:
+        index = self.ranker.index
+        if index is None:
+            return
+        try:
+            stamp = _meta_stamp(index.path)
+            if stamp == self._index_stamp:
+                return
+            reopened = EmbeddingIndex.open(index.path)
+        except FileNotFoundError:
+            return  # a compaction is swapping the directory; keep the open index
+        if reopened.model_name != index.model_name:
+            raise ValueError(f"the index was rebuilt with '{reopened.model_name}'; restart the daemon")
+        self.ranker.index = reopened
+        self._index_stamp = stamp
+        self.index_reloads += 1
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        queries = request.get("queries")
+        if not isinstance(queries, list) or not queries or not all(isinstance(q, str) for q in queries):
+            raise ValueError("'queries' must be a non-empty list of strings")
+        mode = request.get("mode", "exact")
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"'mode' must be one of {SEARCH_MODES}")
+        self._check_config(request.get("config") or {})
+        explain = request.get("explain")
+        if explain is None:
+            explain = self.generator is not None
+
+        start = time.perf_counter()
+        try:
+            self._reload_index_if_changed()
+            results = self.ranker.rank(
+                queries,
+                int(request.get("top_k", 5)),
+                mode=mode,
+                nprobe=int(request.get("nprobe", 8)),
+                rerank=request.get("rerank"),
+                candidates=request.get("candidates"),
+            )
+            if explain:
+                if self.generator is None:
+                    raise ValueError("this daemon was started with --no-explain")
+                budget = request.get("explain_budget")
+                explain_hits(
+                    self.generator,
+                    queries,
+                    results,
+                    max_new_tokens=int(request.get("max_new_tokens", 120)),
+                    batch_size=int(request.get("explain_batch_size", 8)),
+                    budget=None if budget is None else float(budget),
+                    cache=self.explain_cache,
+                    model_name=self.explain_model,
+                )
+            return {"results": results}
+        finally:
+            self.requests += 1
+            self.queries += len(queries)
+            self.busy_seconds += time.perf_counter() - start
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "queries": self.queries,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "index_reloads": self.index_reloads,
+            "query_cache": {
+                "hits": self.ranker.cache_hits,
+                "misses": self.ranker.cache_misses,
+                "entries": len(self.ranker._cache),
+            },
+            "explain_cache": self.explain_cache.stats() if self.explain_cache is not None else None,
+            "index": self.ranker.index.stats() if self.ranker.index is not None else None,
+        }
+
+
+def _meta_stamp(path: str) -> Tuple[int, int]:
+    """Changes whenever ``meta.json`` is rewritten (it is replaced atomically)."""
+    st = os.stat(os.path.join(path, META_FILE))
+    return st.st_ino, st.st_mtime_ns
+
+
+class RankServer(JsonHttpServer):
+    """HTTP front-end for a :class:`RankService` (TCP or Unix socket)."""
+
+    name = "Ranking daemon"
+
+    def __init__(self, service: RankService, **kwargs):
+        super().__init__(**kwargs)
+        self.service = service
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rank")
+
+    async def on_stop(self) -> None:
+        self._executor.shutdown(wait=True)
+        if self.unix_path and os.path.exists(self.unix_path):
+            os.remove(self.unix_path)
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Dict]:
+        if path == "/healthz":
+            return 200, {"ok": True}
+        if path == "/stats":
+            return 200, await self._run(self.service.stats)
+        if path != "/rank":
+            return 404, {"error": f"unknown path {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        try:
+            request = json.loads(body or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            return 400, {"error": f"invalid JSON body: {e}"}
+        try:
+            return 200, await self._run(self.service.handle, request)
+        except (ValueError, TypeError) as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": repr(e)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = build_parser("Warm ranking/explanation daemon (same model, index and cache flags as main).")
+    p.add_argument(
+        "--listen",
+        default=DEFAULT_ADDRESS,
+        help=f"HOST:PORT or unix:PATH to serve on (default: {DEFAULT_ADDRESS}).",
+    )
+    args = p.parse_args(argv)
+    try:
+        host, port, unix_path = parse_address(args.listen)
+    except ValueError as e:
+        p.error(str(e))
+
+    ranker = load_ranker(args)
+    generator = None if args.no_explain else get_generator(args.explain_model)
+    cache = ResultCache(args.explain_cache, max_entries=args.explain_cache_size) if args.explain_cache else None
+    config = daemon_config(args)
+    if ranker.index is not None:
+        config["embedding_model"] = ranker.index.model_name
+    if generator is None:
+        config.pop("explain_model")
+    service = RankService(
+        ranker, explain_model=args.explain_model, generator=generator, explain_cache=cache, config=config
+    )
+
+    if unix_path:
+        server = RankServer(service, unix_path=unix_path)
+    else:
+        server = RankServer(service, host=host, port=port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if cache is not None:
+            cache.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,63 @@
+"""Shared SentenceTransformer loading and encoding helpers."""
+from __future__ import annotations
+
+import re
+import zlib
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+
+
+HASHING_MODEL = "hashing"
+_WORD = re.compile(r"\w+")
+
+
+class HashingEncoder:
+    """Deterministic, offline stand-in for a SentenceTransformer.
+
+    Texts become signed feature-hashed bags of lowercase words and word
+    bigrams in ``dim`` dimensions. No semantics, but stable across runs and
+    machines, which is what benchmarks and tests need.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def encode(self, texts: List[str], batch_size: int = 64, normalize_embeddings: bool = True) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            words = _WORD.findall(text.lower())
+            for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+                h = zlib.crc32(feature.encode("utf-8"))
+                out[i, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        if normalize_embeddings:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            out /= np.where(norms == 0, 1.0, norms)
+        return out
+
+
+@lru_cache(maxsize=4)
+def get_encoder(model_name: str):
+    """Load a SentenceTransformer once per process and model name.
+
+    ``"hashing"`` (or ``"hashing:DIM"``) returns a :class:`HashingEncoder`
+    instead, for offline use.
+    """
+    if model_name == HASHING_MODEL or model_name.startswith(HASHING_MODEL + ":"):
+        _, _, dim = model_name.partition(":")
+        return HashingEncoder(int(dim) if dim else 256)
+
+    from sentence_transformers import SentenceTransformer  # heavy import
+
+    return SentenceTransformer(model_name)
+
+
+def encode(encoder, texts: List[str], *, batch_size: int = 64) -> np.ndarray:
+    """L2-normalised float32 embeddings, one row per text.
+
+    ``encoder`` is anything with a SentenceTransformer-style
+    ``encode(texts, batch_size=..., normalize_embeddings=True)`` method.
+    """
+    emb = encoder.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+    return np.ascontiguousarray(np.asarray(emb, dtype=np.float32).reshape(len(texts), -1))
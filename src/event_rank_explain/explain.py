@@ -0,0 +1,179 @@
+"""Batched "why is this relevant?" explanations with a cached generator.
+
+Explanations can also be kept in a :class:`~src.event_extraction.cache.ResultCache`
+keyed by (query, text, model, generation settings), so repeated requests skip
+generation entirely.
+
+:func:`stream_explanations` yields them one by one under an optional time
+budget, so callers can show the ranking first and bound the total wait.
+"""
+from __future__ import annotations
+
+import re
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.event_extraction.cache import ResultCache, fingerprint, normalize_text
+
+
+@lru_cache(maxsize=2)
+def get_generator(model_name: str):
+    """Load a HuggingFace text-generation pipeline once per process and model name.
+
+    Decoder-only models are padded on the left (so every prompt ends right
+    where generation starts) and reuse EOS as the pad token when they have none.
+    """
+    from transformers import pipeline  # heavy import
+
+    generator = pipeline("text-generation", model=model_name)
+    tokenizer = generator.tokenizer
+    tokenizer.padding_side = "left"
+    if tokenizer.pad_token_id is None:
+        tokenizer.pad_token_id = tokenizer.eos_token_id
+        generator.model.config.pad_token_id = tokenizer.eos_token_id
+    return generator
+
+
+class LazyGenerator:
+    """Callable stand-in that loads :func:`get_generator` on first use.
+
+    Lets fully cached requests return without loading the model at all.
+    """
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def __call__(self, prompts, **kwargs):
+        return get_generator(self.model_name)(prompts, **kwargs)
+
+
+def build_prompt(query: str, text: str) -> str:
+    return f"Explain why the following text is relevant to '{query}':\n\n{text}\n\nExplanation:"
+
+
+def _clean(generated: str) -> str:
+    out = re.sub(r"\s+", " ", generated).strip()
+    m = re.search(r"Explanation:(.*)", out)
+    return m.group(1).strip() if m else out
+
+
+def explain_batch(
+    generator,
+    query: str,
+    texts: List[str],
+    *,
+    max_new_tokens: int = 120,
+    batch_size: int = 8,
+    cache: Optional[ResultCache] = None,
+    model_name: Optional[str] = None,
+) -> List[str]:
+    """One explanation per text, generated in padded batches of ``batch_size`` prompts.
+
+    ``generator`` is a text-generation pipeline (see :func:`get_generator`) or
+    any callable with the same ``(prompts, max_new_tokens=..., batch_size=...,
+    return_full_text=False)`` signature returning one list of
+    ``{"generated_text": ...}`` dicts per prompt.
+
+    With a ``cache`` (which needs ``model_name``), only texts without a cached
+    explanation are sent to the generator.
+    """
+    if not texts:
+        return []
+    if cache is None:
+        return _generate(generator, query, texts, max_new_tokens, batch_size)
+    if not model_name:
+        raise ValueError("explain_batch(cache=...) needs model_name for the cache key.")
+
+    namespace = _namespace(query, model_name, max_new_tokens)
+    keys = [cache.key(t, namespace) for t in texts]
+    found: Dict[str, str] = {}
+    for key in dict.fromkeys(keys):
+        hit = cache.get(key)
+        if hit is not None:
+            found[key] = hit
+    missing = {key: text for key, text in zip(keys, texts) if key not in found}
+    if missing:
+        generated = _generate(generator, query, list(missing.values()), max_new_tokens, batch_size)
+        for key, explanation in zip(missing, generated):
+            cache.put(key, explanation)
+            found[key] = explanation
+        cache.flush()
+    return [found[key] for key in keys]
+
+
+def stream_explanations(
+    generator,
+    queries: List[str],
+    results: List[List[Dict]],
+    *,
+    budget: Optional[float] = None,
+    clock: Callable[[], float] = time.monotonic,
+    **kwargs,
+) -> Iterator[Tuple[int, int, str]]:
+    """Yield ``(query_index, hit_index, explanation)`` for the hits of :meth:`Ranker.rank` output.
+
+    Hits are explained in rank order, one padded batch of ``batch_size`` hits
+    at a time, each yielded as soon as its batch is generated. With a
+    ``budget`` (seconds from the first call), hits are generated one at a time
+    instead, the deadline is checked before every generation and the remaining
+    hits are skipped once it has passed. ``kwargs`` are passed on to
+    :func:`explain_batch`.
+    """
+    deadline = None if budget is None else clock() + budget
+    step = kwargs.get("batch_size", 8) if deadline is None else 1
+    for qi, (query, hits) in enumerate(zip(queries, results)):
+        for start in range(0, len(hits), step):
+            if deadline is not None and clock() >= deadline:
+                return
+            texts = [hit["text"] for hit in hits[start : start + step]]
+            for hi, explanation in enumerate(explain_batch(generator, query, texts, **kwargs), start):
+                yield qi, hi, explanation
+
+
+def explain_hits(
+    generator,
+    queries: List[str],
+    results: List[List[Dict]],
+    *,
+    budget: Optional[float] = None,
+    **kwargs,
+) -> int:
+    """Add an ``"explanation"`` to the hits of :meth:`Ranker.rank` output; returns how many got one.
+
+    Without a ``budget`` each query's hits go to :func:`explain_batch` as one
+    padded batch. With one, hits are explained one by one through
+    :func:`stream_explanations` and those not started in time keep no
+    ``"explanation"`` key. ``kwargs`` are passed on to :func:`explain_batch`.
+    """
+    if budget is None:
+        explained = 0
+        for query, hits in zip(queries, results):
+            explanations = explain_batch(generator, query, [h["text"] for h in hits], **kwargs)
+            for hit, explanation in zip(hits, explanations):
+                hit["explanation"] = explanation
+            explained += len(hits)
+        return explained
+
+    explained = 0
+    for qi, hi, explanation in stream_explanations(generator, queries, results, budget=budget, **kwargs):
+        results[qi][hi]["explanation"] = explanation
+        explained += 1
+    return explained
+
+
+def _namespace(query: str, model_name: str, max_new_tokens: int) -> str:
+    template = fingerprint(build_prompt("{query}", "{text}"))
+    return f"explain|{model_name}|tokens{max_new_tokens}|prompt:{template}|{normalize_text(query)}"
+
+
+def _generate(generator, query: str, texts: List[str], max_new_tokens: int, batch_size: int) -> List[str]:
+    prompts = [build_prompt(query, t) for t in texts]
+    outputs = generator(
+        prompts,
+        max_new_tokens=max_new_tokens,
+        batch_size=batch_size,
+        num_return_sequences=1,
+        return_full_text=False,
+    )
+    return [_clean(out[0]["generated_text"]) for out in outputs]
@@ -0,0 +1,686 @@
+"""Persistent, memory-mapped embedding index for semantic ranking.
+
+The corpus is encoded once by :func:`build_index` and stored in a directory:
+
+- ``meta.json``       model name, dimension, row count, format version
+- ``embeddings.f32``  L2-normalised float32 rows (row-major, no header)
+- ``docs.jsonl``      ``{"id": ..., "text": ...}`` per row, same order
+- ``docs.off``        int64 end offset of each row's line in ``docs.jsonl``
+- ``ids.h64``         int64 hash of each row's id, for id lookups
+- ``tombstones.i64``  optional int64 row numbers of removed documents
+- ``ivf.npz``         optional IVF structure for approximate search (see ``ann.py``),
+                      plus ``ivf_delta.i32`` for rows added since it was built
+- ``sparse.joblib``   optional TF-IDF inverted index for hybrid search (see ``sparse.py``),
+                      plus one ``sparse_delta.*.npz`` segment per later add
+- ``embeddings.f16`` / ``embeddings.i8`` + ``scales.f32``
+                      optional quantized copy of the rows (see :meth:`EmbeddingIndex.quantize`)
+
+:class:`EmbeddingIndex` maps ``embeddings.f32`` read-only, so opening an index
+costs no encoding, scoring reads the shared page cache instead of a private
+copy, and several processes can serve the same index. Documents are mapped
+the same way: ``index.ids[row]`` and ``index.texts[row]`` parse one line of
+``docs.jsonl`` on access, so only the returned hits are ever read.
+
+With a quantized copy, every query is scored against the 2x (float16) or 4x
+(int8) smaller matrix and only the best candidates are re-scored exactly
+against the float32 rows, so the float32 file is paged in row by row instead
+of being kept resident.
+
+The index grows in place: :meth:`EmbeddingIndex.add` appends rows for new
+documents only (their IVF list ids and TF-IDF rows go to delta files, so
+nothing existing is rewritten), :meth:`EmbeddingIndex.remove` tombstones
+rows, and :meth:`EmbeddingIndex.compact` rewrites the directory without them,
+with the IVF delta merged and the sparse vocabulary refitted.
+``meta.json`` is written last, so rows appended by an interrupted ``add`` are
+ignored (and overwritten by the next one). It is rewritten by every change,
+so a long-running reader (the daemon) reopens the index when it changes.
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import operator
+import os
+import shutil
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.event_rank_explain.ann import IVF_DELTA_FILE, IVF_FILE, IVFIndex
+from src.event_rank_explain.encoders import encode
+from src.event_rank_explain.scoring import (
+    QUANTIZATIONS,
+    quantize,
+    quantized_scores,
+    rank_candidates,
+    top_k_indices,
+    top_k_rows,
+)
+from src.event_rank_explain.sparse import SPARSE_FILE, SparseIndex
+
+
+FORMAT_VERSION = 1
+SEARCH_MODES = ("exact", "ann", "hybrid")
+META_FILE = "meta.json"
+EMBEDDINGS_FILE = "embeddings.f32"
+DOCS_FILE = "docs.jsonl"
+DOC_OFFSETS_FILE = "docs.off"
+ID_HASHES_FILE = "ids.h64"
+TOMBSTONES_FILE = "tombstones.i64"
+SCALES_FILE = "scales.f32"
+QUANTIZED_FILES = {"float16": ("embeddings.f16", np.float16), "int8": ("embeddings.i8", np.int8)}
+# Candidates re-scored in float32 per requested result when a quantized index
+# is searched without an explicit ``rerank``.
+DEFAULT_RERANK_FACTOR = 4
+# Sparse candidates scored densely per hybrid query unless ``candidates`` is given.
+DEFAULT_HYBRID_CANDIDATES = 1000
+# compact_if_needed() rewrites the index once this share of rows is tombstoned.
+COMPACT_THRESHOLD = 0.25
+
+
+def _doc_line(doc: Dict) -> bytes:
+    return (json.dumps({"id": doc["id"], "text": doc["text"]}, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _id_key(doc_id) -> str:
+    # ids round-trip through JSON, so 2 and "2" stay different ids
+    return json.dumps(doc_id)
+
+
+def _id_hash(doc_id) -> int:
+    return int.from_bytes(hashlib.blake2b(_id_key(doc_id).encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+
+class _DocWriter:
+    """Appends rows to ``docs.jsonl`` together with their end offsets and id hashes."""
+
+    def __init__(self, f_docs, f_offsets, f_hashes, start: int = 0):
+        self.files = (f_docs, f_offsets, f_hashes)
+        self.end = start
+
+    def write(self, docs: Sequence[Dict]) -> None:
+        f_docs, f_offsets, f_hashes = self.files
+        lines = [_doc_line(d) for d in docs]
+        f_docs.write(b"".join(lines))
+        ends = self.end + np.cumsum([len(line) for line in lines], dtype=np.int64)
+        f_offsets.write(ends.tobytes())
+        f_hashes.write(np.asarray([_id_hash(d["id"]) for d in docs], dtype=np.int64).tobytes())
+        self.end = int(ends[-1]) if len(ends) else self.end
+
+
+class DocColumn(Sequence):
+    """Read-only ``ids`` or ``texts`` of an index; each item is parsed from ``docs.jsonl`` on access."""
+
+    def __init__(self, index: "EmbeddingIndex", field: str):
+        self._index = index
+        self._field = field
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[r] for r in range(*row.indices(len(self)))]
+        return self._index.doc(row)[self._field]
+
+
+def build_index(
+    path: str,
+    docs: Iterable[Dict],
+    encoder,
+    model_name: str,
+    *,
+    batch_size: int = 256,
+    quantization: str = "float32",
+) -> "EmbeddingIndex":
+    """Encode ``docs`` (dicts with ``id`` and ``text``) and write an index to ``path``.
+
+    ``quantization`` other than ``"float32"`` also writes a quantized copy of
+    the rows (see :meth:`EmbeddingIndex.quantize`).
+    """
+    os.makedirs(path, exist_ok=True)
+    count = 0
+    dim: Optional[int] = None
+    batch: List[Dict] = []
+
+    with open(os.path.join(path, EMBEDDINGS_FILE), "wb") as f_emb, open(
+        os.path.join(path, DOCS_FILE), "wb"
+    ) as f_docs, open(os.path.join(path, DOC_OFFSETS_FILE), "wb") as f_offsets, open(
+        os.path.join(path, ID_HASHES_FILE), "wb"
+    ) as f_hashes:
+        doc_writer = _DocWriter(f_docs, f_offsets, f_hashes)
+
+        def flush() -> None:
+            nonlocal count, dim
+            emb = encode(encoder, [d["text"] for d in batch], batch_size=batch_size)
+            dim = emb.shape[1]
+            f_emb.write(emb.tobytes())
+            doc_writer.write(batch)
+            count += len(batch)
+            batch.clear()
+
+        for doc in docs:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+    if count == 0:
+        raise ValueError("Cannot build an index from an empty corpus.")
+
+    for stale in (TOMBSTONES_FILE, IVF_FILE, IVF_DELTA_FILE, SPARSE_FILE):
+        if os.path.exists(os.path.join(path, stale)):
+            os.remove(os.path.join(path, stale))
+    with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as f:
+        json.dump({"format_version": FORMAT_VERSION, "model": model_name, "dim": dim, "count": count}, f)
+    index = EmbeddingIndex.open(path)
+    if quantization != "float32":
+        index.quantize(quantization)
+    return index
+
+
+class EmbeddingIndex:
+    """View of an index directory written by :func:`build_index`.
+
+    Searches never return tombstoned rows, so they may return fewer than
+    ``top_k`` results.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._load()
+
+    @classmethod
+    def open(cls, path: str) -> "EmbeddingIndex":
+        return cls(path)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _load(self) -> None:
+        with open(self._file(META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported index format in '{self.path}'.")
+        self.meta = meta
+        count = meta["count"]
+
+        if not (os.path.exists(self._file(DOC_OFFSETS_FILE)) and os.path.exists(self._file(ID_HASHES_FILE))):
+            self._index_docs(count)  # written by an older version
+        self._map_rows()
+        self._id_lookup: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self.ids = DocColumn(self, "id")
+        self.texts = DocColumn(self, "text")
+
+        self.deleted = np.zeros(count, dtype=bool)
+        if os.path.exists(self._file(TOMBSTONES_FILE)):
+            rows = np.fromfile(self._file(TOMBSTONES_FILE), dtype=np.int64)
+            self.deleted[rows[rows < count]] = True
+        self._live_count = count - int(self.deleted.sum())
+
+        self.ivf = IVFIndex.load(self.path, rows=count)
+        if self.ivf is not None and len(self.ivf) != count:
+            self.ivf = None  # stale after an interrupted add; rebuild with build_ann()
+        self.sparse = SparseIndex.load(self.path, rows=count)
+        if self.sparse is not None and len(self.sparse) != count:
+            self.sparse = None  # stale after an interrupted add; rebuild with build_sparse()
+
+    def _map_rows(self) -> None:
+        """(Re)map the per-row files for the current row count; O(1), nothing is read."""
+        count = len(self)
+        self.embeddings = self._map(EMBEDDINGS_FILE, np.float32)
+        self._doc_ends = self._map(DOC_OFFSETS_FILE, np.int64, (count,))
+        self._id_hashes = self._map(ID_HASHES_FILE, np.int64, (count,))
+        self._docs_size = int(self._doc_ends[-1]) if count else 0
+        self._docs = self._map(DOCS_FILE, np.uint8, (self._docs_size,))
+
+        self.quantized = self.scales = None
+        if self.quantization != "float32":
+            name, dtype = QUANTIZED_FILES[self.quantization]
+            self.quantized = self._map(name, dtype)
+            if self.quantization == "int8":
+                self.scales = self._map(SCALES_FILE, np.float32, (count,))
+
+    def _map(self, name: str, dtype, shape: Optional[Tuple[int, ...]] = None) -> np.ndarray:
+        shape = shape or (self.meta["count"], self.meta["dim"])
+        if shape[0] == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(self._file(name), dtype=dtype, mode="r", shape=shape)
+
+    def _index_docs(self, count: int) -> None:
+        """Write the offsets and id hashes of the first ``count`` lines of ``docs.jsonl``."""
+        with open(self._file(DOCS_FILE), "rb") as f_docs, open(self._file(DOC_OFFSETS_FILE), "wb") as f_offsets, open(
+            self._file(ID_HASHES_FILE), "wb"
+        ) as f_hashes:
+            end = 0
+            for _, line in zip(range(count), f_docs):
+                end += len(line)
+                f_offsets.write(np.int64(end).tobytes())
+                f_hashes.write(np.int64(_id_hash(json.loads(line)["id"])).tobytes())
+
+    def _line(self, row: int) -> bytes:
+        start = int(self._doc_ends[row - 1]) if row else 0
+        return self._docs[start : int(self._doc_ends[row])].tobytes()
+
+    def doc(self, row: int) -> Dict:
+        """``{"id", "text"}`` of one row, read from ``docs.jsonl``."""
+        row = operator.index(row)
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(f"row {row} out of range for an index of {len(self)} rows")
+        return json.loads(self._line(row))
+
+    def _live_row(self, doc_id) -> Optional[int]:
+        """Row of ``doc_id``, or None if it is unknown or removed.
+
+        Candidates come from a binary search over the sorted id hashes and are
+        confirmed against the stored id; the newest row of an id is its live
+        one, since replacing a document tombstones the older rows.
+        """
+        if self._id_lookup is None:
+            order = np.argsort(self._id_hashes, kind="stable")
+            self._id_lookup = (np.asarray(self._id_hashes)[order], order)
+        hashes, order = self._id_lookup
+        h = _id_hash(doc_id)
+        key = _id_key(doc_id)
+        lo, hi = np.searchsorted(hashes, h, "left"), np.searchsorted(hashes, h, "right")
+        for row in sorted(order[lo:hi].tolist(), reverse=True):
+            if _id_key(self.ids[row]) == key:
+                return None if self.deleted[row] else row
+        return None
+
+    def _write_meta(self) -> None:
+        tmp = self._file(META_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self._file(META_FILE))
+
+    @property
+    def model_name(self) -> str:
+        return self.meta["model"]
+
+    @property
+    def quantization(self) -> str:
+        return self.meta.get("quantization", "float32")
+
+    def __len__(self) -> int:
+        """Number of stored rows, including tombstoned ones."""
+        return self.meta["count"]
+
+    @property
+    def live_count(self) -> int:
+        return self._live_count
+
+    def __contains__(self, doc_id) -> bool:
+        return self._live_row(doc_id) is not None
+
+    def stats(self) -> Dict:
+        """Row counts, including the rows held in IVF/sparse deltas until :meth:`compact`.
+
+        ``sparse_delta_rows`` were vectorized with the vocabulary of the last
+        fit, so terms new to them do not reach the hybrid prefilter yet.
+        """
+        return {
+            "rows": len(self),
+            "live_rows": self.live_count,
+            "quantization": self.quantization,
+            "ivf_delta_rows": len(self.ivf.delta_labels) if self.ivf is not None else None,
+            "sparse_delta_rows": self.sparse.delta_rows if self.sparse is not None else None,
+        }
+
+    def quantize(self, kind: str, *, chunk_size: int = 65536) -> None:
+        """Write a ``float16`` or ``int8`` (per-row scale) copy of the rows and score with it.
+
+        The float32 rows stay on disk for the exact rerank; ``"float32"``
+        drops the quantized copy again.
+        """
+        if kind not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization '{kind}', expected one of {QUANTIZATIONS}.")
+        if kind != "float32":
+            name, _ = QUANTIZED_FILES[kind]
+            scales_file = open(self._file(SCALES_FILE), "wb") if kind == "int8" else contextlib.nullcontext()
+            with open(self._file(name), "wb") as f_q, scales_file as f_s:
+                for start in range(0, len(self), chunk_size):
+                    values, scales = quantize(self.embeddings[start : start + chunk_size], kind)
+                    f_q.write(values.tobytes())
+                    if scales is not None:
+                        f_s.write(scales.tobytes())
+        self.meta["quantization"] = kind
+        self._write_meta()
+        if kind != "int8" and os.path.exists(self._file(SCALES_FILE)):
+            os.remove(self._file(SCALES_FILE))
+        self._map_rows()
+
+    # -- incremental updates -------------------------------------------------
+
+    def add(self, docs: Iterable[Dict], encoder, *, batch_size: int = 256) -> int:
+        """Append ``docs`` (dicts with ``id`` and ``text``), encoding only new text.
+
+        Documents whose id is already live with the same text are skipped; if
+        the text changed, the old row is tombstoned and the new one appended.
+        New rows are appended to the IVF and sparse deltas, and the in-memory
+        view is extended in place, so the cost grows with the new rows only.
+        Returns the number of rows appended.
+        """
+        pending: Dict = {}
+        live: Dict = {}
+        for d in docs:
+            if d["id"] not in live:
+                live[d["id"]] = self._live_row(d["id"])
+            row = live[d["id"]]
+            if row is not None and self.texts[row] == d["text"]:
+                pending.pop(d["id"], None)
+                continue
+            pending[d["id"]] = d
+        if not pending:
+            return 0
+
+        count, dim = len(self), self.meta["dim"]
+        sizes = {
+            EMBEDDINGS_FILE: count * dim * 4,
+            DOCS_FILE: self._docs_size,
+            DOC_OFFSETS_FILE: count * 8,
+            ID_HASHES_FILE: count * 8,
+        }
+        if self.quantized is not None:
+            sizes[QUANTIZED_FILES[self.quantization][0]] = count * dim * self.quantized.dtype.itemsize
+            if self.scales is not None:
+                sizes[SCALES_FILE] = count * 4
+        if self.ivf is not None:
+            sizes[IVF_DELTA_FILE] = len(self.ivf.delta_labels) * 4
+
+        new_docs = list(pending.values())
+        ivf = self.ivf
+        files = {}
+        try:
+            for name, size in sizes.items():
+                # Drop whatever an interrupted add() left past the committed rows.
+                open(self._file(name), "ab").close()
+                files[name] = open(self._file(name), "r+b")
+                files[name].truncate(size)
+                files[name].seek(size)
+            doc_writer = _DocWriter(files[DOCS_FILE], files[DOC_OFFSETS_FILE], files[ID_HASHES_FILE], self._docs_size)
+            for start in range(0, len(new_docs), batch_size):
+                batch = new_docs[start : start + batch_size]
+                emb = encode(encoder, [d["text"] for d in batch], batch_size=batch_size)
+                if emb.shape[1] != dim:
+                    raise ValueError(f"Encoder returned dimension {emb.shape[1]}, index has {dim}.")
+                files[EMBEDDINGS_FILE].write(emb.tobytes())
+                doc_writer.write(batch)
+                if self.quantized is not None:
+                    values, scales = quantize(emb, self.quantization)
+                    files[QUANTIZED_FILES[self.quantization][0]].write(values.tobytes())
+                    if scales is not None:
+                        files[SCALES_FILE].write(scales.tobytes())
+                if ivf is not None:
+                    ivf = ivf.add(emb)
+                    files[IVF_DELTA_FILE].write(ivf.delta_labels[-len(emb) :].tobytes())
+        finally:
+            for f in files.values():
+                f.close()
+
+        replaced = [live[i] for i in pending if live[i] is not None]
+        sparse = self.sparse
+        if sparse is not None:
+            sparse = sparse.add(d["text"] for d in new_docs)
+            sparse.save_delta(self.path)
+        self.meta["count"] = count + len(new_docs)
+        self._write_meta()
+
+        self._map_rows()
+        self.ivf, self.sparse = ivf, sparse
+        self.deleted = np.concatenate([self.deleted, np.zeros(len(new_docs), dtype=bool)])
+        self._live_count += len(new_docs)
+        self._extend_id_lookup(count)
+        self._tombstone(replaced)
+        return len(new_docs)
+
+    def _extend_id_lookup(self, start: int) -> None:
+        """Merge the id hashes of rows ``start:`` into the sorted lookup, if it was built."""
+        if self._id_lookup is None:
+            return
+        hashes, order = self._id_lookup
+        new = np.asarray(self._id_hashes[start:])
+        new_order = np.argsort(new, kind="stable")
+        at = np.searchsorted(hashes, new[new_order], side="right")
+        self._id_lookup = (np.insert(hashes, at, new[new_order]), np.insert(order, at, new_order + start))
+
+    def remove(self, doc_ids: Iterable) -> int:
+        """Tombstone the rows of ``doc_ids``; unknown ids are ignored. Returns rows removed."""
+        rows = [r for r in map(self._live_row, dict.fromkeys(doc_ids)) if r is not None]
+        self._tombstone(rows)
+        return len(rows)
+
+    def _tombstone(self, rows: Sequence[int]) -> None:
+        """Record live ``rows`` as removed, on disk and in memory."""
+        if rows:
+            with open(self._file(TOMBSTONES_FILE), "ab") as f:
+                f.write(np.asarray(rows, dtype=np.int64).tobytes())
+            self.deleted[list(rows)] = True
+            self._live_count -= len(rows)
+            self._write_meta()
+
+    def compact(self, *, chunk_size: int = 65536) -> int:
+        """Rewrite the index without tombstoned rows. Returns the number of rows dropped.
+
+        The new index is written next to the old one and swapped in with two
+        renames, so readers never see a half-written directory. Either way the
+        IVF delta is merged into the lists and the sparse index is refitted
+        over the remaining texts, so terms first seen in added rows match too.
+        """
+        dropped = int(self.deleted.sum())
+        if dropped == 0:
+            self._merge_deltas()
+            return 0
+        keep = np.flatnonzero(~self.deleted)
+        base = os.path.normpath(self.path)
+        tmp, old = base + ".compact", base + ".old"
+        for d in (tmp, old):
+            shutil.rmtree(d, ignore_errors=True)
+        os.makedirs(tmp)
+
+        def copy_rows(name: str, values: np.ndarray) -> None:
+            with open(os.path.join(tmp, name), "wb") as f:
+                for start in range(0, len(keep), chunk_size):
+                    f.write(np.ascontiguousarray(values[keep[start : start + chunk_size]]).tobytes())
+
+        copy_rows(EMBEDDINGS_FILE, self.embeddings)
+        copy_rows(ID_HASHES_FILE, self._id_hashes)
+        if self.quantized is not None:
+            copy_rows(QUANTIZED_FILES[self.quantization][0], self.quantized)
+            if self.scales is not None:
+                copy_rows(SCALES_FILE, self.scales)
+        with open(os.path.join(tmp, DOCS_FILE), "wb") as f_docs, open(os.path.join(tmp, DOC_OFFSETS_FILE), "wb") as f_offsets:
+            end = 0
+            for start in range(0, len(keep), chunk_size):
+                lines = [self._line(r) for r in keep[start : start + chunk_size].tolist()]
+                f_docs.write(b"".join(lines))
+                ends = end + np.cumsum([len(line) for line in lines], dtype=np.int64)
+                f_offsets.write(ends.tobytes())
+                end = int(ends[-1])
+        if self.ivf is not None:
+            self.ivf.keep(~self.deleted).save(tmp)
+        if self.sparse is not None:
+            self.sparse.refit(self.texts[r] for r in keep.tolist()).save(tmp)
+        with open(os.path.join(tmp, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(dict(self.meta, count=len(keep)), f)
+
+        os.rename(base, old)
+        os.rename(tmp, base)
+        shutil.rmtree(old)
+        self._load()
+        return dropped
+
+    def _merge_deltas(self) -> None:
+        # the merged structure covers every row, so the load ignores the old deltas if we stop halfway
+        if self.ivf is not None and len(self.ivf.delta_labels):
+            self.ivf = self.ivf.keep(np.ones(len(self), dtype=bool))
+            self.ivf.save(self.path)
+        if self.sparse is not None and self.sparse.deltas:
+            self.sparse = self.sparse.refit(self.texts)
+            self.sparse.save(self.path)
+        self._write_meta()
+
+    def compact_if_needed(self, threshold: float = COMPACT_THRESHOLD) -> int:
+        """:meth:`compact` once more than ``threshold`` of the rows are tombstoned."""
+        if len(self) and self.deleted.sum() / len(self) > threshold:
+            return self.compact()
+        return 0
+
+    # -- search --------------------------------------------------------------
+
+    def _rerank_size(self, top_k: int, rerank: Optional[int]) -> int:
+        """Candidates to re-score in float32 (0 = none)."""
+        if rerank is None:
+            return DEFAULT_RERANK_FACTOR * top_k if self.quantized is not None else 0
+        return rerank
+
+    def _mask_deleted(self, scores: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        if self.live_count < len(self):
+            deleted = self.deleted if rows is None else self.deleted[rows]
+            scores[..., deleted] = -np.inf
+        return scores
+
+    @staticmethod
+    def _live(rows: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        keep = np.isfinite(scores)
+        return rows[keep], scores[keep]
+
+    def scores(self, query_emb: np.ndarray) -> np.ndarray:
+        """Cosine scores of one normalised query against every stored row (float32).
+
+        Tombstoned rows score ``-inf``.
+        """
+        return self._mask_deleted(self.embeddings @ np.asarray(query_emb, dtype=np.float32).reshape(-1))
+
+    def approx_scores(self, query_embs: np.ndarray) -> np.ndarray:
+        """``(queries, rows)`` scores, from the quantized rows when there are any."""
+        query_embs = np.asarray(query_embs, dtype=np.float32)
+        if self.quantized is None:
+            scores = query_embs @ self.embeddings.T
+        else:
+            scores = quantized_scores(self.quantized, self.scales, query_embs)
+        return self._mask_deleted(scores)
+
+    def score_rows(self, rows: np.ndarray, query_emb: np.ndarray) -> np.ndarray:
+        """Scores of the given rows only, from the quantized rows when there are any."""
+        if self.quantized is None:
+            return self.exact_rows(rows, query_emb)
+        scales = self.scales[rows] if self.scales is not None else None
+        query_emb = np.asarray(query_emb, dtype=np.float32).reshape(1, -1)
+        return self._mask_deleted(quantized_scores(self.quantized[rows], scales, query_emb)[0], rows)
+
+    def exact_rows(self, rows: np.ndarray, query_emb: np.ndarray) -> np.ndarray:
+        """Exact float32 cosine scores of the given rows only."""
+        scores = self.embeddings[rows] @ np.asarray(query_emb, dtype=np.float32).reshape(-1)
+        return self._mask_deleted(scores, rows)
+
+    def search_batch(
+        self, query_embs: np.ndarray, top_k: int, *, rerank: Optional[int] = None
+    ) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """Exact-mode search for a ``(queries, dim)`` block; per-query rows and scores.
+
+        On a quantized index the best ``rerank`` candidates per query (default
+        ``4 * top_k``) are re-scored against the float32 rows.
+        """
+        query_embs = np.asarray(query_embs, dtype=np.float32)
+        scores = self.approx_scores(query_embs)
+        pool = self._rerank_size(top_k, rerank)
+        out_rows, out_scores = [], []
+        if pool == 0:
+            rows = top_k_rows(scores, top_k)
+            pairs = zip(rows, np.take_along_axis(scores, rows, axis=1))
+        else:
+            pairs = []
+            for q, cand in zip(query_embs, top_k_rows(scores, max(pool, top_k))):
+                exact = self.exact_rows(cand, q)
+                best = top_k_indices(exact, top_k)
+                pairs.append((cand[best], exact[best]))
+        for r, s in pairs:
+            r, s = self._live(r, s)
+            out_rows.append(r)
+            out_scores.append(s)
+        return out_rows, out_scores
+
+    def build_ann(self, nlist: Optional[int] = None, *, iters: int = 20, seed: int = 0) -> IVFIndex:
+        """Cluster the stored rows into an IVF structure and save it with the index.
+
+        Rows added later join the existing lists; rebuild once the corpus has
+        drifted far from the original centroids.
+        """
+        self.ivf = IVFIndex.build(self.embeddings, nlist, iters=iters, seed=seed)
+        self.ivf.save(self.path)
+        self._write_meta()
+        return self.ivf
+
+    def build_sparse(self) -> SparseIndex:
+        """Fit a TF-IDF inverted index over the stored texts and save it with the index."""
+        self.sparse = SparseIndex.build(self.texts)
+        self.sparse.save(self.path)
+        self._write_meta()
+        return self.sparse
+
+    def search(
+        self,
+        query_emb: np.ndarray,
+        top_k: int,
+        *,
+        mode: str = "exact",
+        nprobe: int = 8,
+        rerank: Optional[int] = None,
+        query_text: Optional[str] = None,
+        candidates: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Row indices and scores of the ``top_k`` best matches, best first.
+
+        Args:
+            mode: ``"exact"`` scores every row; ``"ann"`` only the ``nprobe``
+                closest IVF lists (requires :meth:`build_ann`); ``"hybrid"``
+                only the ``candidates`` best TF-IDF matches of ``query_text``
+                (requires :meth:`build_sparse`). A hybrid query whose terms
+                match fewer than ``top_k`` live rows falls back to ``exact``.
+            nprobe: IVF lists scored per query in ``ann`` mode.
+            rerank: Re-score this many best candidates against the float32
+                rows (0 = off). Default: ``4 * top_k`` on a quantized index,
+                off otherwise.
+            query_text: The query itself, for the ``hybrid`` prefilter.
+            candidates: Sparse candidate-pool size in ``hybrid`` mode
+                (default: 1000).
+        """
+        if mode == "hybrid":
+            if self.sparse is None:
+                raise ValueError(f"Index '{self.path}' has no sparse index; build it with build_sparse().")
+            if query_text is None:
+                raise ValueError("mode='hybrid' needs query_text.")
+            rows = self.sparse.candidates(query_text, candidates or DEFAULT_HYBRID_CANDIDATES)
+            rows = np.sort(rows[~self.deleted[rows]])
+            if len(rows) >= top_k:
+                return rank_candidates(
+                    rows,
+                    np.asarray(query_emb, dtype=np.float32).reshape(-1),
+                    top_k,
+                    score_rows=self.score_rows,
+                    exact_rows=self.exact_rows,
+                    rerank=self._rerank_size(top_k, rerank),
+                )
+            mode = "exact"
+        if mode == "exact":
+            query_embs = np.asarray(query_emb, dtype=np.float32).reshape(1, -1)
+            rows, scores = self.search_batch(query_embs, top_k, rerank=rerank)
+            return rows[0], scores[0]
+        if mode == "ann":
+            if self.ivf is None:
+                raise ValueError(f"Index '{self.path}' has no IVF structure; build it with build_ann().")
+            rows, scores = self.ivf.search(
+                query_emb,
+                top_k,
+                nprobe=nprobe,
+                score_rows=self.score_rows,
+                exact_rows=self.exact_rows,
+                rerank=self._rerank_size(top_k, rerank),
+            )
+            return self._live(rows, scores)
+        raise ValueError(f"Unknown search mode '{mode}', expected one of {SEARCH_MODES}.")
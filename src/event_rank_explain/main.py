@@ -1,12 +1,15 @@
 from __future__ import annotations
 
-import argparse
-import re
-from typing import List, Optional
+import json
+import sys
+from typing import Dict, List, Optional
 
-import numpy as np
-import pandas as pd
-from sklearn.metrics.pairwise import cosine_similarity
+from src.event_extraction.cache import ResultCache
+from src.event_rank_explain.cli import MAINTENANCE_FLAGS, build_parser, load_queries, parse_id, print_results
+from src.event_rank_explain.encoders import get_encoder
+from src.event_rank_explain.explain import LazyGenerator, explain_hits, stream_explanations
+from src.event_rank_explain.index import EmbeddingIndex, build_index
+from src.event_rank_explain.ranking import Ranker
 
 
 SAMPLE_DATA = [
@@ -18,60 +21,116 @@ SAMPLE_DATA = [
 ]
 
 
-def _rank_by_embeddings(texts: List[str], query: str, model_name: str) -> np.ndarray:
-    """Return cosine similarity scores using SentenceTransformers."""
-    from sentence_transformers import SentenceTransformer  # heavy import
+def _load_corpus(path: Optional[str]) -> List[Dict]:
+    """Read ``{"id", "text"}`` records from a JSONL file, or return SAMPLE_DATA."""
+    if not path:
+        return SAMPLE_DATA
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
 
-    model = SentenceTransformer(model_name)
-    query_emb = model.encode([query], normalize_embeddings=True)
-    text_emb = model.encode(texts, normalize_embeddings=True)
-    return cosine_similarity(query_emb, text_emb)[0]
 
-
-def _explain_relevance(query: str, text: str, hf_model: str, max_new_tokens: int = 120) -> str:
-    """Generate a short explanation via a HuggingFace text-generation pipeline."""
-    from transformers import pipeline  # heavy import
-
-    explainer = pipeline("text-generation", model=hf_model)
-    prompt = f"Explain why the following text is relevant to '{query}':\n\n{text}\n\nExplanation:"
-    out = explainer(prompt, max_new_tokens=max_new_tokens, num_return_sequences=1)[0]["generated_text"]
-    out = re.sub(r"\s+", " ", out).strip()
-    m = re.search(r"Explanation:(.*)", out)
-    return (m.group(1).strip() if m else out)
+def load_ranker(args) -> Ranker:
+    """A :class:`Ranker` over ``--index`` or, without one, the encoded ``--corpus``."""
+    if args.index:
+        index = EmbeddingIndex.open(args.index)
+        if index.model_name != args.embedding_model:
+            print(f"Using the index's embedding model '{index.model_name}'.", file=sys.stderr)
+        return Ranker.from_index(index, get_encoder(index.model_name))
+    return Ranker.from_docs(_load_corpus(args.corpus), get_encoder(args.embedding_model))
 
 
 def main(argv: Optional[List[str]] = None) -> int:
-    p = argparse.ArgumentParser(description="Semantic ranking of short event texts (with optional explanations).")
-
-    p.add_argument("--query", required=True, help="Search query, e.g. 'flood displacement'.")
-    p.add_argument("--top-k", type=int, default=5, help="How many results to show.")
-    p.add_argument("--no-explain", action="store_true", help="Disable explanation generation.")
-    p.add_argument(
-        "--embedding-model",
-        default="sentence-transformers/all-MiniLM-L6-v2",
-        help="SentenceTransformers model name.",
-    )
-    p.add_argument(
-        "--explain-model",
-        default="EleutherAI/gpt-neo-125M",
-        help="HuggingFace text-generation model name used for explanations.",
-    )
-
+    p = build_parser("Semantic ranking of short event texts (with optional explanations).")
     args = p.parse_args(argv)
 
-    df = pd.DataFrame(SAMPLE_DATA)
-    texts = df["text"].tolist()
-
-    scores = _rank_by_embeddings(texts, args.query, args.embedding_model)
-    df["score"] = scores
-    df = df.sort_values("score", ascending=False).head(args.top_k).reset_index(drop=True)
+    if args.build_index:
+        index = build_index(
+            args.build_index,
+            _load_corpus(args.corpus),
+            get_encoder(args.embedding_model),
+            args.embedding_model,
+        )
+        print(f"Built index with {len(index)} documents in {args.build_index}")
+        args.index = args.build_index
+
+    maintenance = any(getattr(args, flag) for flag in MAINTENANCE_FLAGS)
+    if maintenance and not args.index:
+        p.error("--add/--remove/--compact/--quantize/--build-ann/--build-sparse need --index or --build-index.")
+
+    if args.add or args.remove or args.compact:
+        index = EmbeddingIndex.open(args.index)
+        if args.add:
+            added = index.add(_load_corpus(args.add), get_encoder(index.model_name))
+            print(f"Added {added} documents to {args.index}")
+        if args.remove:
+            print(f"Removed {index.remove(parse_id(i) for i in args.remove)} documents from {args.index}")
+        dropped = index.compact() if args.compact else index.compact_if_needed()
+        if dropped:
+            print(f"Compacted {args.index}: dropped {dropped} tombstoned rows")
+
+    if args.quantize:
+        EmbeddingIndex.open(args.index).quantize(args.quantize)
+        print(f"Stored {args.quantize} rows in {args.index}")
+
+    if args.build_ann:
+        ivf = EmbeddingIndex.open(args.index).build_ann(args.nlist)
+        print(f"Built IVF with {ivf.nlist} lists in {args.index}")
+
+    if args.build_sparse:
+        sparse = EmbeddingIndex.open(args.index).build_sparse()
+        print(f"Built TF-IDF prefilter with {len(sparse.vectorizer.vocabulary_)} terms in {args.index}")
+
+    if not args.query and not args.queries:
+        if maintenance:
+            return 0
+        p.error("--query or --queries is required (unless only building an index).")
+    if args.mode != "exact" and not args.index:
+        p.error(f"--mode {args.mode} needs --index.")
+
+    ranker = load_ranker(args)
+    queries = load_queries(args.queries) if args.queries else [args.query]
+    results = ranker.rank(
+        queries,
+        args.top_k,
+        mode=args.mode,
+        nprobe=args.nprobe,
+        rerank=args.rerank,
+        candidates=args.candidates,
+    )
 
+    if args.stream:
+        print_results(args, queries, results)
     if not args.no_explain:
-        df["explanation"] = [
-            _explain_relevance(args.query, t, args.explain_model) for t in df["text"].tolist()
-        ]
-
-    print(df.to_string(index=False))
+        cache = ResultCache(args.explain_cache, max_entries=args.explain_cache_size) if args.explain_cache else None
+        options = dict(
+            max_new_tokens=args.max_new_tokens,
+            batch_size=args.explain_batch_size,
+            budget=args.explain_budget,
+            cache=cache,
+            model_name=args.explain_model,
+        )
+        try:
+            generator = LazyGenerator(args.explain_model)
+            if args.stream:
+                explained = 0
+                for qi, hi, explanation in stream_explanations(generator, queries, results, **options):
+                    hit = results[qi][hi]
+                    line = {"query": queries[qi], "rank": hi + 1, "id": hit["id"], "explanation": explanation}
+                    print(json.dumps(line, ensure_ascii=False), flush=True)
+                    explained += 1
+            else:
+                explained = explain_hits(generator, queries, results, **options)
+        finally:
+            if cache is not None:
+                cache.flush()
+                print(f"Explanation cache: {cache.stats()}", file=sys.stderr)
+                cache.close()
+        skipped = sum(len(hits) for hits in results) - explained
+        if skipped:
+            print(f"Explanation budget of {args.explain_budget}s used up: skipped {skipped} explanations.", file=sys.stderr)
+
+    if not args.stream:
+        print_results(args, queries, results)
     return 0
 
 
@@ -0,0 +1,141 @@
+"""Batched multi-query ranking over an in-memory corpus or an embedding index."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.event_rank_explain.encoders import encode
+from src.event_rank_explain.index import EmbeddingIndex
+from src.event_rank_explain.scoring import top_k_rows
+
+
+class Ranker:
+    """Rank many queries at once against a fixed set of document embeddings.
+
+    Queries are encoded in one batch (repeated queries come from an LRU cache
+    of ``cache_size`` embeddings) and scored with one matrix product per block
+    of ``block_size`` queries, followed by a per-row top-k.
+
+    Args:
+        encoder: SentenceTransformer-style encoder used for the queries.
+        embeddings: ``(N, dim)`` L2-normalised float32 rows (may be a memmap).
+        ids, texts: Per-row document id and text.
+        index: Set when the rows come from an :class:`EmbeddingIndex`; needed
+            for ``mode="ann"`` and ``mode="hybrid"``. Rows, ids and texts are then read from the
+            index on every call, so documents added to it are picked up.
+    """
+
+    def __init__(
+        self,
+        encoder,
+        embeddings: Optional[np.ndarray],
+        ids: Sequence,
+        texts: Sequence[str],
+        *,
+        index: Optional[EmbeddingIndex] = None,
+        cache_size: int = 1024,
+        block_size: int = 256,
+    ):
+        self.encoder = encoder
+        self._embeddings = embeddings
+        self._ids = ids
+        self._texts = texts
+        self.index = index
+        self.cache_size = cache_size
+        self.block_size = block_size
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @classmethod
+    def from_index(cls, index: EmbeddingIndex, encoder, **kwargs) -> "Ranker":
+        return cls(encoder, None, (), (), index=index, **kwargs)
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        return self.index.embeddings if self.index is not None else self._embeddings
+
+    @property
+    def ids(self) -> Sequence:
+        return self.index.ids if self.index is not None else self._ids
+
+    @property
+    def texts(self) -> Sequence[str]:
+        return self.index.texts if self.index is not None else self._texts
+
+    @classmethod
+    def from_docs(cls, docs: Sequence[Dict], encoder, *, batch_size: int = 64, **kwargs) -> "Ranker":
+        """Encode ``docs`` (dicts with ``id`` and ``text``) in memory."""
+        if not docs:
+            raise ValueError("Cannot rank against an empty corpus.")
+        texts = [d["text"] for d in docs]
+        embeddings = encode(encoder, texts, batch_size=batch_size)
+        return cls(encoder, embeddings, [d["id"] for d in docs], texts, **kwargs)
+
+    def embed_queries(self, queries: Sequence[str]) -> np.ndarray:
+        """``(len(queries), dim)`` embeddings; only unseen queries are encoded."""
+        missing = list(dict.fromkeys(q for q in queries if q not in self._cache))
+        self.cache_misses += len(missing)
+        self.cache_hits += len(queries) - len(missing)
+        fresh = dict(zip(missing, encode(self.encoder, missing))) if missing else {}
+
+        out = []
+        for q in queries:
+            if q in fresh:
+                emb = fresh[q]
+                self._cache[q] = emb
+            else:
+                emb = self._cache[q]
+            self._cache.move_to_end(q)
+            out.append(emb)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return np.stack(out) if out else np.empty((0, self.embeddings.shape[1]), dtype=np.float32)
+
+    def rank(
+        self,
+        queries: Sequence[str],
+        top_k: int = 5,
+        *,
+        mode: str = "exact",
+        nprobe: int = 8,
+        rerank: Optional[int] = None,
+        candidates: Optional[int] = None,
+    ) -> List[List[Dict]]:
+        """For each query, its ``top_k`` documents as ``{"id", "text", "score"}``, best first.
+
+        ``mode``, ``nprobe``, ``rerank`` and ``candidates`` are passed on to
+        the index (see :meth:`EmbeddingIndex.search`).
+        """
+        query_emb = self.embed_queries(queries)
+        results: List[List[Dict]] = []
+
+        if mode != "exact":
+            if self.index is None:
+                raise ValueError(f"mode='{mode}' needs a Ranker built from an EmbeddingIndex.")
+            for text, q in zip(queries, query_emb):
+                rows, scores = self.index.search(
+                    q, top_k, mode=mode, nprobe=nprobe, rerank=rerank, query_text=text, candidates=candidates
+                )
+                results.append(self._hits(rows, scores))
+            return results
+
+        for start in range(0, len(query_emb), self.block_size):
+            block = query_emb[start : start + self.block_size]
+            if self.index is not None:
+                rows, scores = self.index.search_batch(block, top_k, rerank=rerank)
+            else:
+                scores = block @ self.embeddings.T
+                rows = top_k_rows(scores, top_k)
+                scores = np.take_along_axis(scores, rows, axis=1)
+            for r, s in zip(rows, scores):
+                results.append(self._hits(r, s))
+        return results
+
+    def _hits(self, rows: np.ndarray, scores: np.ndarray) -> List[Dict]:
+        return [
+            {"id": self.ids[r], "text": self.texts[r], "score": float(s)}
+            for r, s in zip(rows.tolist(), scores.tolist())
+        ]
@@ -0,0 +1,104 @@
+"""Scoring helpers shared by the exact and approximate search paths."""
+from __future__ import annotations
+
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` largest scores, best first, without a full sort."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        part = np.argpartition(-scores, k - 1)[:k]
+    else:
+        part = np.arange(len(scores))
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
+def top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """Per-row :func:`top_k_indices` for a ``(queries, docs)`` score matrix."""
+    n_queries, n_docs = scores.shape
+    k = min(k, n_docs)
+    if k <= 0:
+        return np.empty((n_queries, 0), dtype=np.int64)
+    if k < n_docs:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        part = np.broadcast_to(np.arange(n_docs), (n_queries, n_docs))
+    order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1)
+
+
+QUANTIZATIONS = ("float32", "float16", "int8")
+
+
+def quantize(emb: np.ndarray, kind: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Quantize float32 rows; returns ``(values, per-row scales or None)``.
+
+    ``int8`` stores ``round(x / scale)`` with ``scale = max|x| / 127`` per row,
+    ``float16`` is a plain cast.
+    """
+    emb = np.asarray(emb, dtype=np.float32)
+    if kind == "float32":
+        return emb, None
+    if kind == "float16":
+        return emb.astype(np.float16), None
+    if kind == "int8":
+        scales = np.abs(emb).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        values = np.rint(emb / scales[:, None]).astype(np.int8)
+        return values, scales.astype(np.float32)
+    raise ValueError(f"Unknown quantization '{kind}', expected one of {QUANTIZATIONS}.")
+
+
+def quantized_scores(
+    values: np.ndarray,
+    scales: Optional[np.ndarray],
+    queries: np.ndarray,
+    *,
+    chunk_size: int = 65536,
+) -> np.ndarray:
+    """``(queries, rows)`` inner products against quantized rows.
+
+    Rows are widened to float32 one chunk at a time, so the full-precision
+    matrix never exists in memory.
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    out = np.empty((len(queries), len(values)), dtype=np.float32)
+    for start in range(0, len(values), chunk_size):
+        block = np.asarray(values[start : start + chunk_size], dtype=np.float32)
+        out[:, start : start + len(block)] = queries @ block.T
+    if scales is not None:
+        out *= scales
+    return out
+
+
+def rank_candidates(
+    candidates: np.ndarray,
+    query_emb: np.ndarray,
+    top_k: int,
+    *,
+    score_rows: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    exact_rows: Optional[Callable[[np.ndarray, np.ndarray], np.ndarray]] = None,
+    rerank: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-k of a candidate row set, best first.
+
+    Args:
+        score_rows: ``(rows, query) -> scores`` used to rank candidates.
+        exact_rows: Exact float32 scorer used when ``rerank`` > 0.
+        rerank: Re-score this many best candidates with ``exact_rows``
+            before the final top-k cut (0 = off).
+    """
+    if len(candidates) == 0:
+        return candidates, np.empty(0, dtype=np.float32)
+    scores = score_rows(candidates, query_emb)
+    if rerank and exact_rows is not None:
+        pool = top_k_indices(scores, max(rerank, top_k))
+        candidates = candidates[pool]
+        scores = exact_rows(candidates, query_emb)
+    best = top_k_indices(scores, top_k)
+    return candidates[best], scores[best]
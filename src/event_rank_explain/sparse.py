@@ -0,0 +1,151 @@
+"""TF-IDF inverted index used as a cheap candidate prefilter for dense ranking.
+
+The document-term matrix is kept column-major (CSC), so each term column is a
+posting list. A query only touches the postings of its own terms, and the
+best ``k`` documents by TF-IDF cosine become the candidate set that the
+embedding scorer then ranks.
+
+The vocabulary and IDF weights are fixed when the index is built; documents
+added later are vectorized with them and kept as delta segments, one
+``sparse_delta.<first row>.npz`` file per add, so an add costs time
+proportional to the new rows. Terms that first appear in added documents are
+not in the vocabulary, so those documents cannot be found by them until
+:meth:`SparseIndex.refit` (run by ``EmbeddingIndex.compact``) fits the
+vocabulary again; :attr:`SparseIndex.delta_rows` counts the rows affected.
+"""
+from __future__ import annotations
+
+import glob
+import os
+from typing import Iterable, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import scipy.sparse as sp
+from sklearn.base import clone
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from src.event_rank_explain.scoring import top_k_indices
+
+
+SPARSE_FILE = "sparse.joblib"
+SPARSE_DELTA_PATTERN = "sparse_delta.{:012d}.npz"
+_FORMAT_VERSION = 1
+
+
+def _posting_scores(matrix: sp.csc_matrix, q: sp.csr_matrix) -> Tuple[np.ndarray, np.ndarray]:
+    """Rows of ``matrix`` sharing a term with ``q`` and their TF-IDF dot products."""
+    postings = matrix[:, q.indices]
+    weights = postings.data * np.repeat(q.data, np.diff(postings.indptr))
+    rows, inverse = np.unique(postings.indices, return_inverse=True)
+    return rows, np.bincount(inverse, weights=weights, minlength=len(rows))
+
+
+class SparseIndex:
+    """Fitted TF-IDF vectorizer plus the ``(rows, terms)`` matrix in CSC form.
+
+    ``deltas`` are the CSC matrices of rows added since, in order.
+    """
+
+    def __init__(
+        self,
+        vectorizer: TfidfVectorizer,
+        matrix: sp.csc_matrix,
+        deltas: Optional[List[sp.csc_matrix]] = None,
+    ):
+        self.vectorizer = vectorizer
+        self.matrix = matrix
+        self.deltas = list(deltas or [])
+
+    def __len__(self) -> int:
+        return sum(m.shape[0] for m in self.segments())
+
+    def segments(self) -> List[sp.csc_matrix]:
+        return [self.matrix] + self.deltas
+
+    @property
+    def delta_rows(self) -> int:
+        """Rows added since the vocabulary was fitted."""
+        return sum(m.shape[0] for m in self.deltas)
+
+    @classmethod
+    def build(cls, texts: Iterable[str], *, stop_words: Optional[str] = "english") -> "SparseIndex":
+        vectorizer = TfidfVectorizer(stop_words=stop_words, sublinear_tf=True, dtype=np.float32)
+        matrix = vectorizer.fit_transform(texts)
+        return cls(vectorizer, matrix.tocsc())
+
+    def candidates(self, query: str, k: int) -> np.ndarray:
+        """Rows of the ``k`` best TF-IDF matches of ``query`` (unordered; only rows sharing a term)."""
+        q = self.vectorizer.transform([query])
+        if q.nnz == 0:
+            return np.empty(0, dtype=np.int64)
+        all_rows, all_scores = [], []
+        start = 0
+        for matrix in self.segments():
+            rows, scores = _posting_scores(matrix, q)
+            all_rows.append(rows.astype(np.int64) + start)
+            all_scores.append(scores)
+            start += matrix.shape[0]
+        rows, scores = np.concatenate(all_rows), np.concatenate(all_scores)
+        if len(rows) <= k:
+            return rows
+        return rows[top_k_indices(scores, k)]
+
+    def add(self, texts: Iterable[str]) -> "SparseIndex":
+        """A copy with ``texts`` appended as a new delta segment (existing rows are not copied)."""
+        new = self.vectorizer.transform(texts).tocsc()
+        return SparseIndex(self.vectorizer, self.matrix, self.deltas + [new])
+
+    def refit(self, texts: Iterable[str]) -> "SparseIndex":
+        """A new index over ``texts`` with the vocabulary and IDF fitted again (same settings, no deltas)."""
+        vectorizer = clone(self.vectorizer)
+        return SparseIndex(vectorizer, vectorizer.fit_transform(texts).tocsc())
+
+    @staticmethod
+    def _delta_files(path: str) -> List[Tuple[int, str]]:
+        files = glob.glob(os.path.join(glob.escape(path), SPARSE_DELTA_PATTERN.replace("{:012d}", "*")))
+        return sorted((int(os.path.basename(f).split(".")[1]), f) for f in files)
+
+    def save(self, path: str) -> None:
+        """Write the main matrix and every delta segment, replacing earlier segment files."""
+        joblib.dump(
+            {"format_version": _FORMAT_VERSION, "vectorizer": self.vectorizer, "matrix": self.matrix},
+            os.path.join(path, SPARSE_FILE),
+        )
+        for _, file in self._delta_files(path):
+            os.remove(file)
+        start = self.matrix.shape[0]
+        for delta in self.deltas:
+            sp.save_npz(os.path.join(path, SPARSE_DELTA_PATTERN.format(start)), delta)
+            start += delta.shape[0]
+
+    def save_delta(self, path: str) -> None:
+        """Write only the newest delta segment (after :meth:`add`)."""
+        start = len(self) - self.deltas[-1].shape[0]
+        sp.save_npz(os.path.join(path, SPARSE_DELTA_PATTERN.format(start)), self.deltas[-1])
+
+    @classmethod
+    def load(cls, path: str, rows: Optional[int] = None) -> Optional["SparseIndex"]:
+        """Load ``sparse.joblib`` and its delta segments from an index directory, or None if it has none.
+
+        Segments that do not continue the rows loaded so far, or (with
+        ``rows``) reach past that many rows, are leftovers of an interrupted
+        add or merge and are ignored.
+        """
+        file = os.path.join(path, SPARSE_FILE)
+        if not os.path.exists(file):
+            return None
+        state = joblib.load(file)
+        if state.get("format_version") != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported sparse index format in '{file}'.")
+        index = cls(state["vectorizer"], state["matrix"])
+        total = index.matrix.shape[0]
+        for start, delta_file in cls._delta_files(path):
+            if start != total:
+                continue
+            delta = sp.load_npz(delta_file).tocsc()
+            if rows is not None and start + delta.shape[0] > rows:
+                break
+            index.deltas.append(delta)
+            total += delta.shape[0]
+        return index
@@ -0,0 +1,227 @@
+"""Knowledge-graph builders, serial or sharded across worker processes.
+
+Texts are cut into chunks and each worker process, holding its own warm spaCy
+pipeline, turns a chunk into a compact partial result: :class:`~src.knowgraph.svo.Triple`
+records for the SVO graphs of the ``kg_genericV2*`` scripts, or short graph
+operations for the headline graphs of the ``kg_creation_*`` scripts. Partial
+results come back in input order and are replayed onto one ``nx.DiGraph``,
+so node attributes and edge relations end up exactly as in a single-process
+build (later texts overwrite earlier ones).
+
+    kg = nx.DiGraph()
+    triples = add_triples(kg, svo_triples(texts, nlp, workers=8))
+
+    kg = build_kg_from_texts(texts, workers=8)
+"""
+from __future__ import annotations
+
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import networkx as nx
+from spacy.language import Language
+from spacy.tokens import Doc, Token
+
+from src.event_extraction.nlp_registry import get_nlp
+from src.event_extraction.stream_io import chunked
+from src.knowgraph.svo import OBJ_DEPS, SUBJ_DEPS, Triple, extract_triples_per_text
+
+
+# ("ent", text, label) | ("arg", text) | ("edge", subj, obj, relation, sentence)
+GraphOp = Tuple
+
+# per-worker state, set once by _init_worker
+_worker: Dict = {}
+
+
+def _init_worker(spacy_model: str, task: str, batch_size: int) -> None:
+    _worker.update(nlp=get_nlp(spacy_model, task=task, warm=True), batch_size=batch_size)
+
+
+def _check_nlp(nlp: Optional[Language], workers: Optional[int]) -> None:
+    if nlp is not None and workers != 1:
+        raise ValueError("nlp is only used in-process (workers=1); worker processes load spacy_model themselves")
+
+
+def _plan(texts: Iterable[str], workers: Optional[int], chunk_size: int) -> Tuple[List[List[str]], int]:
+    """Chunks of ``texts`` and the worker processes worth starting for them (1 = stay in-process)."""
+    chunks = list(chunked(texts, chunk_size))
+    return chunks, max(1, min(workers or os.cpu_count() or 1, len(chunks)))
+
+
+def _map_chunks(
+    fn: Callable[[List[str]], List],
+    chunks: List[List[str]],
+    *,
+    workers: int,
+    spacy_model: str,
+    task: str,
+    batch_size: int,
+) -> Iterator[List]:
+    """Run ``fn`` over ``chunks`` on a process pool; results in input order."""
+    max_pending = 2 * workers
+    executor = ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(spacy_model, task, batch_size)
+    )
+    pending: Deque[Future] = deque()
+    try:
+        for chunk in chunks:
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+            pending.append(executor.submit(fn, chunk))
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+# ---- SVO triples (kg_genericV2*) ----
+
+
+def _svo_chunk(texts: List[str]) -> List[List[Triple]]:
+    return list(extract_triples_per_text(texts, _worker["nlp"], batch_size=_worker["batch_size"]))
+
+
+def svo_triples_per_text(
+    texts: Iterable[str],
+    nlp: Optional[Language] = None,
+    *,
+    workers: Optional[int] = 1,
+    spacy_model: str = "en_core_web_sm",
+    chunk_size: int = 50,
+    batch_size: int = 64,
+) -> Iterator[List[Triple]]:
+    """One list of SVO triples per text, in input order.
+
+    With ``workers`` 1 this is :func:`~src.knowgraph.svo.extract_triples_per_text`
+    in-process with ``nlp``; otherwise (``None`` = CPU count) chunks of
+    ``chunk_size`` texts go to worker processes that each load ``spacy_model``
+    for the ``svo`` task, and passing ``nlp`` is an error.
+    """
+    _check_nlp(nlp, workers)
+    if workers != 1:
+        chunks, workers = _plan(texts, workers, chunk_size)
+        texts = [t for chunk in chunks for t in chunk]
+    if workers == 1:
+        yield from extract_triples_per_text(texts, nlp or get_nlp(spacy_model, task="svo"), batch_size=batch_size)
+        return
+    for part in _map_chunks(
+        _svo_chunk, chunks, workers=workers, spacy_model=spacy_model, task="svo", batch_size=batch_size
+    ):
+        yield from part
+
+
+def svo_triples(texts: Iterable[str], nlp: Optional[Language] = None, **kwargs) -> Iterator[Triple]:
+    """The SVO triples of ``texts`` in input order; ``kwargs`` as for :func:`svo_triples_per_text`."""
+    for triples in svo_triples_per_text(texts, nlp, **kwargs):
+        yield from triples
+
+
+# ---- headline graphs (kg_creation_*) ----
+
+
+def phrase_for_token(tok: Token) -> str:
+    """A short phrase for a token: left compounds/adjectives, the token, right compounds."""
+    parts = []
+    for child in tok.lefts:
+        if child.dep_ in ("compound", "amod"):
+            parts.append(child.text)
+    parts.append(tok.text)
+    for child in tok.rights:
+        if child.dep_ in ("compound",):
+            parts.append(child.text)
+    return " ".join(parts).strip()
+
+
+def headline_ops(doc: Doc, subj_deps=SUBJ_DEPS, obj_deps=OBJ_DEPS) -> List[GraphOp]:
+    """Graph operations for one parsed text: subject -> object edges labeled by verb."""
+    ops: List[GraphOp] = []
+    # add entities as nodes for clarity (if available)
+    for ent in doc.ents:
+        ops.append(("ent", ent.text, ent.label_))
+    for sent in doc.sents:
+        for tok in sent:
+            if tok.pos_ != "VERB":
+                continue
+            subj = None
+            obj = None
+            for ch in tok.children:
+                if ch.dep_ in subj_deps and ch.pos_ in ("NOUN", "PROPN"):
+                    subj = phrase_for_token(ch)
+                if ch.dep_ in obj_deps and ch.pos_ in ("NOUN", "PROPN"):
+                    obj = phrase_for_token(ch)
+            # also allow prepositional object as object if no direct object
+            if not obj:
+                for ch in tok.children:
+                    if ch.dep_ == "prep":
+                        for pc in ch.children:
+                            if pc.dep_ == "pobj" and pc.pos_ in ("NOUN", "PROPN"):
+                                obj = phrase_for_token(pc)
+                                break
+            if subj:
+                ops.append(("arg", subj))
+            if obj:
+                ops.append(("arg", obj))
+            if subj and obj:
+                ops.append(("edge", subj, obj, tok.lemma_.lower(), sent.text.strip()))
+    return ops
+
+
+def apply_ops(kg: nx.DiGraph, ops: Iterable[GraphOp]) -> nx.DiGraph:
+    for op in ops:
+        if op[0] == "ent":
+            kg.add_node(op[1], type=op[2])
+        elif op[0] == "arg":
+            kg.add_node(op[1], type="ARG")
+        else:
+            kg.add_edge(op[1], op[2], relation=op[3], sentence=op[4])
+    return kg
+
+
+def _headline_chunk(texts: List[str], subj_deps=SUBJ_DEPS, obj_deps=OBJ_DEPS) -> List[GraphOp]:
+    ops: List[GraphOp] = []
+    for doc in _worker["nlp"].pipe(texts, batch_size=_worker["batch_size"]):
+        ops.extend(headline_ops(doc, subj_deps, obj_deps))
+    return ops
+
+
+def build_kg_from_texts(
+    texts: Sequence[str],
+    nlp: Optional[Language] = None,
+    *,
+    subj_deps=SUBJ_DEPS,
+    obj_deps=OBJ_DEPS,
+    workers: Optional[int] = 1,
+    spacy_model: str = "en_core_web_sm",
+    chunk_size: int = 50,
+    batch_size: int = 64,
+) -> nx.DiGraph:
+    """A simple KG from sentences, keeping only the largest connected component.
+
+    Each text is processed separately to avoid overly connecting unrelated
+    sentences. ``nlp``, ``workers``, ``spacy_model`` and ``chunk_size`` work as
+    in :func:`svo_triples_per_text`; in-process parsing defaults to the full
+    ``spacy_model`` pipeline, since entities become nodes.
+    """
+    _check_nlp(nlp, workers)
+    kg = nx.DiGraph()
+    if not texts:
+        return kg
+    chunks, workers = _plan(texts, workers, chunk_size)
+    if workers == 1:
+        nlp = nlp or get_nlp(spacy_model, task="full")
+        for doc in nlp.pipe(texts, batch_size=batch_size):
+            apply_ops(kg, headline_ops(doc, subj_deps, obj_deps))
+    else:
+        fn = partial(_headline_chunk, subj_deps=set(subj_deps), obj_deps=set(obj_deps))
+        for ops in _map_chunks(fn, chunks, workers=workers, spacy_model=spacy_model, task="full", batch_size=batch_size):
+            apply_ops(kg, ops)
+
+    # keep only the largest connected component to reduce noise
+    if kg.number_of_nodes() > 0:
+        largest = max(nx.weakly_connected_components(kg), key=len)
+        kg.remove_nodes_from(set(kg.nodes()) - set(largest))
+    return kg
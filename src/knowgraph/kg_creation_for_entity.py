@@ -1,8 +1,10 @@
+import argparse
 import os
 import re
 import requests
 import networkx as nx
-import spacy
+from src.event_extraction.nlp_registry import get_nlp
+from src.knowgraph.build import build_kg_from_texts
 import matplotlib.pyplot as plt
 from dotenv import load_dotenv, dotenv_values 
 from difflib import SequenceMatcher
@@ -29,7 +31,7 @@ newsapi = NewsApiClient(api_key=NEWSAPI_KEY)
 r = newsapi.get_sources()
 sources = [s['id'] for s in r["sources"] if s['language'] == "en"]
 
-nlp = spacy.load("en_core_web_sm")
+nlp = get_nlp("en_core_web_sm", task="full")
 
 # ---- fetching headlines  ----
 def fetch_headlines(query, sources, api_key, language="en", page_size=100):
@@ -59,65 +61,6 @@ def fetch_headlines(query, sources, api_key, language="en", page_size=100):
         texts.append(text)
     return texts
 
-# small helper to build a short phrase for a token (compounds + token)
-def phrase_for_token(tok):
-    parts = []
-    for child in tok.lefts:
-        if child.dep_ in ("compound", "amod"): #, "det"):
-            parts.append(child.text)
-    parts.append(tok.text)
-    for child in tok.rights:
-        if child.dep_ in ("compound",):
-            parts.append(child.text)
-    return " ".join(parts).strip()
-
-# ---- build a very simple KG from sentences: subject -> object edges labeled by verb ----
-def build_kg_from_texts(texts):
-    kg = nx.DiGraph()
-    if not texts:
-        return kg
-    subj_deps = {"nsubj", "nsubjpass", "csubj", "agent", "expl"}
-    obj_deps = {"dobj", "dative", "attr", "oprd", "pobj", "obj"}
-    # process each text separately to avoid overly connecting unrelated sentences
-    for t in texts:
-        doc = nlp(t)
-        # add entities as nodes for clarity (if available)
-        for ent in doc.ents:
-            kg.add_node(ent.text, type=ent.label_)
-        for sent in doc.sents:
-            for tok in sent:
-                if tok.pos_ == "VERB":
-                    subj = None
-                    obj = None
-                    for ch in tok.children:
-                        if ch.dep_ in subj_deps and ch.pos_ in ("NOUN", "PROPN"): #, "PRON"):
-                            subj = phrase_for_token(ch)
-                        if ch.dep_ in obj_deps and ch.pos_ in ("NOUN", "PROPN"): #, "PRON"):
-                            obj = phrase_for_token(ch)
-                    ####also allow prepositional object as object if no direct object
-                    if not obj:
-                        for ch in tok.children:
-                            if ch.dep_ == "prep":
-                                for pc in ch.children:
-                                    if pc.dep_ == "pobj" and pc.pos_ in ("NOUN", "PROPN"):
-                                        obj = phrase_for_token(pc)
-                                        break
-                    if subj:
-                        kg.add_node(subj, type="ARG")
-                    if obj:
-                        kg.add_node(obj, type="ARG")
-                    if subj and obj:
-                        rel = tok.lemma_.lower()
-                        kg.add_edge(subj, obj, relation=rel, sentence=sent.text.strip())
-    # Optionally keep only the largest connected component to reduce noise
-    if kg.number_of_nodes() > 0:
-        comps = list(nx.weakly_connected_components(kg))
-        if len(comps) > 0:
-            largest = max(comps, key=len)
-            rm = set(kg.nodes()) - set(largest)
-            kg.remove_nodes_from(rm)
-    return kg
-
 # ---- draw and save the KG with a simple layout ----
 def draw_and_save_kg(kg, out_path, name):
     out_path = os.path.join(OUTPUT_DIR, name)
@@ -257,12 +200,18 @@ def simple_entity_linking(kg, threshold=0.8, verbose=False):
     return merged
 
 # ---- main flow ----
-def main():
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Build a knowledge graph from news headlines about one entity.")
+    p.add_argument("--workers", type=int, default=1, help="Parser processes (0 = one per CPU; default: 1).")
+    args = p.parse_args(argv)
+    # worker processes load their own pipeline, so nlp is only used in-process
+    workers = args.workers or None
+
     texts = fetch_headlines(QUERY, ", ".join(sources), NEWSAPI_KEY)
     if not texts:
         print("No articles fetched.")
         return
-    kg = build_kg_from_texts(texts)
+    kg = build_kg_from_texts(texts, nlp if workers == 1 else None, workers=workers)
     
     kg_linked = kg.copy()
     entity_linked = simple_entity_linking(kg_linked)
@@ -1,8 +1,12 @@
+import argparse
 import os
 import re
 import requests
 import networkx as nx
-import spacy
+from src.event_extraction.nlp_registry import get_nlp
+from src.knowgraph.build import svo_triples
+from src.knowgraph.store import KGStore
+from src.knowgraph.svo import add_triples
 import matplotlib.pyplot as plt
 from dotenv import load_dotenv, dotenv_values 
 from difflib import SequenceMatcher
@@ -23,11 +27,16 @@ newsapi = NewsApiClient(api_key=NEWSAPI_KEY)
 r = newsapi.get_sources()
 sources = [s['id'] for s in r["sources"] if s['language'] == "en"]
 
-nlp = spacy.load("en_core_web_sm")
+nlp = get_nlp("en_core_web_sm", task="svo")
 
 QUERY = "Donald Trump"
 # def fetch_headlines(query, sources, api_key, language="en", page_size=10):
 def fetch_headlines(query, sources, api_key, from_date, to_date, language="en", page_size=100):
+    return [text for _, text in fetch_articles(query, sources, api_key, from_date, to_date, language, page_size)]
+
+
+def fetch_articles(query, sources, api_key, from_date, to_date, language="en", page_size=100):
+    """(url, text) per article, the url being the id a KGStore keys it by."""
     url = "https://newsapi.org/v2/everything"
     params = {
         "q": query,
@@ -47,151 +56,32 @@ def fetch_headlines(query, sources, api_key, from_date, to_date, language="en",
         print("Failed to fetch headlines:", e)
         return []
     articles = data.get("articles", [])
-    texts = []
+    out = []
     for a in articles:
         desc = a.get("description") or ""
         cont = a.get("content") or ""
         # text = f"{desc}. {cont}"
         text = cont
         text = re.sub(r"\[.*?\]", "", text).strip()
-        texts.append(text)
-    return texts
+        out.append((a.get("url") or text, text))
+    return out
 
-def kg_creation(texts):
+def kg_creation(texts, ids=None, store=None, workers=1):
+    """This run's KG; with a KGStore (and article ``ids``) only articles it has not seen are parsed.
+
+    With ``workers`` other than 1 the texts are parsed by that many processes (``None`` = one per CPU).
+    """
     kg = nx.DiGraph()
 
     kg_creation.min_edges = 2  # optional: nodes must have degree >= min_edges
     min_edges = getattr(kg_creation, "min_edges", None)
 
-    # extract simple SVO triples and add them to the kg
-    subj_deps = {"nsubj", "nsubjpass", "csubj", "agent", "expl"}
-    obj_deps = {"dobj", "dative", "attr", "oprd", "pobj", "obj"}
-    triples = []
-
-    for t in texts:
-        sentences = [i for i in nlp(t).sents]
-        for s in sentences:
-            # print(s)
-            doc = s.as_doc()
-
-            def phrase_text(tok):
-                # prefer the noun-chunk root if available
-                root = tok
-                for nc in doc.noun_chunks:
-                    if tok.i >= nc.start and tok.i < nc.end:
-                        root = nc.root
-                        break
-
-                # For proper nouns, keep contiguous PROPNs (e.g. "New York Times")
-                if root.pos_ == "PROPN":
-                    start = root.i
-                    end = root.i
-                    while start - 1 >= 0 and doc[start - 1].pos_ == "PROPN":
-                        start -= 1
-                    while end + 1 < len(doc) and doc[end + 1].pos_ == "PROPN":
-                        end += 1
-                    return doc[start : end + 1].text
-
-                # For common nouns, include only left-side compounds/adjectival modifiers + head
-                if root.pos_ in {"NOUN", "PROPN"}:
-                    left_mods = [t for t in root.lefts if t.dep_ in {"compound", "amod"}]
-                    left_mods = sorted(left_mods, key=lambda t: t.i)
-                    parts = [t.text for t in left_mods] + [root.text]
-                    return " ".join(parts)
-
-                # fallback to token text
-                return root.text
-
-            def normalize_arg(tok):
-                # exclude pronouns and auxiliaries
-                if tok.pos_ in {"PRON", "AUX"}:
-                    return None
-                # prefer noun-chunk root if present (gives canonical head)
-                for nc in doc.noun_chunks:
-                    if tok.i >= nc.start and tok.i < nc.end:
-                        root = nc.root
-                        if root.pos_ in {"PRON", "AUX"}:
-                            return None
-                        if root.ent_type_ or root.pos_ in {"NOUN", "PROPN"}:
-                            return root
-                        return None
-                # keep named entities or nouns/proper nouns
-                if tok.ent_type_ or tok.pos_ in {"NOUN", "PROPN"}:
-                    return tok
-                return None
-
-            def filter_and_dedupe(candidates):
-                seen = set()
-                out = []
-                for c in candidates:
-                    n = normalize_arg(c)
-                    if n and n.i not in seen:
-                        seen.add(n.i)
-                        out.append(n)
-                return out
-
-            for token in doc:
-                # skip auxiliaries entirely (they should not be treated as main relations)
-                if token.pos_ == "AUX":
-                    continue
-                # consider main verbs (and root tokens) but not auxiliaries
-                if not (token.pos_ == "VERB" or token.dep_ == "ROOT"):
-                    continue
-
-                raw_subjects = [c for c in token.children if c.dep_ in subj_deps]
-                raw_objects = [c for c in token.children if c.dep_ in obj_deps]
-
-                # include objects reached via prepositions (prep -> pobj)
-                for prep in (c for c in token.children if c.dep_ == "prep"):
-                    raw_objects.extend([c for c in prep.children if c.dep_ == "pobj"])
-
-                subjects = filter_and_dedupe(raw_subjects)
-                objects = filter_and_dedupe(raw_objects)
-
-                # if there are subjects and objects, create triples
-                if subjects and objects:
-                    for subj in subjects:
-                        subj_group = [subj] + list(subj.conjuncts)
-                        for s_tok in subj_group:
-                            s_norm = normalize_arg(s_tok)
-                            if not s_norm:
-                                continue
-                            s_text = phrase_text(s_norm)
-                            kg.add_node(s_text, lemma=s_norm.lemma_, pos=s_norm.pos_)
-                            for obj in objects:
-                                obj_group = [obj] + list(obj.conjuncts)
-                                for o_tok in obj_group:
-                                    o_norm = normalize_arg(o_tok)
-                                    if not o_norm:
-                                        continue
-                                    o_text = phrase_text(o_norm)
-                                    kg.add_node(o_text, lemma=o_norm.lemma_, pos=o_norm.pos_)
-                                    rel = token.lemma_.lower()
-                                    kg.add_edge(s_text, o_text, relation=rel, dep=token.dep_)
-                                    triples.append((s_text, rel, o_text))
-
-                # also handle verb -> prepositional relations when no direct object
-                elif subjects:
-                    for subj in subjects:
-                        subj_group = [subj] + list(subj.conjuncts)
-                        for s_tok in subj_group:
-                            s_norm = normalize_arg(s_tok)
-                            if not s_norm:
-                                continue
-                            s_text = phrase_text(s_norm)
-                            for prep in (c for c in token.children if c.dep_ == "prep"):
-                                for pobj in (c for c in prep.children if c.dep_ == "pobj"):
-                                    o_norm = normalize_arg(pobj)
-                                    if not o_norm:
-                                        continue
-                                    o_group = [o_norm] + list(o_norm.conjuncts)
-                                    for o_tok in o_group:
-                                        o_text = phrase_text(o_tok)
-                                        kg.add_node(s_text, lemma=s_norm.lemma_, pos=s_norm.pos_)
-                                        kg.add_node(o_text, lemma=o_tok.lemma_, pos=o_tok.pos_)
-                                        rel = f"{token.lemma_.lower()}_{prep.text.lower()}"
-                                        kg.add_edge(s_text, o_text, relation=rel, dep=token.dep_)
-                                        triples.append((s_text, rel, o_text))
+    # extract simple SVO triples and add them to the kg; worker processes load their own pipeline
+    parser = nlp if workers == 1 else None
+    if store is None:
+        triples = add_triples(kg, svo_triples(texts, parser, workers=workers))
+    else:
+        triples = add_triples(kg, store.article_triples(zip(ids, texts), parser, workers=workers))
 
     # remove nodes that contain week day names (case-insensitive)
     week_pattern = re.compile(r"\b(?:mon|monday|tue|tuesday|wed|wednesday|thu|thursday|fri|friday|sat|saturday|sun|sunday)\b", flags=re.I)
@@ -349,7 +239,14 @@ def kg_visualisation(kg1, kg2):
     plt.close()
 
 
-def main():
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Build SVO knowledge graphs from news articles.")
+    p.add_argument("--workers", type=int, default=1, help="Parser processes (0 = one per CPU; default: 1).")
+    p.add_argument("--store", help="SQLite KGStore to append every fetched article to; parses only unseen ones.")
+    args = p.parse_args(argv)
+    workers = args.workers or None
+    store = KGStore(args.store) if args.store else None
+
     today = datetime.utcnow().date()
 
     # 1-week range (used by fetch_headlines)
@@ -362,15 +259,19 @@ def main():
 
     print(f"One-week range: from_date={from_date}, to_date={to_date}")
     
-    texts = fetch_headlines(QUERY, sources, NEWSAPI_KEY, from_date, to_date)
+    articles = fetch_articles(QUERY, sources, NEWSAPI_KEY, from_date, to_date)
+    texts = [t for _, t in articles]
     # print(texts)
     # print()
-    kg1 = kg_creation(texts)
+    kg1 = kg_creation(texts, [a for a, _ in articles], store, workers)
 
     print(f"Two-week range: from_date={from_date_2}, to_date={to_date_2}")
-    texts = fetch_headlines(QUERY, sources, NEWSAPI_KEY, from_date_2, to_date_2)
+    articles = fetch_articles(QUERY, sources, NEWSAPI_KEY, from_date_2, to_date_2)
+    texts = [t for _, t in articles]
     # print(texts)
-    kg2 = kg_creation(texts)
+    kg2 = kg_creation(texts, [a for a, _ in articles], store, workers)
+    if store is not None:
+        store.close()
     kg_visualisation(kg1, kg2)
 
 if __name__ == "__main__":
@@ -0,0 +1,173 @@
+"""Persistent, incrementally updated SVO knowledge graph (SQLite).
+
+The store remembers which article ids it has ingested. :meth:`KGStore.ingest`
+parses only articles it has not seen, appends their triples and upserts the
+graph's nodes and edges, so a refresh costs time proportional to the new
+articles rather than the whole history:
+
+    with KGStore("output/kg.sqlite") as store:
+        store.ingest([(a["url"], a["content"]) for a in articles], workers=None)
+        kg = store.graph()
+
+Nodes and edges are kept with the attributes :func:`~src.knowgraph.svo.add_triples`
+sets, last writer wins, so :meth:`KGStore.graph` equals the graph built in one
+go from every ingested article in ingestion order. :meth:`KGStore.article_triples`
+gives a script the triples of just this run's articles, parsing only the new
+ones, so it can keep building its per-run graph:
+
+    kg = nx.DiGraph()
+    add_triples(kg, store.article_triples(articles))
+
+Articles are keyed by their own identifier (URL or API id); an article whose
+id is already stored is not parsed again, even if its text changed.
+"""
+from __future__ import annotations
+
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import networkx as nx
+from spacy.language import Language
+
+from src.knowgraph.build import svo_triples_per_text
+from src.knowgraph.svo import Triple
+
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS articles (id TEXT PRIMARY KEY, ingested_at REAL NOT NULL, triples INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS triples (seq INTEGER PRIMARY KEY, article_id TEXT NOT NULL, subject TEXT NOT NULL, "
+    "relation TEXT NOT NULL, object TEXT NOT NULL, subject_lemma TEXT, subject_pos TEXT, object_lemma TEXT, "
+    "object_pos TEXT, dep TEXT)",
+    "CREATE TABLE IF NOT EXISTS nodes (name TEXT PRIMARY KEY, lemma TEXT, pos TEXT)",
+    "CREATE INDEX IF NOT EXISTS triples_article ON triples (article_id, seq)",
+    "CREATE TABLE IF NOT EXISTS edges (subject TEXT NOT NULL, object TEXT NOT NULL, relation TEXT, dep TEXT, "
+    "PRIMARY KEY (subject, object))",
+)
+
+
+class KGStore:
+    """Ingested article ids, their triples and the merged graph in one SQLite file.
+
+    Args:
+        path: SQLite file (created if missing); ``":memory:"`` for a throwaway store.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def __contains__(self, article_id: str) -> bool:
+        return self._conn.execute("SELECT 1 FROM articles WHERE id = ?", (str(article_id),)).fetchone() is not None
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def ingest(
+        self,
+        articles: Iterable[Tuple[str, str]],
+        nlp: Optional[Language] = None,
+        **kwargs,
+    ) -> int:
+        """Parse and merge the ``(article_id, text)`` pairs not ingested yet; returns how many were new.
+
+        ``nlp`` and ``kwargs`` (``workers``, ``spacy_model``, ``chunk_size``,
+        ``batch_size``) are passed to :func:`~src.knowgraph.build.svo_triples_per_text`.
+        Everything is committed in one transaction, so an interrupted run
+        leaves no article half-ingested.
+        """
+        new = {}
+        for article_id, text in articles:
+            article_id = str(article_id)
+            if article_id not in new and article_id not in self:
+                new[article_id] = text
+        if not new:
+            return 0
+
+        now = time.time()
+        with self._conn:
+            for article_id, triples in zip(new, svo_triples_per_text(list(new.values()), nlp, **kwargs)):
+                self._conn.executemany(
+                    "INSERT INTO triples (article_id, subject, relation, object, subject_lemma, subject_pos, "
+                    "object_lemma, object_pos, dep) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(article_id,) + tuple(t) for t in triples],
+                )
+                for t in triples:
+                    self._upsert_node(t.subject, t.subject_lemma, t.subject_pos)
+                    self._upsert_node(t.object, t.object_lemma, t.object_pos)
+                    self._conn.execute(
+                        "INSERT INTO edges (subject, object, relation, dep) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (subject, object) DO UPDATE SET relation = excluded.relation, dep = excluded.dep",
+                        (t.subject, t.object, t.relation, t.dep),
+                    )
+                self._conn.execute(
+                    "INSERT INTO articles (id, ingested_at, triples) VALUES (?, ?, ?)", (article_id, now, len(triples))
+                )
+        return len(new)
+
+    def _upsert_node(self, name: str, lemma: str, pos: str) -> None:
+        # upserts keep the original rowid, so nodes load in first-seen order
+        self._conn.execute(
+            "INSERT INTO nodes (name, lemma, pos) VALUES (?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET lemma = excluded.lemma, pos = excluded.pos",
+            (name, lemma, pos),
+        )
+
+    def article_triples(
+        self,
+        articles: Iterable[Tuple[str, str]],
+        nlp: Optional[Language] = None,
+        **kwargs,
+    ) -> List[Triple]:
+        """The triples of ``articles`` in order, ingesting the new ones first (``kwargs`` as for :meth:`ingest`).
+
+        Articles already in the store are read back instead of parsed, so the
+        result equals ``svo_triples`` over the texts of articles never seen before.
+        """
+        articles = [(str(article_id), text) for article_id, text in articles]
+        self.ingest(articles, nlp, **kwargs)
+        out = []
+        for article_id, _ in articles:
+            rows = self._conn.execute(
+                "SELECT subject, relation, object, subject_lemma, subject_pos, object_lemma, object_pos, dep "
+                "FROM triples WHERE article_id = ? ORDER BY seq",
+                (article_id,),
+            )
+            out.extend(Triple(*row) for row in rows)
+        return out
+
+    def triples(self) -> List[Tuple[str, str, str]]:
+        """Every stored ``(subject, relation, object)`` in ingestion order."""
+        return self._conn.execute("SELECT subject, relation, object FROM triples ORDER BY seq").fetchall()
+
+    def graph(self, *, with_triples: bool = False) -> nx.DiGraph:
+        """The merged graph; ``with_triples`` also sets ``kg.graph["triples"]`` (reads the whole history)."""
+        kg = nx.DiGraph()
+        for name, lemma, pos in self._conn.execute("SELECT name, lemma, pos FROM nodes ORDER BY rowid"):
+            kg.add_node(name, lemma=lemma, pos=pos)
+        for subject, obj, relation, dep in self._conn.execute(
+            "SELECT subject, object, relation, dep FROM edges ORDER BY rowid"
+        ):
+            kg.add_edge(subject, obj, relation=relation, dep=dep)
+        if with_triples:
+            kg.graph["triples"] = self.triples()
+        return kg
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("articles", "triples", "nodes", "edges")
+        }
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "KGStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
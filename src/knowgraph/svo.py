@@ -0,0 +1,219 @@
+"""Subject-verb-object triple extraction shared by the knowgraph builders.
+
+Texts are streamed through ``nlp.pipe`` and every sentence is read as a span
+of its parsed document, so no per-sentence ``Doc`` copies are made:
+
+    kg = nx.DiGraph()
+    triples = add_triples(kg, extract_triples(texts, nlp))
+
+Each :class:`Triple` carries the node and edge attributes the graph builders
+store, so :func:`add_triples` builds the same graph the per-script loops did.
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import networkx as nx
+from spacy.language import Language
+from spacy.tokens import Doc, Span, Token
+
+from src.event_extraction.nlp_registry import get_nlp
+
+
+SUBJ_DEPS = {"nsubj", "nsubjpass", "csubj", "agent", "expl"}
+OBJ_DEPS = {"dobj", "dative", "attr", "oprd", "pobj", "obj"}
+
+
+class Triple(NamedTuple):
+    subject: str
+    relation: str
+    object: str
+    subject_lemma: str
+    subject_pos: str
+    object_lemma: str
+    object_pos: str
+    dep: str
+
+
+class _Sentence:
+    """Argument normalisation within one sentence span.
+
+    ``chunk_root`` maps every token inside a noun chunk of the sentence to the
+    chunk root, and phrase text is memoized per head token, so each lookup is
+    O(1). :func:`doc_triples` builds the maps for all sentences from one pass
+    over ``doc.noun_chunks``; ``Span.noun_chunks`` re-parses the whole document.
+    """
+
+    def __init__(self, sent: Span, chunk_root: Optional[Dict[int, Token]] = None):
+        self.sent = sent
+        self.chunk_root = _chunk_roots(sent.doc, [sent])[0] if chunk_root is None else chunk_root
+        self._phrases: Dict[int, str] = {}
+
+    def phrase_text(self, tok: Token) -> str:
+        # prefer the noun-chunk root if available
+        root = self.chunk_root.get(tok.i, tok)
+        text = self._phrases.get(root.i)
+        if text is None:
+            text = self._phrases[root.i] = self._head_phrase(root)
+        return text
+
+    def _head_phrase(self, root: Token) -> str:
+        doc, sent = self.sent.doc, self.sent
+
+        # For proper nouns, keep contiguous PROPNs (e.g. "New York Times")
+        if root.pos_ == "PROPN":
+            start = end = root.i
+            while start - 1 >= sent.start and doc[start - 1].pos_ == "PROPN":
+                start -= 1
+            while end + 1 < sent.end and doc[end + 1].pos_ == "PROPN":
+                end += 1
+            return doc[start : end + 1].text
+
+        # For common nouns, include only left-side compounds/adjectival modifiers + head
+        if root.pos_ == "NOUN":
+            left_mods = sorted((t for t in root.lefts if t.dep_ in {"compound", "amod"}), key=lambda t: t.i)
+            return " ".join([t.text for t in left_mods] + [root.text])
+
+        # fallback to token text
+        return root.text
+
+    def normalize_arg(self, tok: Token) -> Optional[Token]:
+        # exclude pronouns and auxiliaries
+        if tok.pos_ in {"PRON", "AUX"}:
+            return None
+        # prefer noun-chunk root if present (gives canonical head)
+        root = self.chunk_root.get(tok.i)
+        if root is not None:
+            if root.pos_ in {"PRON", "AUX"}:
+                return None
+            if root.ent_type_ or root.pos_ in {"NOUN", "PROPN"}:
+                return root
+            return None
+        # keep named entities or nouns/proper nouns
+        if tok.ent_type_ or tok.pos_ in {"NOUN", "PROPN"}:
+            return tok
+        return None
+
+    def filter_and_dedupe(self, candidates: Iterable[Token]) -> List[Token]:
+        seen = set()
+        out = []
+        for c in candidates:
+            n = self.normalize_arg(c)
+            if n is not None and n.i not in seen:
+                seen.add(n.i)
+                out.append(n)
+        return out
+
+
+def _chunk_roots(doc: Doc, sents: List[Span]) -> List[Dict[int, Token]]:
+    """Token index -> noun-chunk root for each of ``sents``, from one pass over ``doc.noun_chunks``."""
+    starts = [sent.start for sent in sents]
+    maps: List[Dict[int, Token]] = [{} for _ in sents]
+    for nc in doc.noun_chunks:
+        i = bisect_right(starts, nc.start) - 1
+        if i < 0 or nc.end > sents[i].end:
+            continue  # outside the requested sentences
+        root = nc.root
+        for t in range(nc.start, nc.end):
+            maps[i][t] = root
+    return maps
+
+
+def sentence_triples(sent: Span, chunk_root: Optional[Dict[int, Token]] = None) -> Iterator[Triple]:
+    """SVO triples of one sentence span, in the order the builders add them.
+
+    ``chunk_root`` is the sentence's token -> noun-chunk root map (see
+    :func:`doc_triples`); without it the document's chunks are read here.
+    """
+    s = _Sentence(sent, chunk_root)
+    for token in sent:
+        # skip auxiliaries; consider main verbs (and root tokens) only
+        if token.pos_ == "AUX" or not (token.pos_ == "VERB" or token.dep_ == "ROOT"):
+            continue
+
+        preps = [c for c in token.children if c.dep_ == "prep"]
+        raw_subjects = [c for c in token.children if c.dep_ in SUBJ_DEPS]
+        raw_objects = [c for c in token.children if c.dep_ in OBJ_DEPS]
+        # include objects reached via prepositions (prep -> pobj)
+        for prep in preps:
+            raw_objects.extend(c for c in prep.children if c.dep_ == "pobj")
+
+        subjects = s.filter_and_dedupe(raw_subjects)
+        if not subjects:
+            continue
+        objects = s.filter_and_dedupe(raw_objects)
+        lemma = token.lemma_.lower()
+
+        for subj in subjects:
+            for s_tok in [subj] + list(subj.conjuncts):
+                s_norm = s.normalize_arg(s_tok)
+                if s_norm is None:
+                    continue
+                s_text = s.phrase_text(s_norm)
+
+                if objects:
+                    for obj in objects:
+                        for o_tok in [obj] + list(obj.conjuncts):
+                            o_norm = s.normalize_arg(o_tok)
+                            if o_norm is None:
+                                continue
+                            yield Triple(
+                                s_text, lemma, s.phrase_text(o_norm),
+                                s_norm.lemma_, s_norm.pos_, o_norm.lemma_, o_norm.pos_, token.dep_,
+                            )
+                    continue
+
+                # verb -> prepositional relations when there is no direct object
+                for prep in preps:
+                    for pobj in (c for c in prep.children if c.dep_ == "pobj"):
+                        o_norm = s.normalize_arg(pobj)
+                        if o_norm is None:
+                            continue
+                        for o_tok in [o_norm] + list(o_norm.conjuncts):
+                            yield Triple(
+                                s_text, f"{lemma}_{prep.text.lower()}", s.phrase_text(o_tok),
+                                s_norm.lemma_, s_norm.pos_, o_tok.lemma_, o_tok.pos_, token.dep_,
+                            )
+
+
+def doc_triples(doc: Doc) -> Iterator[Triple]:
+    """SVO triples of every sentence of a parsed document (noun chunks are read once)."""
+    sents = list(doc.sents)
+    for sent, chunk_root in zip(sents, _chunk_roots(doc, sents)):
+        yield from sentence_triples(sent, chunk_root)
+
+
+def extract_triples_per_text(
+    texts: Iterable[str],
+    nlp: Optional[Language] = None,
+    *,
+    batch_size: int = 64,
+    n_process: int = 1,
+) -> Iterator[List[Triple]]:
+    """Stream ``texts`` through ``nlp.pipe`` and yield one list of SVO triples per text.
+
+    ``nlp`` defaults to the shared ``en_core_web_sm`` pipeline prepared for the
+    ``svo`` task.
+    """
+    if nlp is None:
+        nlp = get_nlp("en_core_web_sm", task="svo")
+    for doc in nlp.pipe(texts, batch_size=batch_size, n_process=n_process):
+        yield list(doc_triples(doc))
+
+
+def extract_triples(texts: Iterable[str], nlp: Optional[Language] = None, **kwargs) -> Iterator[Triple]:
+    """The SVO triples of every sentence of ``texts``; ``kwargs`` as for :func:`extract_triples_per_text`."""
+    for triples in extract_triples_per_text(texts, nlp, **kwargs):
+        yield from triples
+
+
+def add_triples(kg: nx.DiGraph, triples: Iterable[Triple]) -> List[Tuple[str, str, str]]:
+    """Add the nodes and edges of ``triples`` to ``kg``; returns the ``(subject, relation, object)`` list."""
+    out = []
+    for t in triples:
+        kg.add_node(t.subject, lemma=t.subject_lemma, pos=t.subject_pos)
+        kg.add_node(t.object, lemma=t.object_lemma, pos=t.object_pos)
+        kg.add_edge(t.subject, t.object, relation=t.relation, dep=t.dep)
+        out.append((t.subject, t.relation, t.object))
+    return out
@@ -0,0 +1,92 @@
+import pytest
+import spacy
+from spacy.language import Language
+from spacy.tokens import Doc
+
+
+@pytest.fixture(scope="session")
+def gpe_model_path(tmp_path_factory):
+    """A tiny on-disk spaCy pipeline whose only component tags a few GPEs.
+
+    Lets the extraction code run through ``spacy.load`` without requiring a
+    downloaded statistical model.
+    """
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("entity_ruler")
+    ruler.add_patterns(
+        [{"label": "GPE", "pattern": name} for name in ("Madrid", "Beirut", "Japan", "Sudan")]
+    )
+    path = tmp_path_factory.mktemp("models") / "gpe_model"
+    nlp.to_disk(path)
+    return str(path)
+
+
+@Language.component("test_svo_parser")
+def _svo_parser(doc):
+    """Parses texts made of "<Subject> <verb> <Object> ." sentences; objects are tagged GPE."""
+    words = [t.text for t in doc]
+    n = len(words)
+    pattern = [("PROPN", "nsubj", "O"), ("VERB", "ROOT", "O"), ("PROPN", "dobj", "B-GPE"), ("PUNCT", "punct", "O")]
+    pos, deps, ents = (list(x) for x in zip(*(pattern[i % 4] for i in range(n))))
+    return Doc(
+        doc.vocab,
+        words=words,
+        spaces=[bool(t.whitespace_) for t in doc],
+        pos=pos,
+        deps=deps,
+        heads=[i - i % 4 + 1 for i in range(n)],
+        lemmas=[w.lower() for w in words],
+        ents=ents,
+    )
+
+
+@pytest.fixture(scope="session")
+def svo_model_path(tmp_path_factory):
+    """An on-disk pipeline whose only component is :func:`_svo_parser` (loadable by worker processes)."""
+    nlp = spacy.blank("en")
+    nlp.add_pipe("test_svo_parser")
+    path = tmp_path_factory.mktemp("models") / "svo_model"
+    nlp.to_disk(path)
+    return str(path)
+
+
+class _BagOfWordsEncoder:
+    """Deterministic SentenceTransformer stand-in: hashed bag of lowercase words."""
+
+    def __init__(self, dim=64):
+        self.dim = dim
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, normalize_embeddings=True):
+        import zlib
+
+        import numpy as np
+
+        self.calls.append(list(texts))
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.lower().replace(",", " ").replace(".", " ").split():
+                out[i, zlib.crc32(word.encode()) % self.dim] += 1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.where(norms == 0, 1.0, norms)
+
+
+@pytest.fixture
+def bow_encoder():
+    return _BagOfWordsEncoder()
+
+
+class _EchoGenerator:
+    """Records each call and answers every prompt with a fixed continuation."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, prompts, **kwargs):
+        self.calls.append((list(prompts), kwargs))
+        return [[{"generated_text": f"  it mentions\n{p.split(chr(10))[2]} "}] for p in prompts]
+
+
+@pytest.fixture
+def echo_generator():
+    return _EchoGenerator()
@@ -0,0 +1,49 @@
+from benchmarks.bench_event_extraction import find_regressions, make_corpus
+
+
+def test_corpus_is_deterministic():
+    assert make_corpus(50, seed=3) == make_corpus(50, seed=3)
+    assert make_corpus(50, seed=3) != make_corpus(50, seed=4)
+
+
+def test_find_regressions():
+    base = [{"function": "semantic", "n_docs": 10, "batch_size": 2, "n_process": 1, "docs_per_sec": 100.0}]
+    slower = [dict(base[0], docs_per_sec=80.0)]
+    assert find_regressions(slower, base, tolerance=0.1)
+    assert not find_regressions(slower, base, tolerance=0.25)
+
+
+def test_run_config_reports_first_result_separately(gpe_model_path):
+    from benchmarks.bench_event_extraction import run_config
+
+    r = run_config("semantic", 40, 8, 1, gpe_model_path)
+    assert r["first_result_seconds"] <= r["total_seconds"]
+    assert r["n_batches"] == 5 and r["docs_per_sec"] > 0
+
+
+def test_ranking_corpus_is_deterministic():
+    from benchmarks.bench_ranking import make_corpus as make_ranking_corpus
+
+    assert make_ranking_corpus(60, 5, seed=3) == make_ranking_corpus(60, 5, seed=3)
+    assert make_ranking_corpus(60, 5, seed=3) != make_ranking_corpus(60, 5, seed=4)
+
+
+def test_ranking_benchmark_small_run(tmp_path):
+    from benchmarks.bench_ranking import find_regressions as ranking_regressions, run_benchmark
+
+    results = run_benchmark(
+        300, 20, top_k=5, quantizations=("float32", "int8"), nprobes=(4,), candidates=(50,), workdir=str(tmp_path)
+    )
+    assert [(r["mode"], r["quantization"]) for r in results] == [
+        (mode, q) for q in ("float32", "int8") for mode in ("exact", "ann", "hybrid")
+    ]
+    exact = results[0]
+    assert exact["recall@5"] == 1.0
+    assert exact["mrr@5"] > 0.5
+    assert exact["qps"] > 0 and exact["latency_ms"]["p99"] >= exact["latency_ms"]["p50"]
+    int8 = results[3]
+    assert int8["index_mb"] < exact["index_mb"]
+
+    worse = [dict(exact, **{"recall@5": 0.9})]
+    assert ranking_regressions(worse, [exact], tolerance=0.1)
+    assert not ranking_regressions([exact], [exact], tolerance=0.1)
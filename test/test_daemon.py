@@ -0,0 +1,66 @@
+import asyncio
+
+from src.event_rank_explain import client, cli, index, scoring
+from src.event_rank_explain.daemon import RankServer, RankService
+from src.event_rank_explain.main import SAMPLE_DATA
+from src.event_rank_explain.ranking import Ranker
+
+
+def test_cli_choices_mirror_the_numpy_modules():
+    assert cli.SEARCH_MODES == index.SEARCH_MODES
+    assert cli.QUANTIZATIONS == scoring.QUANTIZATIONS
+
+
+def test_client_roundtrip_over_unix_socket(tmp_path, bow_encoder, echo_generator, capsys):
+    service = RankService(
+        Ranker.from_docs(SAMPLE_DATA, bow_encoder),
+        explain_model="echo",
+        generator=echo_generator,
+        config={"embedding_model": "bow", "explain_model": "echo"},
+    )
+    address = f"unix:{tmp_path / 'rank.sock'}"
+
+    async def scenario():
+        server = RankServer(service, unix_path=str(tmp_path / "rank.sock"))
+        await server.start()
+        loop = asyncio.get_running_loop()
+        try:
+            code = await loop.run_in_executor(
+                None, client.main, ["--connect", address, "--query", "floods displaced", "--top-k", "2"]
+            )
+            wrong_model = await loop.run_in_executor(
+                None, client.main, ["--connect", address, "--query", "floods", "--embedding-model", "other"]
+            )
+            bad = await loop.run_in_executor(None, client.call, address, "/rank", {"queries": []})
+        except RuntimeError as e:
+            bad = e
+        finally:
+            await server.stop()
+        return code, wrong_model, bad
+
+    code, wrong_model, bad = asyncio.run(scenario())
+    assert code == 0 and wrong_model == 1
+    captured = capsys.readouterr()
+    assert "--embedding-model 'bow', not 'other'" in captured.err
+    out = captured.out.splitlines()
+    assert out[0].split() == ["id", "text", "score", "explanation"]
+    assert out[1].split()[0] == "2" and "it mentions Floods displaced" in out[1]
+    assert "400" in str(bad)
+    assert service.requests == 1 and service.queries == 1
+    assert not (tmp_path / "rank.sock").exists()
+
+
+def test_service_follows_daemon_explain_and_reopens_changed_index(tmp_path, bow_encoder):
+    path = str(tmp_path / "idx")
+    index.build_index(path, SAMPLE_DATA, bow_encoder, "bow")
+    service = RankService(Ranker.from_index(index.EmbeddingIndex.open(path), bow_encoder), explain_model="echo")
+
+    hits = service.handle({"queries": ["floods"], "top_k": 1})["results"][0]
+    assert "explanation" not in hits[0]
+    top = hits[0]["id"]
+
+    index.EmbeddingIndex.open(path).remove([top])
+    hits = service.handle({"queries": ["floods"], "top_k": 1})["results"][0]
+    assert hits[0]["id"] != top and service.index_reloads == 1
+    service.handle({"queries": ["floods"]})
+    assert service.index_reloads == 1
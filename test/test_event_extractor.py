@@ -1,6 +1,150 @@
-from src.event_extraction.event_extraction import extract_events_semantic
+from src.event_extraction.event_extraction import (
+    extract_events_semantic,
+    extract_events_string_match,
+    iter_events_semantic,
+)
 
 def test_basic_extraction():
     headlines = ["Explosion in Madrid"]
     results = extract_events_semantic(headlines)
     assert results[0]["event"] != "New Event"
+
+
+HEADLINES = [
+    "Massive explosion rocks Beirut port area",
+    "Earthquake of magnitude 6.7 hits Japan coast",
+    "Wildfire forces evacuation of coastal town",
+]
+
+
+def test_batched_semantic_keeps_input_order(gpe_model_path):
+    results = extract_events_semantic(HEADLINES, spacy_model=gpe_model_path, batch_size=2)
+    assert [r["headline"] for r in results] == HEADLINES
+    assert [r["event"] for r in results] == ["explosion", "earthquake", "wildfire"]
+    assert [r["entities"] for r in results] == [["Beirut"], ["Japan"], []]
+
+
+def test_iter_semantic_matches_list_api(gpe_model_path):
+    lazy = list(iter_events_semantic(HEADLINES, spacy_model=gpe_model_path, batch_size=1))
+    assert lazy == extract_events_semantic(HEADLINES, spacy_model=gpe_model_path)
+
+
+def test_string_match_batched(gpe_model_path):
+    results = extract_events_string_match(
+        HEADLINES, {"explosion": "Explosion", "evacuation": "Evacuation"}, spacy_model=gpe_model_path, batch_size=2
+    )
+    assert [r["events"] for r in results] == [["Explosion"], [], ["Evacuation"]]
+    assert results[0]["entities"] == ["Beirut"]
+
+
+def test_fitted_classifier_is_batch_independent(tmp_path, gpe_model_path):
+    from src.event_extraction.classifier import EventClassifier
+
+    clf = EventClassifier(["explosion", "earthquake", "wildfire"]).fit(HEADLINES)
+    path = tmp_path / "events.joblib"
+    clf.save(str(path))
+    loaded = EventClassifier.load(str(path))
+    assert loaded.fingerprint == clf.fingerprint
+
+    alone = extract_events_semantic(HEADLINES[:1], classifier=loaded, spacy_model=gpe_model_path)
+    batch = extract_events_semantic(HEADLINES, classifier=loaded, spacy_model=gpe_model_path)
+    assert alone[0] == batch[0]
+    assert [r["event"] for r in batch] == ["explosion", "earthquake", "wildfire"]
+
+
+def test_result_cache_skips_repeated_texts(tmp_path, gpe_model_path):
+    from src.event_extraction.cache import ResultCache
+
+    event_dict = {"explosion": "Explosion", "earthquake": "Earthquake"}
+    cache = ResultCache(str(tmp_path / "cache.sqlite"), max_entries=10)
+    first = extract_events_string_match(HEADLINES, event_dict, cache=cache, spacy_model=gpe_model_path)
+    assert (cache.hits, cache.misses) == (0, 3)
+
+    texts = [HEADLINES[1], "  Massive explosion rocks   Beirut port area", "Storm over Sudan"]
+    second = extract_events_string_match(texts, event_dict, cache=cache, spacy_model=gpe_model_path)
+    assert (cache.hits, cache.misses) == (2, 4)
+    assert second[0] == first[1]
+    assert second[1]["headline"] == texts[1] and second[1]["events"] == ["Explosion"]
+    assert second[2]["entities"] == ["Sudan"]
+
+    # a different taxonomy must not reuse entries
+    extract_events_string_match(HEADLINES[:1], {"explosion": "Blast"}, cache=cache, spacy_model=gpe_model_path)
+    assert cache.misses == 5
+
+
+def test_result_cache_evicts_least_recently_used(tmp_path):
+    from src.event_extraction.cache import ResultCache
+
+    cache = ResultCache(str(tmp_path / "c.sqlite"), max_entries=2, commit_every=1)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_top_k_events_with_threshold(gpe_model_path):
+    from src.event_extraction.classifier import EventClassifier
+
+    clf = EventClassifier(["flood", "flash flood", "storm", "explosion"]).fit(
+        ["Flash flood after storm", "Flood waters rise", "Explosion at plant"]
+    )
+    ranked = clf.top_k(["Flash flood after storm", "nothing relevant"], k=2, chunk_size=1)
+    assert [e for e, _ in ranked[0]] == ["flash flood", "storm"]
+    assert ranked[0][0][1] >= ranked[0][1][1] > 0
+    assert ranked[1] == []
+
+    results = extract_events_semantic(
+        ["Flash flood after storm"], classifier=clf, top_k=3, min_score=0.5, spacy_model=gpe_model_path
+    )
+    assert results[0]["event"] == "flash flood"
+    assert all(t["score"] >= 0.5 for t in results[0]["top_events"])
+
+
+def test_result_cache_holds_no_write_lock_between_flushes(tmp_path):
+    import sqlite3
+
+    from src.event_extraction.cache import ResultCache
+
+    path = str(tmp_path / "shared.sqlite")
+    cache = ResultCache(path, max_entries=10)
+    cache.put("a", 1)
+    cache.flush()
+    assert cache.get("a") == 1
+    cache.put("b", 2)
+    assert cache.get("b") == 2
+    assert not cache._conn.in_transaction
+
+    other = sqlite3.connect(path, timeout=0.1)
+    other.execute("INSERT INTO entries (key, value, atime) VALUES ('x', '0', 0)")
+    other.commit()
+    other.close()
+
+    cache.flush()
+    assert len(cache) == 3 and cache.get("b") == 2
+    cache.close()
+
+
+def test_result_cache_counts_rows_without_rescanning(tmp_path):
+    from src.event_extraction.cache import ResultCache
+
+    cache = ResultCache(str(tmp_path / "c.sqlite"), max_entries=3, commit_every=1)
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+    for key in "abcde":
+        cache.put(key, 1)
+    cache.put("e", 2)
+    assert len(cache) == 3 and cache.evictions == 2 and cache.get("e") == 2
+    assert not [s for s in statements if "COUNT" in s]
+    cache.close()
+
+
+def test_semantic_cache_skips_adhoc_classifier(tmp_path, gpe_model_path):
+    from src.event_extraction.cache import ResultCache
+
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    extract_events_semantic(HEADLINES, cache=cache, spacy_model=gpe_model_path)
+    assert len(cache) == 0 and cache.misses == 0
+    cache.close()
@@ -0,0 +1,76 @@
+from src.event_rank_explain.explain import build_prompt, explain_batch
+
+
+def test_explain_batch_makes_one_batched_call(echo_generator):
+    gen = echo_generator
+    texts = ["Floods in Somalia.", "Clashes in Sudan.", "Cyclone in Mozambique."]
+    out = explain_batch(gen, "flood", texts, max_new_tokens=16, batch_size=4)
+
+    assert out == [f"it mentions {t}" for t in texts]
+    assert len(gen.calls) == 1
+    prompts, kwargs = gen.calls[0]
+    assert prompts == [build_prompt("flood", t) for t in texts]
+    assert kwargs["max_new_tokens"] == 16 and kwargs["batch_size"] == 4
+    assert kwargs["return_full_text"] is False
+
+
+def test_explain_batch_empty(echo_generator):
+    gen = echo_generator
+    assert explain_batch(gen, "flood", []) == []
+    assert gen.calls == []
+
+
+def test_explain_batch_cache(tmp_path, echo_generator):
+    from src.event_extraction.cache import ResultCache
+
+    gen = echo_generator
+    texts = ["Floods in Somalia.", "Clashes in Sudan."]
+    with ResultCache(str(tmp_path / "explain.sqlite"), max_entries=2) as cache:
+        first = explain_batch(gen, "flood", texts, cache=cache, model_name="m")
+        again = explain_batch(gen, "flood", texts + ["Floods in Somalia."], cache=cache, model_name="m")
+        assert again == first + first[:1]
+        assert len(gen.calls) == 1
+
+        explain_batch(gen, "flood", texts[:1], cache=cache, model_name="other", max_new_tokens=8)
+        explain_batch(gen, "drought", texts[:1], cache=cache, model_name="m")
+        assert [c[0] for c in gen.calls[1:]] == [[build_prompt("flood", texts[0])], [build_prompt("drought", texts[0])]]
+
+        stats = cache.stats()
+        assert stats["hits"] == 2 and stats["misses"] == 4
+        assert stats["entries"] == 2 and stats["evictions"] == 2
+
+
+def test_stream_explanations_stops_at_budget(echo_generator):
+    from src.event_rank_explain.explain import explain_hits, stream_explanations
+
+    gen = echo_generator
+    now = [0.0]
+
+    def generate(prompts, **kwargs):
+        now[0] += 1.0  # every generation call takes one "second"
+        return gen(prompts, **kwargs)
+
+    results = [[{"text": f"Floods {i}."} for i in range(5)], [{"text": "Clashes in Sudan."}]]
+    # the budget is smaller than one batch of 8: only hits started before it runs out
+    streamed = stream_explanations(generate, ["flood", "clash"], results, batch_size=8, budget=1.5, clock=lambda: now[0])
+    first = next(streamed)
+    assert first == (0, 0, "it mentions Floods 0.") and now[0] == 1.0
+    assert [(qi, hi) for qi, hi, _ in streamed] == [(0, 1)]
+    assert [len(c[0]) for c in gen.calls] == [1, 1]
+
+    gen.calls.clear()
+    assert explain_hits(gen, ["clash"], results[1:], budget=0.0) == 0
+    assert "explanation" not in results[1][0]
+    assert explain_hits(gen, ["flood", "clash"], results) == 6
+    assert [len(c[0]) for c in gen.calls] == [5, 1]
+    assert results[1][0]["explanation"] == "it mentions Clashes in Sudan."
+
+
+def test_stream_explanations_without_budget_keeps_batches(echo_generator):
+    from src.event_rank_explain.explain import stream_explanations
+
+    results = [[{"text": f"Floods {i}."} for i in range(5)], [{"text": "Clashes in Sudan."}]]
+    streamed = list(stream_explanations(echo_generator, ["flood", "clash"], results, batch_size=2))
+    assert [(qi, hi) for qi, hi, _ in streamed] == [(0, 0), (0, 1), (0, 2), (0, 3), (0, 4), (1, 0)]
+    assert streamed[3][2] == "it mentions Floods 3."
+    assert [len(c[0]) for c in echo_generator.calls] == [2, 2, 1, 1]
@@ -0,0 +1,30 @@
+import random
+import re
+
+from src.event_extraction.keyword_matcher import KeywordMatcher
+
+
+def _regex_labels(text, event_dict):
+    return sorted(
+        {label for word, label in event_dict.items() if re.search(rf"\b{re.escape(word)}\b", text.lower())}
+    )
+
+
+def test_overlapping_and_multiword_keywords():
+    event_dict = {"flood": "Flood", "flash flood": "Flood", "flash": "Lightning", "fire": "Fire"}
+    matcher = KeywordMatcher(event_dict)
+    assert matcher.match_labels("Flash flood warning") == ["Flood", "Lightning"]
+    assert matcher.match_labels("Wildfire spreads") == []
+    assert matcher.match_labels("fire-fighters battle fire") == ["Fire"]
+
+
+def test_matches_per_keyword_regex_semantics():
+    rng = random.Random(0)
+    alphabet = "ab _-.é1"
+    event_dict = {
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))): f"L{i}" for i in range(40)
+    }
+    matcher = KeywordMatcher(event_dict)
+    for _ in range(500):
+        text = "".join(rng.choice(alphabet + "AB") for _ in range(rng.randint(0, 30)))
+        assert matcher.match_labels(text) == _regex_labels(text, event_dict)
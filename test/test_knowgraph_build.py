@@ -0,0 +1,92 @@
+import networkx as nx
+import pytest
+
+from src.event_extraction.nlp_registry import get_nlp
+from src.knowgraph.build import build_kg_from_texts, svo_triples
+from src.knowgraph.svo import add_triples
+
+
+_NAMES = ["Rebels", "Police", "Sudan", "Beira", "Army", "Khartoum"]
+_VERBS = ["attacked", "entered", "left"]
+
+TEXTS = [
+    f"{_NAMES[i % 6]} {_VERBS[i % 3]} {_NAMES[(i * 5 + 2) % 6]} . {_NAMES[(i + 3) % 6]} {_VERBS[(i + 1) % 3]} {_NAMES[i % 4]} ."
+    for i in range(23)
+]
+
+
+def _snapshot(kg):
+    return list(kg.nodes(data=True)), list(kg.edges(data=True))
+
+
+def test_parallel_svo_triples_match_serial(svo_model_path):
+    serial = nx.DiGraph()
+    expected = add_triples(serial, svo_triples(TEXTS, get_nlp(svo_model_path, task="svo")))
+
+    parallel = nx.DiGraph()
+    got = add_triples(parallel, svo_triples(TEXTS, spacy_model=svo_model_path, workers=2, chunk_size=4))
+
+    assert len(expected) == 2 * len(TEXTS)
+    assert got == expected
+    assert _snapshot(parallel) == _snapshot(serial)
+
+    with pytest.raises(ValueError, match="in-process"):
+        list(svo_triples(TEXTS, get_nlp(svo_model_path, task="svo"), workers=2))
+
+
+def test_parallel_headline_graph_matches_serial(svo_model_path):
+    serial = build_kg_from_texts(TEXTS, get_nlp(svo_model_path, task="full"))
+    parallel = build_kg_from_texts(TEXTS, spacy_model=svo_model_path, workers=3, chunk_size=5)
+
+    assert serial.number_of_edges() > 0
+    assert _snapshot(parallel) == _snapshot(serial)
+    assert {d["type"] for _, d in serial.nodes(data=True)} == {"ARG"}
+    assert "sentence" in next(iter(serial.edges(data=True)))[2]
+
+
+def test_kg_store_ingests_only_new_articles(tmp_path, svo_model_path):
+    from src.knowgraph.store import KGStore
+
+    nlp = get_nlp(svo_model_path, task="svo")
+    path = str(tmp_path / "kg.sqlite")
+    articles = [(f"a{i}", t) for i, t in enumerate(TEXTS)]
+
+    with KGStore(path) as store:
+        assert store.ingest(articles[:10], nlp) == 10
+        assert store.ingest(articles[5:15] + articles[12:13], nlp) == 5
+        assert "a3" in store and "a20" not in store
+    with KGStore(path) as store:
+        assert store.ingest(articles, nlp) == 8
+        assert store.ingest(articles, nlp) == 0
+        kg = store.graph(with_triples=True)
+        assert store.stats()["articles"] == len(TEXTS)
+
+    serial = nx.DiGraph()
+    expected = add_triples(serial, svo_triples(TEXTS, nlp))
+    assert kg.graph["triples"] == expected
+    assert _snapshot(kg) == _snapshot(serial)
+
+
+def test_kgstore_article_triples_parse_only_new_articles(tmp_path, svo_model_path):
+    from src.knowgraph.store import KGStore
+
+    nlp = get_nlp(svo_model_path, task="svo")
+    parsed = []
+    pipe = nlp.pipe
+
+    class Counting:
+        def pipe(self, texts, **kwargs):
+            texts = list(texts)
+            parsed.extend(texts)
+            return pipe(texts, **kwargs)
+
+    articles = [(f"https://news/{i}", t) for i, t in enumerate(TEXTS)]
+    with KGStore(str(tmp_path / "kg.sqlite")) as store:
+        store.ingest(articles[:10], nlp)
+        # a re-fetched article keeps its id even if its text was edited
+        edited = [(articles[3][0], "Army left Beira .")] + articles[8:12]
+        got = store.article_triples(edited, Counting())
+
+    assert parsed == TEXTS[10:12]
+    expected = list(svo_triples([TEXTS[3]] + TEXTS[8:12], nlp))
+    assert got == expected
@@ -0,0 +1,128 @@
+import networkx as nx
+import spacy
+from spacy.tokens import Doc
+
+from src.knowgraph.svo import add_triples, extract_triples
+
+
+_VOCAB = spacy.blank("en").vocab
+
+# (word, pos, dep, head, lemma) with absolute head indices; two sentences, the
+# first ending in a proper noun with no full stop.
+_PARSE = [
+    ("Floods", "NOUN", "nsubj", 1, "flood"),
+    ("displaced", "VERB", "ROOT", 1, "displace"),
+    ("thousands", "NOUN", "dobj", 1, "thousand"),
+    ("in", "ADP", "prep", 1, "in"),
+    ("Somalia", "PROPN", "pobj", 3, "Somalia"),
+    ("Elon", "PROPN", "compound", 6, "Elon"),
+    ("Musk", "PROPN", "nsubj", 7, "Musk"),
+    ("spoke", "VERB", "ROOT", 7, "speak"),
+    ("in", "ADP", "prep", 7, "in"),
+    ("Austin", "PROPN", "pobj", 8, "Austin"),
+    (".", "PUNCT", "punct", 7, "."),
+]
+
+
+def _parsed(text):
+    words, pos, deps, heads, lemmas = zip(*_PARSE)
+    return Doc(_VOCAB, words=list(words), pos=list(pos), deps=list(deps), heads=list(heads), lemmas=list(lemmas))
+
+
+class _StubNlp:
+    """Stands in for a parsing pipeline: every text gets the same hand-made parse."""
+
+    def __init__(self):
+        self.calls = []
+
+    def pipe(self, texts, batch_size=64, n_process=1):
+        texts = list(texts)
+        self.calls.append((len(texts), batch_size, n_process))
+        return (_parsed(t) for t in texts)
+
+
+def test_extract_triples_reads_sentence_spans():
+    nlp = _StubNlp()
+    triples = list(extract_triples(["one article", "another"], nlp, batch_size=8))
+
+    assert nlp.calls == [(2, 8, 1)]
+    per_doc = [(t.subject, t.relation, t.object) for t in triples[:3]]
+    assert per_doc == [
+        ("Floods", "displace", "thousands"),
+        ("Floods", "displace", "Somalia"),
+        # proper-noun phrases stop at the sentence boundary ("Somalia" is not merged in)
+        ("Elon Musk", "speak", "Austin"),
+    ]
+    assert len(triples) == 6
+    assert triples[0].subject_lemma == "flood" and triples[2].object_pos == "PROPN"
+
+
+def test_add_triples_builds_the_graph():
+    kg = nx.DiGraph()
+    triples = add_triples(kg, extract_triples(["text"], _StubNlp()))
+
+    assert triples[-1] == ("Elon Musk", "speak", "Austin")
+    assert kg.edges["Floods", "Somalia"] == {"relation": "displace", "dep": "ROOT"}
+    assert kg.nodes["Elon Musk"] == {"lemma": "Musk", "pos": "PROPN"}
+    assert kg.number_of_nodes() == 5
+
+
+def test_sentence_chunk_root_lookup_and_phrase_memo():
+    from src.knowgraph.svo import _Sentence
+
+    doc = _parsed("text")
+    second = _Sentence(list(doc.sents)[1])
+    assert {i: t.text for i, t in second.chunk_root.items()} == {5: "Musk", 6: "Musk", 9: "Austin"}
+
+    elon, musk = doc[5], doc[6]
+    assert second.normalize_arg(elon) is not None and second.normalize_arg(elon).i == musk.i
+    assert second.phrase_text(elon) == second.phrase_text(musk) == "Elon Musk"
+    assert second._phrases == {6: "Elon Musk"}
+
+
+def test_doc_triples_reads_noun_chunks_once_per_doc():
+    from src.knowgraph.svo import doc_triples
+
+    words, pos, deps, heads, lemmas = zip(*_PARSE)
+    n = len(words)
+    repeats = 40
+    doc = Doc(
+        _VOCAB,
+        words=list(words) * repeats,
+        pos=list(pos) * repeats,
+        deps=list(deps) * repeats,
+        heads=[h + r * n for r in range(repeats) for h in heads],
+        lemmas=list(lemmas) * repeats,
+    )
+    calls = []
+    iterator = doc.noun_chunks_iterator
+
+    def counting(doclike):
+        calls.append(doclike)
+        return iterator(doclike)
+
+    doc.noun_chunks_iterator = counting
+    triples = list(doc_triples(doc))
+
+    assert len(list(doc.sents)) == 2 * repeats
+    assert len(calls) == 1
+    assert triples == list(doc_triples(_parsed("text"))) * repeats
+
+
+def test_arguments_kept_by_entity_type_alone():
+    from src.knowgraph.svo import doc_triples
+
+    # "Police arrested 36" - the object is a NUM kept only because NER tagged it CARDINAL
+    parse = dict(
+        words=["Police", "arrested", "36", "."],
+        pos=["NOUN", "VERB", "NUM", "PUNCT"],
+        deps=["nsubj", "ROOT", "dobj", "punct"],
+        heads=[1, 1, 1, 1],
+        lemmas=["police", "arrest", "36", "."],
+    )
+    doc = Doc(_VOCAB, ents=["O", "O", "B-CARDINAL", "O"], **parse)
+    assert [(t.subject, t.relation, t.object, t.object_pos) for t in doc_triples(doc)] == [
+        ("Police", "arrest", "36", "NUM")
+    ]
+    # without NER the same parse yields nothing, hence "svo" keeps the ner pipe
+    assert list(doc_triples(Doc(_VOCAB, **parse))) == []
@@ -0,0 +1,27 @@
+import spacy
+
+from src.event_extraction import nlp_registry
+
+
+def test_get_nlp_loads_once_and_prunes(tmp_path):
+    nlp = spacy.blank("en")
+    nlp.add_pipe("attribute_ruler")
+    nlp.add_pipe("entity_ruler", name="ner").add_patterns([{"label": "GPE", "pattern": "Paris"}])
+    nlp.to_disk(tmp_path)
+    model = str(tmp_path)
+
+    nlp_registry.clear()
+    ner = nlp_registry.get_nlp(model, task="ner", warm=True)
+    assert nlp_registry.get_nlp(model, task="ner") is ner
+    assert ner.pipe_names == ["ner"]
+
+    svo = nlp_registry.get_nlp(model, task="svo")
+    assert svo is not ner
+    # SVO argument normalisation reads ent_type_, so NER stays on
+    assert svo.pipe_names == ["attribute_ruler", "ner"]
+    assert nlp_registry.get_nlp(model, task="full") is svo
+    assert sorted(nlp_registry.load_stats()) == [(model, "full"), (model, "ner")]
+
+    stats = nlp_registry.load_stats()[(model, "ner")]
+    assert stats["disabled"] == ["attribute_ruler"]
+    assert stats["warmup_seconds"] is not None
@@ -0,0 +1,238 @@
+import numpy as np
+
+from src.event_rank_explain.index import EmbeddingIndex, build_index, top_k_indices
+from src.event_rank_explain.main import SAMPLE_DATA
+
+
+def test_top_k_indices_matches_full_sort():
+    scores = np.random.default_rng(0).random(1000).astype(np.float32)
+    assert list(top_k_indices(scores, 7)) == list(np.argsort(-scores)[:7])
+    assert len(top_k_indices(scores, 5000)) == 1000
+
+
+def test_index_roundtrip_encodes_corpus_once(tmp_path, bow_encoder):
+    build_index(str(tmp_path / "idx"), SAMPLE_DATA, bow_encoder, "bow", batch_size=2)
+    assert sum(len(c) for c in bow_encoder.calls) == len(SAMPLE_DATA)
+
+    index = EmbeddingIndex.open(str(tmp_path / "idx"))
+    assert isinstance(index.embeddings, np.memmap)
+    assert index.model_name == "bow" and len(index) == len(SAMPLE_DATA)
+
+    query = bow_encoder.encode(["floods displaced thousands"])[0]
+    rows, scores = index.search(query, top_k=2)
+    assert index.ids[rows[0]] == 2
+    assert scores[0] >= scores[1]
+
+
+def test_ann_search_recall(tmp_path):
+    rng = np.random.default_rng(1)
+    centers = rng.normal(size=(20, 32))
+    emb = centers[rng.integers(0, 20, size=2000)] + 0.1 * rng.normal(size=(2000, 32))
+    emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+
+    class Fixed:
+        def encode(self, texts, batch_size=32, normalize_embeddings=True):
+            return emb[[int(t) for t in texts]]
+
+    docs = [{"id": i, "text": str(i)} for i in range(len(emb))]
+    index = build_index(str(tmp_path / "idx"), docs, Fixed(), "fixed")
+    index.build_ann(nlist=20)
+    index = EmbeddingIndex.open(str(tmp_path / "idx"))
+    assert index.ivf is not None and index.ivf.nlist == 20
+
+    hits = 0
+    for q in emb[:50]:
+        exact, _ = index.search(q, 10)
+        approx, scores = index.search(q, 10, mode="ann", nprobe=4, rerank=20)
+        assert list(scores) == sorted(scores, reverse=True)
+        hits += len(set(exact) & set(approx))
+    assert hits / 500 > 0.9
+
+
+def test_quantized_index_reranks_in_float32(tmp_path):
+    rng = np.random.default_rng(2)
+    emb = rng.normal(size=(3000, 48)).astype(np.float32)
+    emb /= np.linalg.norm(emb, axis=1, keepdims=True)
+
+    class Fixed:
+        def encode(self, texts, batch_size=32, normalize_embeddings=True):
+            return emb[[int(t) for t in texts]]
+
+    docs = [{"id": i, "text": str(i)} for i in range(len(emb))]
+    path = str(tmp_path / "idx")
+    exact = build_index(path, docs, Fixed(), "fixed")
+    expected = [exact.search(q, 10) for q in emb[:20]]
+
+    for kind, ratio in (("float16", 2), ("int8", 4)):
+        exact.quantize(kind)
+        index = EmbeddingIndex.open(path)
+        assert index.quantization == kind
+        assert index.embeddings.nbytes == ratio * index.quantized.nbytes
+        for q, (rows, scores) in zip(emb[:20], expected):
+            got_rows, got_scores = index.search(q, 10)
+            assert list(got_rows) == list(rows)
+            assert np.allclose(got_scores, scores)
+
+
+def test_quantize_writes_scales_for_int8_only(tmp_path, bow_encoder):
+    path = tmp_path / "idx"
+    index = build_index(str(path), SAMPLE_DATA, bow_encoder, "bow", quantization="float16")
+    assert not (path / "scales.f32").exists() and index.scales is None
+    index.quantize("int8")
+    assert (path / "scales.f32").stat().st_size == len(SAMPLE_DATA) * 4
+    index.quantize("float16")
+    assert not (path / "scales.f32").exists()
+
+
+def test_add_remove_compact(tmp_path, bow_encoder):
+    path = str(tmp_path / "idx")
+    index = build_index(path, SAMPLE_DATA, bow_encoder, "bow", quantization="int8")
+    index.build_ann(nlist=2)
+    bow_encoder.calls.clear()
+
+    new = [
+        {"id": 2, "text": "Floods displaced thousands in Mogadishu, Somalia."},  # unchanged: skipped
+        {"id": 6, "text": "Heavy rain and floods hit Dhaka."},
+        {"id": 3, "text": "Cyclone landfall near Beira."},  # changed: replaces row 2
+    ]
+    assert index.add(new, bow_encoder) == 2
+    assert bow_encoder.calls == [["Heavy rain and floods hit Dhaka.", "Cyclone landfall near Beira."]]
+    assert len(index) == 7 and index.live_count == 6
+    assert len(index.ivf) == 7 and len(index.ivf.delta_labels) == 2
+
+    query = bow_encoder.encode(["floods hit"])[0]
+    rows, _ = index.search(query, top_k=1)
+    assert index.ids[rows[0]] == 6
+
+    assert index.remove([6, 1, "missing"]) == 2
+    for mode in ("exact", "ann"):
+        rows, _ = index.search(query, top_k=10, mode=mode, nprobe=2)
+        assert sorted(index.ids[r] for r in rows) == [2, 3, 4, 5]
+
+    reopened = EmbeddingIndex.open(path)
+    assert reopened.live_count == 4 and 6 not in reopened and 3 in reopened
+
+    assert index.compact_if_needed(threshold=0.5) == 0
+    assert index.compact_if_needed() == 3
+    assert len(index) == 4 and list(index.ids) == [2, 4, 5, 3]
+    assert index.texts[-1] == "Cyclone landfall near Beira."
+    rows, _ = index.search(query, top_k=10, mode="ann", nprobe=2)
+    assert sorted(index.ids[r] for r in rows) == [2, 3, 4, 5]
+
+
+def test_add_ignores_rows_of_an_interrupted_add(tmp_path, bow_encoder):
+    path = tmp_path / "idx"
+    index = build_index(str(path), SAMPLE_DATA, bow_encoder, "bow")
+    with open(path / "embeddings.f32", "ab") as f:
+        f.write(b"\0" * 64 * 4)
+    with open(path / "docs.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"id": 99, "text": "half written"}\n')
+
+    index = EmbeddingIndex.open(str(path))
+    assert len(index) == 5 and 99 not in index
+    index.add([{"id": 7, "text": "Drought in the Sahel."}], bow_encoder)
+    reopened = EmbeddingIndex.open(str(path))
+    assert list(reopened.ids) == [1, 2, 3, 4, 5, 7]
+    assert (path / "embeddings.f32").stat().st_size == 6 * 64 * 4
+    assert np.allclose(reopened.embeddings[5], bow_encoder.encode(["Drought in the Sahel."])[0])
+
+
+def test_docs_are_read_lazily_through_offsets(tmp_path, bow_encoder):
+    path = tmp_path / "idx"
+    build_index(str(path), SAMPLE_DATA, bow_encoder, "bow")
+    # directories written before the offsets existed are indexed on open
+    (path / "docs.off").unlink()
+    (path / "ids.h64").unlink()
+
+    index = EmbeddingIndex.open(str(path))
+    assert (path / "docs.off").stat().st_size == (path / "ids.h64").stat().st_size == 5 * 8
+    assert isinstance(index._doc_ends, np.memmap) and isinstance(index._id_hashes, np.memmap)
+
+    read = []
+    line = index._line
+    index._line = lambda row: read.append(row) or line(row)
+    assert index.doc(-1) == SAMPLE_DATA[-1]
+    assert index.texts[1:3] == [d["text"] for d in SAMPLE_DATA[1:3]]
+    assert read == [4, 1, 2]
+
+    read.clear()
+    assert 2 in index and "2" not in index and 99 not in index
+    assert read == [1]  # only the hash match is confirmed against the stored id
+
+
+def test_add_appends_deltas_and_compact_merges_them(tmp_path, bow_encoder, monkeypatch):
+    path = tmp_path / "idx"
+    rng = np.random.default_rng(5)
+    vocab = [f"w{i}" for i in range(200)]
+    docs = [{"id": i, "text": " ".join(rng.choice(vocab, size=6))} for i in range(300)]
+    index = build_index(str(path), docs, bow_encoder, "bow")
+    index.build_ann(nlist=8)
+    index.build_sparse()
+    base = {name: (path / name).read_bytes() for name in ("ivf.npz", "sparse.joblib")}
+
+    def no_reload(*args, **kwargs):
+        raise AssertionError("add() must update the open index in place")
+
+    monkeypatch.setattr(EmbeddingIndex, "_load", no_reload)
+    for i in range(3):
+        index.add([{"id": f"new{i}", "text": f"w{i} w{i + 10} w{i + 20}"}], bow_encoder)
+    index.add([{"id": "unseen", "text": "zebra w5"}, {"id": "fresh", "text": "yak w6"}], bow_encoder)
+    assert index.remove(["unseen"]) == 1
+    monkeypatch.undo()
+    assert {name: (path / name).read_bytes() for name in base} == base
+    assert len(index.ivf.delta_labels) == 5 and len(index.sparse.deltas) == 4
+    assert len(index.ivf) == len(index.sparse) == len(index) == 305
+    assert index.stats()["sparse_delta_rows"] == 5 and index.live_count == 304
+    assert "new2" in index and "fresh" in index and "unseen" not in index
+    # "yak" was not in the vocabulary the sparse index was fitted on
+    assert len(index.sparse.candidates("yak", 5)) == 0
+
+    def results():
+        out = []
+        for i in range(3):
+            text = f"w{i} w{i + 10} w{i + 20}"
+            q = bow_encoder.encode([text])[0]
+            for mode in ("ann", "hybrid"):
+                rows, _ = index.search(q, 3, mode=mode, nprobe=8, query_text=text, candidates=50)
+                out.append([index.ids[r] for r in rows])
+        return out
+
+    before = results()
+    assert all(hits[0] == f"new{i // 2}" for i, hits in enumerate(before))
+    assert index.compact() == 1
+    assert len(index.ivf.delta_labels) == 0 and index.sparse.deltas == []
+    assert not list(path.glob("sparse_delta.*")) and (path / "ivf_delta.i32").stat().st_size == 0
+    assert results() == before
+    assert index.stats()["sparse_delta_rows"] == 0
+    assert list(index.sparse.candidates("yak", 5)) == [index._live_row("fresh")]
+
+
+def test_hybrid_search_scores_only_sparse_candidates(tmp_path, bow_encoder):
+    rng = np.random.default_rng(3)
+    vocab = [f"w{i}" for i in range(300)]
+    docs = [{"id": i, "text": " ".join(rng.choice(vocab, size=8))} for i in range(2000)]
+    index = build_index(str(tmp_path / "idx"), docs, bow_encoder, "bow")
+    index.build_sparse()
+    index.add([{"id": "new", "text": "w1 w2 w3 w4"}], bow_encoder)
+    index.remove([0])
+    index = EmbeddingIndex.open(str(tmp_path / "idx"))
+    assert len(index.sparse) == len(index) == 2001
+
+    scored = []
+    score_rows = index.score_rows
+    index.score_rows = lambda rows, q: scored.append(len(rows)) or score_rows(rows, q)
+
+    query = "w1 w2 w3 w4"
+    q = bow_encoder.encode([query])[0]
+    rows, scores = index.search(q, 5, mode="hybrid", query_text=query, candidates=200)
+    assert index.ids[rows[0]] == "new"
+    assert scored == [200]
+    cand = index.sparse.candidates(query, 200)
+    dense = index.scores(q)[cand]
+    assert np.allclose(scores, np.sort(dense)[::-1][:5])
+
+    exact_rows, _ = index.search(q, 5)
+
+    # No term overlap at all: falls back to exact dense search.
+    rows, _ = index.search(q, 5, mode="hybrid", query_text="unrelated", candidates=200)
+    assert list(rows) == list(exact_rows)
@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+import pytest
+
+from src.event_rank_explain import main as rank_main
+from src.event_rank_explain.index import build_index
+from src.event_rank_explain.main import SAMPLE_DATA
+from src.event_rank_explain.ranking import Ranker
+from src.event_rank_explain.scoring import top_k_indices, top_k_rows
+
+
+def test_top_k_rows_matches_per_row_top_k():
+    scores = np.random.default_rng(0).random((6, 500)).astype(np.float32)
+    rows = top_k_rows(scores, 4)
+    for i in range(len(scores)):
+        assert list(rows[i]) == list(top_k_indices(scores[i], 4))
+    assert top_k_rows(scores, 1000).shape == (6, 500)
+
+
+def test_rank_batches_queries_and_caches_embeddings(tmp_path, bow_encoder):
+    index = build_index(str(tmp_path / "idx"), SAMPLE_DATA, bow_encoder, "bow")
+    ranker = Ranker.from_index(index, bow_encoder, cache_size=2)
+    bow_encoder.calls.clear()
+
+    queries = ["floods displaced", "armed clashes", "floods displaced"]
+    results = ranker.rank(queries, top_k=2)
+    assert bow_encoder.calls == [["floods displaced", "armed clashes"]]
+    assert [r[0]["id"] for r in results] == [2, 1, 2]
+    for query, hits in zip(queries, results):
+        rows, scores = index.search(bow_encoder.encode([query])[0], 2)
+        assert [h["id"] for h in hits] == [index.ids[r] for r in rows]
+        assert np.allclose([h["score"] for h in hits], scores)
+
+    bow_encoder.calls.clear()
+    ranker.rank(["armed clashes", "cyclone damage"], top_k=1)
+    assert bow_encoder.calls == [["cyclone damage"]]
+    assert list(ranker._cache) == ["armed clashes", "cyclone damage"]
+
+    with pytest.raises(ValueError, match="empty corpus"):
+        Ranker.from_docs([], bow_encoder)
+
+
+def test_cli_queries_file(tmp_path, bow_encoder, monkeypatch, capsys):
+    monkeypatch.setattr(rank_main, "get_encoder", lambda name: bow_encoder)
+    queries = tmp_path / "queries.txt"
+    queries.write_text("floods displaced\n\nearthquake tremors\n", encoding="utf-8")
+
+    assert rank_main.main(["--queries", str(queries), "--top-k", "1", "--no-explain"]) == 0
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [(l["query"], l["results"][0]["id"]) for l in lines] == [
+        ("floods displaced", 2),
+        ("earthquake tremors", 4),
+    ]
@@ -0,0 +1,13 @@
+from src.event_extraction.classifier import EventClassifier
+from src.event_extraction.event_extraction import extract_events_semantic
+from src.event_extraction.runner import run_parallel
+
+
+def test_run_parallel_preserves_order(gpe_model_path):
+    texts = [f"{word} reported near Beirut #{i}" for i, word in enumerate(["Explosion", "Flood", "Storm"] * 7)]
+    clf = EventClassifier(["explosion", "flood", "storm"]).fit(texts)
+
+    results = list(
+        run_parallel(texts, classifier=clf, spacy_model=gpe_model_path, workers=2, chunk_size=4, max_pending=2)
+    )
+    assert results == extract_events_semantic(texts, classifier=clf, spacy_model=gpe_model_path)
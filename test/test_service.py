@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+from src.event_extraction.service import ExtractionServer, MicroBatcher
+
+
+def test_microbatcher_groups_concurrent_requests():
+    seen = []
+
+    def process(texts):
+        seen.append(list(texts))
+        return [t.upper() for t in texts]
+
+    async def scenario():
+        batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=50)
+        await batcher.start()
+        try:
+            results = await asyncio.gather(*(batcher.submit([f"t{i}"]) for i in range(6)), batcher.submit(["a", "b"]))
+        finally:
+            await batcher.stop()
+        return results, batcher.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert results == [[f"T{i}"] for i in range(6)] + [["A", "B"]]
+    assert [len(b) for b in seen] == [4, 4]
+    assert stats["batch_size_histogram"] == {"4": 2}
+    assert stats["texts"] == 8
+
+
+def test_http_extract_roundtrip():
+    async def scenario():
+        server = ExtractionServer(MicroBatcher(lambda ts: [{"n": len(t)} for t in ts], max_wait_ms=1), port=0)
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            body = json.dumps({"texts": ["abc", "de"]}).encode()
+            writer.write(
+                b"POST /extract HTTP/1.1\r\nHost: x\r\nConnection: close\r\n"
+                + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+            raw = await reader.read()
+            writer.close()
+        finally:
+            await server.stop()
+        return raw
+
+    raw = asyncio.run(scenario())
+    head, _, body = raw.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 200")
+    assert json.loads(body) == {"results": [{"n": 3}, {"n": 2}]}
+
+
+def test_extract_rejects_texts_that_are_not_a_list_of_strings():
+    calls = []
+    server = ExtractionServer(MicroBatcher(calls.append, max_wait_ms=1), port=0)
+
+    async def post(payload):
+        return await server.dispatch("POST", "/extract", json.dumps(payload).encode())
+
+    for payload in ({"texts": "abc"}, {"texts": ["a", 1]}, {"text": 5}, ["abc"]):
+        status, reply = asyncio.run(post(payload))
+        assert status == 400 and "error" in reply
+    assert calls == []
+
+
+def test_startup_classifier_scores_independently_of_batch_mates(tmp_path):
+    from src.event_extraction.service import startup_classifier
+
+    corpus = tmp_path / "corpus.txt"
+    corpus.write_text("Massive flood hits Sudan\nProtest rally in Madrid\n", encoding="utf-8")
+    clf = startup_classifier(fit_corpus=str(corpus))
+
+    assert clf.is_fitted and "sudan" in clf.vectorizer.vocabulary_
+    text = "Flood waters rise in Sudan"
+    alone = clf.top_k([text], k=3)
+    assert clf.top_k([text, "Protest rally in Madrid", "wildfire spreads"], k=3)[0] == alone[0]
+    assert startup_classifier().is_fitted
@@ -0,0 +1,29 @@
+import json
+
+from src.event_extraction.event_extraction import main
+from src.event_extraction.stream_io import chunked
+
+
+def test_chunked():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_cli_streams_jsonl(tmp_path, gpe_model_path):
+    src = tmp_path / "in.jsonl"
+    src.write_text(
+        "\n".join(
+            json.dumps(r)
+            for r in [
+                {"id": "a", "text": "Massive explosion rocks Beirut port area"},
+                {"id": "b", "text": ""},
+                {"id": "c", "text": "Earthquake of magnitude 6.7 hits Japan coast"},
+            ]
+        )
+    )
+    out = tmp_path / "out.jsonl"
+    assert main(["--input", str(src), "--output", str(out), "--id-field", "id",
+                 "--chunk-size", "1", "--spacy-model", gpe_model_path]) == 0
+
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [r["id"] for r in rows] == ["a", "c"]
+    assert rows[1]["entities"] == ["Japan"]